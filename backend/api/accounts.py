@@ -0,0 +1,50 @@
+"""
+Credential checks and token issue for the login views.
+
+Hashing dominates the cost of a login, so every attempt runs exactly one
+password verification: known usernames against their stored hash (which
+Django re-hashes on success if the hasher settings changed), unknown ones
+against a dummy hash from the same hasher, so response times do not reveal
+which usernames exist.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, get_hasher
+from django.utils.crypto import get_random_string
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import authentication
+
+User = get_user_model()
+
+_dummy_hashes = {}
+
+
+def _dummy_hash():
+    hasher = get_hasher()
+    encoded = _dummy_hashes.get(hasher.algorithm)
+    # Rebuilt when the work factors change so it keeps costing the same as a real hash
+    if encoded is None or hasher.must_update(encoded):
+        encoded = _dummy_hashes[hasher.algorithm] = hasher.encode(get_random_string(32), hasher.salt())
+    return encoded
+
+
+def verify_credentials(username, password):
+    """The user with these credentials, or None"""
+    user = User.objects.filter(username=username).first() if username else None
+    if user is None:
+        check_password(password, _dummy_hash())
+        return None
+    if not user.check_password(password):
+        return None
+    return user
+
+
+def issue_tokens(user):
+    """Token pair whose claims let `ClaimsJWTAuthentication` skip the user query"""
+    refresh = RefreshToken.for_user(user)
+    authentication.add_claims(refresh, user)
+    authentication.remember_status(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
@@ -1,9 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
-from django.http import HttpResponse
-from .models import User, Category, Product, Cart, Order, OrderItem
-import csv
+from .models import User, Category, Product, Cart, Order, OrderItem, ImportJob, MetricCounter, DailyOrderStats, StockHold, SlowQuery
+from . import exports, inventory, metrics
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -24,19 +23,19 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['name', 'category', 'price', 'stock', 'is_active', 'created_at']
+    list_display = ['name', 'category', 'price', 'stock', 'reserved', 'is_active', 'created_at']
     list_filter = ['category', 'is_active', 'created_at']
     search_fields = ['name', 'slug', 'description']
     prepopulated_fields = {'slug': ('name',)}
     list_editable = ['price', 'stock', 'is_active']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['reserved', 'created_at', 'updated_at']
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('name', 'slug', 'category', 'description')
         }),
         ('Pricing & Inventory', {
-            'fields': ('price', 'weight', 'stock', 'is_active')
+            'fields': ('price', 'weight', 'stock', 'reserved', 'stock_shards', 'is_active')
         }),
         ('Media', {
             'fields': ('image',)
@@ -46,6 +45,25 @@ class ProductAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            shards = obj.stock_shards
+            obj.stock_shards = 0
+            super().save_model(request, obj, form, change)
+            if shards:
+                inventory.shard_stock(obj, shards)
+            return
+        
+        # Stock moves under concurrent checkouts, so it is never written back
+        # from the form; changed levels go through the inventory module instead
+        fields = [name for name in form.changed_data if name not in ('stock', 'stock_shards')]
+        if fields:
+            obj.save(update_fields=fields + ['updated_at'])
+        if 'stock_shards' in form.changed_data:
+            inventory.shard_stock(obj, form.cleaned_data['stock_shards'])
+        if 'stock' in form.changed_data:
+            inventory.set_stock(obj, form.cleaned_data['stock'])
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
@@ -91,34 +109,36 @@ class OrderAdmin(admin.ModelAdmin):
     order_actions.short_description = 'Actions'
     
     def export_as_csv(self, request, queryset):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="orders.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Order ID', 'Customer', 'Email', 'Status', 'Total', 'Date'])
-        
-        for order in queryset:
-            writer.writerow([
+        rows = (
+            [
                 order.order_id,
                 order.user.username,
                 order.user.email,
                 order.status,
                 order.total_amount,
                 order.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
-        
-        return response
+            ]
+            for order in queryset.select_related('user').iterator(chunk_size=exports.EXPORT_CHUNK_SIZE)
+        )
+        return exports.csv_response(
+            'orders.csv',
+            ['Order ID', 'Customer', 'Email', 'Status', 'Total', 'Date'],
+            rows
+        )
     export_as_csv.short_description = "Export Selected Orders to CSV"
     
     def mark_as_processing(self, request, queryset):
+        metrics.record_bulk_status_change(queryset, 'Processing')
         queryset.update(status='Processing')
     mark_as_processing.short_description = "Mark as Processing"
     
     def mark_as_shipped(self, request, queryset):
+        metrics.record_bulk_status_change(queryset, 'Shipped')
         queryset.update(status='Shipped')
     mark_as_shipped.short_description = "Mark as Shipped"
     
     def mark_as_delivered(self, request, queryset):
+        metrics.record_bulk_status_change(queryset, 'Delivered')
         queryset.update(status='Delivered')
     mark_as_delivered.short_description = "Mark as Delivered"
 
@@ -131,3 +151,36 @@ class CartAdmin(admin.ModelAdmin):
     def get_total(self, obj):
         return f"₹{obj.total_price}"
     get_total.short_description = 'Total Price'
+
+@admin.register(StockHold)
+class StockHoldAdmin(admin.ModelAdmin):
+    list_display = ['user', 'product', 'quantity', 'expires_at', 'created_at']
+    search_fields = ['user__username', 'product__name']
+    readonly_fields = ['user', 'product', 'quantity', 'expires_at', 'created_at']
+
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'status', 'file_format', 'rows_processed', 'imported_count', 'error_count', 'created_by', 'created_at']
+    list_filter = ['status', 'file_format', 'created_at']
+    readonly_fields = ['id', 'created_by', 'file', 'file_format', 'upsert', 'status', 'rows_processed',
+                       'imported_count', 'error_count', 'errors', 'message', 'created_at', 'started_at', 'heartbeat_at', 'finished_at']
+
+@admin.register(MetricCounter)
+class MetricCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'count', 'amount']
+    readonly_fields = ['name', 'count', 'amount']
+
+@admin.register(DailyOrderStats)
+class DailyOrderStatsAdmin(admin.ModelAdmin):
+    list_display = ['date', 'order_count', 'revenue']
+    readonly_fields = ['date', 'order_count', 'revenue']
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ['recorded_at', 'duration_ms', 'view', 'call_site', 'sql']
+    list_filter = ['database', 'view']
+    search_fields = ['sql', 'call_site']
+    readonly_fields = ['slot', 'recorded_at', 'duration_ms', 'database', 'sql', 'view', 'call_site', 'plan']
+    
+    def has_add_permission(self, request):
+        return False
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.core import checks
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import configure_connection
+        from .slow_queries import install
+        from .throttling import check_store
+        checks.register(check_store, checks.Tags.caches, deploy=True)
+        connection_created.connect(configure_connection, dispatch_uid='api.db.configure_connection')
+        connection_created.connect(install, dispatch_uid='api.slow_queries.install')
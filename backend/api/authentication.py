@@ -0,0 +1,86 @@
+"""
+Stateless JWT authentication.
+
+Tokens issued by `accounts.issue_tokens` carry the user's role and active
+flag, so requests are authenticated from the signed claims alone:
+`request.user` is a `User` with only id, role and is_active loaded and
+every other field deferred until first accessed.
+
+Deactivation and role changes still take effect through a per-user status
+entry in the cache. It is refreshed from the database at most every
+`AUTH_STATUS_CACHE_TTL` seconds and overwritten as soon as a user is saved
+or deleted; tokens whose claims no longer match it are rejected.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+CLAIMS = ('role', 'is_active')
+_MISSING = object()
+
+
+def _cache():
+    return caches[settings.AUTH_CACHE_ALIAS]
+
+
+def _status_key(user_id):
+    return f'auth:status:{user_id}'
+
+
+def add_claims(token, user):
+    for claim in CLAIMS:
+        token[claim] = getattr(user, claim)
+
+
+def remember_status(user):
+    _cache().set(_status_key(user.pk), (user.is_active, user.role), settings.AUTH_STATUS_CACHE_TTL)
+
+
+def forget_user(user_id):
+    _cache().set(_status_key(user_id), None, settings.AUTH_STATUS_CACHE_TTL)
+
+
+def user_status(user_id):
+    """`(is_active, role)` of the user, or None if it no longer exists"""
+    status = _cache().get(_status_key(user_id), _MISSING)
+    if status is _MISSING:
+        status = User.objects.filter(pk=user_id).values_list('is_active', 'role').first()
+        _cache().set(_status_key(user_id), status, settings.AUTH_STATUS_CACHE_TTL)
+    return status
+
+
+def loaded_user(user):
+    """`user` with every field loaded, for code that reads more than the token claims"""
+    if user.get_deferred_fields():
+        return User.objects.get(pk=user.pk)
+    return user
+
+
+def _claims_user(user_id, role):
+    # Same as a `.only('id', 'role', 'is_active')` row: the rest loads on access
+    loaded = {'id': user_id, 'role': role, 'is_active': True}
+    fields = [f.attname for f in User._meta.concrete_fields if f.attname in loaded]
+    return User.from_db(DEFAULT_DB_ALIAS, fields, [loaded[name] for name in fields])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if any(claim not in validated_token for claim in CLAIMS):
+            # Issued before the claims were embedded
+            return super().get_user(validated_token)
+        try:
+            user_id = User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        role = validated_token['role']
+        if not validated_token['is_active'] or user_status(user_id) != (True, role):
+            raise AuthenticationFailed('User is inactive or the token is out of date', code='user_inactive')
+        return _claims_user(user_id, role)
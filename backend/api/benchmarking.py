@@ -0,0 +1,68 @@
+"""
+Helpers shared by the `bench_*` management commands.
+"""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.test import APIClient, APIRequestFactory
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def scratch_transaction(keep=False):
+    """
+    Run a benchmark inside a transaction that is rolled back afterwards so
+    seeded rows never leak into the database, unless `keep` is set.
+    """
+    try:
+        with transaction.atomic():
+            yield
+            if not keep:
+                raise _Rollback
+    except _Rollback:
+        pass
+
+
+def _host():
+    hosts = [host for host in settings.ALLOWED_HOSTS if host and '*' not in host and not host.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def request_factory():
+    """An `APIRequestFactory` whose requests pass the ALLOWED_HOSTS check"""
+    return APIRequestFactory(HTTP_HOST=_host())
+
+
+def api_client():
+    """An `APIClient` (full middleware stack and URL routing) that passes the ALLOWED_HOSTS check"""
+    return APIClient(HTTP_HOST=_host())
+
+
+def measure(func, repeat):
+    """Call `func` `repeat` times and return the wall-clock durations in ms"""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(durations, pct):
+    ordered = sorted(durations)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(durations):
+    return {
+        'mean': statistics.mean(durations),
+        'p50': percentile(durations, 50),
+        'p95': percentile(durations, 95),
+    }
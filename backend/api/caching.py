@@ -0,0 +1,124 @@
+"""
+Response caching for the public catalog endpoints.
+
+Cache keys combine the view, its URL kwargs, the whitelisted query
+parameters (normalised: sorted, blanks dropped) and a catalog version
+number. Writes to products or categories bump the version instead of
+deleting keys, so every cached page goes stale at once and old entries
+simply age out of the cache.
+
+Each cached entry stores the serialized data plus an ETag, letting clients
+revalidate with If-None-Match and get a 304 without a body.
+
+Versions are nanosecond timestamps of the write that set them. For
+`DATABASE_REPLICA_LAG` seconds after a bump, pages missing from the cache
+are read from the primary rather than the replica, which may not have the
+write yet; other replica reads are unaffected. The version lives in the
+same cache as the pages it keys, so every process sharing those pages also
+sees when it changed.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from . import routers
+
+CATALOG_VERSION_KEY = 'catalog:version'
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _fresh_version():
+    # Time-based so a version lost to eviction is never reused
+    return time.time_ns()
+
+
+def catalog_version():
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, _fresh_version(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    get_cache().set(CATALOG_VERSION_KEY, _fresh_version(), None)
+
+
+def replica_may_lag(version):
+    """Whether the write that set `version` may not have reached the replica yet"""
+    return _fresh_version() - version < settings.DATABASE_REPLICA_LAG * 1_000_000_000
+
+
+def invalidate_catalog():
+    """Bump the catalog version once the current transaction commits"""
+    transaction.on_commit(bump_catalog_version)
+
+
+def compute_etag(data):
+    payload = json.dumps(data, cls=JSONEncoder, sort_keys=True, separators=(',', ':'))
+    return '"%s"' % hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH', '')
+    candidates = [value.strip() for value in header.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+class CachedResponseMixin:
+    """
+    Cache successful GET responses of a read-only view.
+    Set `CATALOG_CACHE_TIMEOUT = 0` to disable caching.
+    """
+    cache_query_params = (
+        'category', 'min_price', 'max_price', 'search', 'ordering',
+        'page', 'pagination', 'cursor',
+    )
+
+    def get_cache_key(self, request, version):
+        params = sorted(
+            (name, value)
+            for name in self.cache_query_params
+            for value in request.query_params.getlist(name)
+            if value != ''
+        )
+        raw = json.dumps([
+            type(self).__name__, sorted(self.kwargs.items()), params, request.get_host(),
+        ])
+        digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+        return f'catalog:{version}:{digest}'
+
+    def get(self, request, *args, **kwargs):
+        timeout = settings.CATALOG_CACHE_TIMEOUT
+        if not timeout:
+            return super().get(request, *args, **kwargs)
+
+        cache = get_cache()
+        version = catalog_version()
+        key = self.get_cache_key(request, version)
+        cached = cache.get(key)
+        if cached is None:
+            # Do not cache a page the replica has not caught up with under the new version
+            with routers.use_replica(not replica_may_lag(version)):
+                response = super().get(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            cached = (response.data, compute_etag(response.data))
+            cache.set(key, cached, timeout)
+
+        data, etag = cached
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(data, headers=headers)
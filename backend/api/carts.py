@@ -0,0 +1,193 @@
+"""
+Cart line bookkeeping for `CartViewSet`.
+
+Every mutation keeps the user's stock hold (see `api.inventory`) in step
+with the line quantity. Adding a product reads the product and the user's
+line for it in a single LEFT JOIN, resizes the hold, then inserts
+the line or bumps it with `quantity = quantity + n`, so the query count
+never depends on the size of the cart.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, FilteredRelation, Q
+
+from . import inventory
+from .models import Cart, Product
+
+LINE_FIELDS = ('line__id', 'line__quantity', 'line__created_at')
+
+
+def parse_quantity(value, default=1):
+    """Positive integer quantity from request data; raises ValueError"""
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        raise ValueError('Quantity must be a positive integer')
+    try:
+        quantity = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('Quantity must be a positive integer')
+    if quantity < 1 or str(quantity) != str(value).strip():
+        raise ValueError('Quantity must be a positive integer')
+    return quantity
+
+
+def add_item(user, product_id, quantity):
+    """
+    Add `quantity` units of a product to the user's cart, growing its stock
+    hold to match, and return the line with its product attached. Raises
+    `Product.DoesNotExist` or `InsufficientStock`.
+    """
+    row = Product.objects.active().annotate(
+        line=FilteredRelation('cart', condition=Q(cart__user=user)),
+    ).values(
+        'id', 'name', 'price', 'image', 'stock', *LINE_FIELDS
+    ).get(pk=product_id)
+    product = Product(
+        id=row['id'], name=row['name'], price=row['price'], image=row['image'], stock=row['stock']
+    )
+
+    with transaction.atomic():
+        inventory.hold(user, product, (row['line__quantity'] or 0) + quantity)
+        if row['line__id'] is None:
+            try:
+                with transaction.atomic():
+                    return Cart.objects.create(user=user, product=product, quantity=quantity)
+            except IntegrityError:
+                # Another request created the line first; fall through to increment it
+                line = Cart.objects.only('id', 'quantity', 'created_at').get(user=user, product=product)
+                row.update({'line__id': line.id, 'line__quantity': line.quantity, 'line__created_at': line.created_at})
+
+        Cart.objects.filter(pk=row['line__id']).update(quantity=F('quantity') + quantity)
+    return Cart(
+        id=row['line__id'], user=user, product=product,
+        quantity=row['line__quantity'] + quantity, created_at=row['line__created_at'],
+    )
+
+
+def set_quantity(user, cart_item, quantity):
+    """Set a line's quantity (its product already loaded), resizing the hold"""
+    with transaction.atomic():
+        inventory.hold(user, cart_item.product, quantity)
+        cart_item.quantity = quantity
+        cart_item.save(update_fields=['quantity'])
+    return cart_item
+
+
+def remove_items(user, product_ids=None):
+    """Delete cart lines (all of them by default) and release their holds"""
+    lines = Cart.objects.filter(user=user)
+    if product_ids is not None:
+        lines = lines.filter(product_id__in=product_ids)
+    with transaction.atomic():
+        deleted, _ = lines.delete()
+        inventory.release_holds(user, product_ids)
+    return deleted
+
+
+def summarize(items):
+    """Cart totals for the list response"""
+    return {
+        'count': len(items),
+        'item_count': sum(item.quantity for item in items),
+        'subtotal': sum((item.total_price for item in items), Decimal('0')),
+    }
+
+
+# ============= Batch mutations =============
+MAX_BATCH_OPERATIONS = 100
+
+
+class CartBatchError(Exception):
+    """Operations that cannot be applied; `errors` is a list of {index, error}"""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(f'{len(errors)} cart operations rejected')
+
+
+def apply_batch(user, operations):
+    """
+    Apply validated `{'op', 'product', 'quantity'}` operations in order, all
+    or nothing. Inside one transaction the products are read and the user's
+    lines for them read locked, the result is computed in memory and stock
+    is checked against the final quantities; holds (if enabled) are then
+    resized together and at most one DELETE, one UPDATE and one INSERT
+    touch the cart.
+    """
+    try:
+        with transaction.atomic():
+            _apply_batch(user, operations)
+    except IntegrityError:
+        # Another request created one of the lines first; it is there to lock now
+        with transaction.atomic():
+            _apply_batch(user, operations)
+
+
+def _apply_batch(user, operations):
+    product_ids = {op['product'] for op in operations}
+    rows = {
+        row['id']: row
+        for row in Product.objects.filter(pk__in=product_ids).values('id', 'name', 'stock', 'is_active')
+    }
+    existing = {
+        line.product_id: line
+        for line in Cart.objects.select_for_update().filter(user=user, product_id__in=product_ids).only(
+            'id', 'product_id', 'quantity'
+        )
+    }
+    quantities = {pk: line.quantity for pk, line in existing.items()}
+
+    errors = []
+    last_change = {}
+    touched = set()
+    for index, op in enumerate(operations):
+        product_id = op['product']
+        touched.add(product_id)
+        if op['op'] == 'remove':
+            quantities.pop(product_id, None)
+            last_change.pop(product_id, None)
+            continue
+        row = rows.get(product_id)
+        if row is None or not row['is_active']:
+            errors.append({'index': index, 'error': 'Product not found'})
+            continue
+        if op['op'] == 'add':
+            quantities[product_id] = quantities.get(product_id, 0) + op['quantity']
+        else:
+            quantities[product_id] = op['quantity']
+        last_change[product_id] = index
+
+    for product_id, index in last_change.items():
+        row = rows[product_id]
+        if quantities[product_id] > row['stock']:
+            errors.append({'index': index, 'error': f"Insufficient stock for {row['name']}"})
+    if errors:
+        raise CartBatchError(sorted(errors, key=lambda e: e['index']))
+
+    # With holds disabled the stock check above is all there is
+    if inventory.holds_enabled():
+        try:
+            inventory.set_holds(user, {pk: quantities.get(pk, 0) for pk in touched if pk in rows})
+        except inventory.InsufficientStock as e:
+            raise CartBatchError([{
+                'index': last_change[e.product.pk], 'error': f'Insufficient stock for {e.product.name}'
+            }])
+
+    removed = [line.id for pk, line in existing.items() if pk not in quantities]
+    changed = [
+        Cart(id=line.id, quantity=quantities[pk])
+        for pk, line in existing.items()
+        if pk in quantities and quantities[pk] != line.quantity
+    ]
+    added = [
+        Cart(user=user, product_id=pk, quantity=quantity)
+        for pk, quantity in quantities.items() if pk not in existing
+    ]
+    if removed:
+        Cart.objects.filter(pk__in=removed).delete()
+    if changed:
+        Cart.objects.bulk_update(changed, ['quantity'])
+    if added:
+        Cart.objects.bulk_create(added)
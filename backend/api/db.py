@@ -0,0 +1,26 @@
+"""
+Per-connection database setup.
+
+SQLite keeps most tuning knobs per connection, so the pragmas in
+`settings.SQLITE_PRAGMAS` are applied from the `connection_created` signal
+every time Django opens a new connection.
+"""
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def sqlite_pragmas(connection, names):
+    """Current values of the given pragmas, for diagnostics and benchmarks"""
+    with connection.cursor() as cursor:
+        values = {}
+        for name in names:
+            cursor.execute(f'PRAGMA {name}')
+            values[name] = cursor.fetchone()[0]
+        return values
@@ -0,0 +1,269 @@
+"""
+Streaming product import for `AdminProductViewSet.import_products`.
+
+Uploads are parsed incrementally (CSV line by line, JSON arrays element by
+element) so memory stays flat regardless of feed size. Rows are validated
+in Python, categories are resolved from an in-memory cache, and products
+are written with `bulk_create` in fixed-size batches, one transaction per
+batch. With `upsert=True` rows whose slug already exists update the
+existing product instead of being reported as errors.
+"""
+import codecs
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.utils.text import slugify
+
+from . import caching, inventory, metrics, search
+from .models import Category, Product
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+JSON_CHUNK_SIZE = 64 * 1024
+
+UPSERT_FIELDS = ['name', 'category', 'description', 'price', 'weight', 'stock',
+                 'image', 'is_active', 'updated_at']
+
+
+class ImportFormatError(ValueError):
+    """The upload as a whole cannot be parsed"""
+
+
+def detect_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.json'):
+        return 'json'
+    if name.endswith('.csv'):
+        return 'csv'
+    return None
+
+
+# ============= Streaming readers =============
+def iter_csv_rows(file):
+    """Yield `(row_number, row)`; row numbers count the header as row 1"""
+    lines = codecs.iterdecode(file, 'utf-8-sig')
+    for idx, row in enumerate(csv.DictReader(lines)):
+        yield idx + 2, row
+
+
+def iter_json_rows(file, chunk_size=JSON_CHUNK_SIZE):
+    """
+    Yield `(row_number, item)` for each element of a top-level JSON array,
+    decoding only as much of the upload as is needed for the next element.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    chunks = iter(lambda: file.read(chunk_size), b'')
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            eof = True
+            buffer = buffer[pos:] + text_decoder.decode(b'', final=True)
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos].isspace():
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ImportFormatError('JSON import must be an array of products')
+    pos += 1
+
+    row_number = 0
+    expect_value = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ImportFormatError('Unexpected end of JSON input')
+        if buffer[pos] == ']':
+            return
+        if not expect_value:
+            if buffer[pos] != ',':
+                raise ImportFormatError(f'Expected "," after row {row_number}')
+            pos += 1
+            skip_whitespace()
+
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+                break
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ImportFormatError(f'Invalid JSON after row {row_number}: {exc.msg}')
+                fill()
+
+        pos = end
+        row_number += 1
+        expect_value = False
+        yield row_number, item
+
+
+# ============= Row cleaning =============
+def _decimal(value, field):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'Invalid {field}: {value!r}')
+
+
+def _int(value, field):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid {field}: {value!r}')
+
+
+def _bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() == 'true'
+    return bool(value)
+
+
+def clean_row(row):
+    """Map a raw CSV/JSON row onto `Product` field values"""
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object')
+    if not row.get('name'):
+        raise ValueError("'name' is required")
+    if row.get('price') in (None, ''):
+        raise ValueError("'price' is required")
+
+    return {
+        'name': row['name'],
+        'slug': row.get('slug') or slugify(row['name']),
+        'category': row.get('category') or 'Uncategorized',
+        'description': row.get('description') or '',
+        'price': _decimal(row['price'], 'price'),
+        'weight': _decimal(row.get('weight') or 0, 'weight'),
+        'stock': _int(row.get('stock') or 0, 'stock'),
+        'image': row.get('image') or '',
+        'is_active': _bool(row.get('is_active', True)),
+    }
+
+
+# ============= Import engine =============
+class ProductImporter:
+    def __init__(self, upsert=False, batch_size=BATCH_SIZE, progress=None):
+        self.upsert = upsert
+        self.batch_size = batch_size
+        self.progress = progress
+        self.categories = None
+        self.rows_processed = 0
+        self.imported_count = 0
+        self.error_count = 0
+        self.errors = []
+
+    def run(self, file, fmt):
+        rows = iter_json_rows(file) if fmt == 'json' else iter_csv_rows(file)
+        batch = {}
+        for row_number, row in rows:
+            self.rows_processed += 1
+            try:
+                values = clean_row(row)
+                values['category'] = self.get_category(values['category'])
+            except Exception as e:
+                self.add_error(row_number, e)
+                continue
+
+            # Later rows win when a feed repeats a slug
+            previous = batch.pop(values['slug'], None)
+            if previous is not None and not self.upsert:
+                self.add_error(previous[0], f"Duplicate slug '{values['slug']}' in file")
+            batch[values['slug']] = (row_number, values)
+
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+        self.flush(batch)
+        metrics.refresh_product_count()
+        if self.imported_count:
+            caching.invalidate_catalog()
+        return self
+
+    def get_category(self, name):
+        if self.categories is None:
+            self.categories = {c.name: c for c in Category.objects.all()}
+        category = self.categories.get(name)
+        if category is None:
+            category, _ = Category.objects.get_or_create(
+                name=name,
+                defaults={'slug': slugify(name)}
+            )
+            self.categories[name] = category
+        return category
+
+    def add_error(self, row_number, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f'Row {row_number}: {error}')
+
+    def flush(self, batch):
+        if not batch:
+            return
+        rows = list(batch.values())
+        batch.clear()
+
+        if not self.upsert:
+            existing = set(Product.objects.filter(
+                slug__in=[values['slug'] for _, values in rows]
+            ).values_list('slug', flat=True))
+            for row_number, values in rows:
+                if values['slug'] in existing:
+                    self.add_error(row_number, f"Product with slug '{values['slug']}' already exists")
+            rows = [(n, values) for n, values in rows if values['slug'] not in existing]
+
+        try:
+            with transaction.atomic():
+                self.write(rows)
+        except IntegrityError:
+            # Fall back to row-by-row inserts to pinpoint the offending rows
+            for row in rows:
+                try:
+                    with transaction.atomic():
+                        self.write([row])
+                except Exception as e:
+                    self.add_error(row[0], e)
+        if self.progress:
+            self.progress(self)
+
+    def write(self, rows):
+        products = [Product(**values) for _, values in rows]
+        if self.upsert:
+            Product.objects.bulk_create(
+                products,
+                update_conflicts=True,
+                unique_fields=['slug'],
+                update_fields=UPSERT_FIELDS,
+            )
+        else:
+            Product.objects.bulk_create(products)
+
+        # bulk_create skips post_save, so refresh the search index here
+        product_ids = list(Product.objects.filter(slug__in=[p.slug for p in products]).values_list('id', flat=True))
+        search.index_products(product_ids)
+        if self.upsert:
+            inventory.redistribute_stock(product_ids)
+        self.imported_count += len(products)
+
+    def summary(self):
+        return {
+            'message': f'Successfully imported {self.imported_count} products',
+            'imported_count': self.imported_count,
+            'rows_processed': self.rows_processed,
+            'error_count': self.error_count,
+            'errors': self.errors,
+        }
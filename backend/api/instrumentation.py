@@ -0,0 +1,224 @@
+"""
+Per-request performance instrumentation.
+
+`RequestTimingMiddleware` measures every request: SQL query count and time
+(through an `execute_wrapper` on each database connection), time in the
+view (authentication, serializers and queries included), time rendering
+the response, and the response size. With `settings.SERVER_TIMING` on the
+figures are sent back in a `Server-Timing` header for browser dev tools.
+
+Per-route totals and latency histograms are kept in memory, per process,
+and exposed in the Prometheus text format by `/api/admin/metrics/`.
+Routes are URL patterns (`api/products/<slug:slug>/`), not raw paths, so
+the number of series stays bounded. A streamed response is recorded when
+its body is closed, with the queries run while it was sent.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryTimer:
+    """`execute_wrapper` that counts queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+class RouteStats:
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.response_bytes = 0
+        self.statuses = defaultdict(int)
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.routes = defaultdict(RouteStats)
+
+    def record(self, route, method, status, seconds, queries, db_seconds, size):
+        bucket = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound), len(LATENCY_BUCKETS))
+        with self.lock:
+            stats = self.routes[route, method]
+            stats.buckets[bucket] += 1
+            stats.count += 1
+            stats.seconds += seconds
+            stats.db_queries += queries
+            stats.db_seconds += db_seconds
+            stats.response_bytes += size
+            stats.statuses[f'{status // 100}xx'] += 1
+
+    def render(self):
+        """The collected metrics in the Prometheus text exposition format"""
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                '# HELP http_request_duration_seconds Time from the first middleware to the rendered response, or to the end of a streamed body.',
+                '# TYPE http_request_duration_seconds histogram',
+            ]
+            for (route, method), stats in routes:
+                labels = f'route="{_escape(route)}",method="{method}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats.buckets):
+                    cumulative += count
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'http_request_duration_seconds_sum{{{labels}}} {stats.seconds:.6f}')
+                lines.append(f'http_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+            for name, help_text, attr in (
+                ('http_request_db_queries_total', 'SQL queries run while handling requests.', 'db_queries'),
+                ('http_request_db_seconds_total', 'Time spent in SQL queries.', 'db_seconds'),
+                ('http_response_bytes_total', 'Response body bytes.', 'response_bytes'),
+            ):
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (route, method), stats in routes:
+                    value = getattr(stats, attr)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{name}{{route="{_escape(route)}",method="{method}"}} {value}')
+
+            lines += ['# HELP http_responses_total Responses by status class.', '# TYPE http_responses_total counter']
+            for (route, method), stats in routes:
+                for status_class, count in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'http_responses_total{{route="{_escape(route)}",method="{method}",status="{status_class}"}} {count}'
+                    )
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+registry = Registry()
+
+_current_view = ContextVar('current_view', default='')
+
+
+def current_view():
+    """'METHOD route' of the request being handled, for attributing work done under it"""
+    return _current_view.get()
+
+
+class MeasuredStream:
+    """Iterator over a streamed body that reports its size once the stream is closed"""
+
+    def __init__(self, content, finish):
+        self.content = content
+        self.finish = finish
+        self.size = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.content:
+            self.size += len(chunk)
+            yield chunk
+
+    def close(self):
+        # The response calls this once the server is done with the body,
+        # whether or not it was read to the end
+        if not self.closed:
+            self.closed = True
+            self.finish(self.size)
+
+
+class AsyncMeasuredStream(MeasuredStream):
+    # The response picks sync or async iteration by whether iter() works
+    __iter__ = None
+
+    async def __aiter__(self):
+        async for chunk in self.content:
+            self.size += len(chunk)
+            yield chunk
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = QueryTimer()
+        request._timing = {}
+        start = time.perf_counter()
+        token = _current_view.set('')
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timer))
+                response = self.get_response(request)
+                # A streamed body runs its queries while it is sent, so the
+                # wrappers stay attached until the stream is closed
+                wrappers = stack.pop_all() if response.streaming else None
+        finally:
+            _current_view.reset(token)
+        total = time.perf_counter() - start
+
+        marks = request._timing
+        view_end = marks.get('view_end', start + total)
+        view = view_end - marks.get('view_start', start)
+        render = marks.get('rendered', view_end) - view_end
+
+        match = request.resolver_match
+        route = match.route if match else 'unmatched'
+
+        def finish(size):
+            if wrappers is not None:
+                wrappers.close()
+            registry.record(
+                route, request.method, response.status_code,
+                time.perf_counter() - start, timer.count, timer.seconds, size,
+            )
+
+        if response.streaming:
+            stream = AsyncMeasuredStream if response.is_async else MeasuredStream
+            response.streaming_content = stream(response.streaming_content, finish)
+        else:
+            finish(len(response.content))
+
+        # Sent with the headers, so a streamed body's own queries are not in it
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = ', '.join([
+                f'db;desc="{timer.count} queries";dur={timer.seconds * 1000:.1f}',
+                f'view;dur={view * 1000:.1f}',
+                f'render;dur={render * 1000:.1f}',
+                f'total;dur={total * 1000:.1f}',
+            ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._timing['view_start'] = time.perf_counter()
+        _current_view.set(f'{request.method} {request.resolver_match.route}')
+
+    def process_template_response(self, request, response):
+        # Called after the view returns, before the response is rendered
+        marks = request._timing
+        marks['view_end'] = time.perf_counter()
+
+        def rendered(response):
+            marks['rendered'] = time.perf_counter()
+        response.add_post_render_callback(rendered)
+        return response
@@ -0,0 +1,371 @@
+"""
+Stock bookkeeping.
+
+Stock is only ever changed through conditional `UPDATE ... SET stock =
+stock - n WHERE stock >= n` statements, so concurrent checkouts cannot
+oversell and never need to hold a lock across a read-modify-write cycle.
+
+Cart lines hold their units for `settings.STOCK_HOLD_TTL` seconds: each
+hold is a `StockHold` row, and `Product.reserved` keeps their running
+total so availability (`stock - reserved`) is a column read rather than
+an aggregate. Holds are placed and resized with the same conditional
+updates, expire unless the cart is touched again, are released by
+`release_expired()` (the `release_stock_holds` command), and are turned
+into real decrements at checkout.
+
+Best-sellers can opt into sharded stock (`Product.stock_shards`): their
+units live in `StockShard` rows, checkout decrements a randomly chosen one
+so concurrent buyers rarely wait on the same row, and `Product.stock`
+becomes a cached total refreshed by `sync_sharded_stock()`. Holds on them
+are placed and honoured against the shard total, since the cached one runs
+ahead of the shards between refreshes. Stock levels should only be set
+through `set_stock()` so they reach the shards.
+"""
+import random
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from . import caching
+from .models import Product, StockHold, StockShard
+
+SWEEP_BATCH_SIZE = 1000
+# Random single-shard attempts before a sale is spread over several shards
+SHARD_ATTEMPTS = 2
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product):
+        self.product = product
+        super().__init__(f'Insufficient stock for {product.name}')
+
+
+def holds_enabled():
+    return settings.STOCK_HOLD_TTL > 0
+
+
+def decrement_stock(product, quantity, held=0):
+    """
+    Take `quantity` units of `product` or raise `InsufficientStock`.
+    `held` units are the buyer's own hold, which is consumed by the sale.
+    """
+    if product.stock_shards:
+        _decrement_sharded(product, quantity, held)
+        return
+    products = Product.objects.filter(
+        pk=product.pk, stock__gte=quantity
+    ).filter(
+        # Units other carts hold are not for sale
+        stock__gte=F('reserved') - held + quantity
+    )
+    change = {'stock': F('stock') - quantity, 'reserved': Greatest(F('reserved') - held, 0)}
+    # Cached catalog pages may lag on stock counts, but not on whether a product
+    # can be bought at all: only the sale that sells it out invalidates them,
+    # and only that one needs a second UPDATE to find out
+    if products.filter(stock__gt=quantity).update(**change):
+        return
+    if not products.update(**change):
+        raise InsufficientStock(product)
+    caching.invalidate_catalog()
+
+
+# ============= Holds =============
+def _per_product(amounts):
+    return Case(
+        *[When(pk=pk, then=Value(amount)) for pk, amount in amounts.items()],
+        output_field=IntegerField(),
+    )
+
+
+def _shard_sum():
+    return Coalesce(Subquery(
+        StockShard.objects.filter(product=OuterRef('pk')).values('product').annotate(
+            total=Sum('stock')
+        ).values('total')
+    ), 0)
+
+
+def _units():
+    """Units in stock: the shard total for sharded products, whose `stock` is only a cached copy"""
+    return Case(When(stock_shards__gt=0, then=_shard_sum()), default=F('stock'))
+
+
+def adjust_reserved(deltas):
+    """
+    Apply `{product_id: delta}` to the reserved counters in at most two
+    UPDATEs. Increases only succeed while enough units are available; if any
+    fails nothing is applied and `InsufficientStock` is raised.
+    """
+    increases = {pk: delta for pk, delta in deltas.items() if delta > 0}
+    decreases = {pk: delta for pk, delta in deltas.items() if delta < 0}
+    # A single conditional UPDATE is all-or-nothing by itself
+    needs_savepoint = len(increases) > 1 or (increases and decreases)
+    with transaction.atomic() if needs_savepoint else nullcontext():
+        if increases:
+            amount = _per_product(increases)
+            updated = Product.objects.filter(pk__in=increases).alias(units=_units()).filter(
+                units__gte=F('reserved') + amount
+            ).update(reserved=F('reserved') + amount)
+            if updated != len(increases):
+                raise InsufficientStock(_first_short(increases))
+        if decreases:
+            amount = _per_product(decreases)
+            Product.objects.filter(pk__in=decreases).update(
+                reserved=Greatest(F('reserved') + amount, 0)
+            )
+
+
+def _first_short(increases):
+    products = Product.objects.filter(pk__in=increases).annotate(units=_units()).only('id', 'name', 'reserved')
+    for product in products:
+        if product.units - product.reserved < increases[product.pk]:
+            return product
+    return Product(name='product')
+
+
+def _locked_holds(user, product_ids):
+    holds = StockHold.objects.select_for_update().filter(user=user, product_id__in=product_ids)
+    return dict(holds.values_list('product_id', 'quantity'))
+
+
+def set_holds(user, targets):
+    """
+    Resize the user's holds to `targets` (`{product_id: quantity}`, 0
+    releases), renewing their expiry. Raises `InsufficientStock` when a
+    product cannot cover its increase even after its expired holds are
+    released.
+
+    The current holds are read locked inside the transaction, so an expiry
+    sweep or another request of the same user cannot change them between
+    the read and the `reserved` update computed from it.
+    """
+    expires_at = timezone.now() + timedelta(seconds=settings.STOCK_HOLD_TTL)
+    with transaction.atomic():
+        placed = [pk for pk, quantity in targets.items() if quantity > 0]
+        if placed:
+            # Make sure every hold being placed has a row to lock: a concurrent
+            # request creating the same hold waits on this insert and then
+            # reads its result instead of applying its delta on top
+            StockHold.objects.bulk_create([
+                StockHold(user=user, product_id=pk, quantity=0, expires_at=expires_at) for pk in placed
+            ], ignore_conflicts=True)
+        held = _locked_holds(user, list(targets))
+
+        deltas = {pk: quantity - held.get(pk, 0) for pk, quantity in targets.items()}
+        try:
+            adjust_reserved(deltas)
+        except InsufficientStock:
+            # Abandoned carts may be sitting on the units; free them and retry once
+            if not release_expired(product_ids=[pk for pk, delta in deltas.items() if delta > 0]):
+                raise
+            # The sweep may have released this user's own expired holds too
+            held = _locked_holds(user, list(targets))
+            adjust_reserved({pk: quantity - held.get(pk, 0) for pk, quantity in targets.items()})
+
+        kept = [
+            StockHold(user=user, product_id=pk, quantity=quantity, expires_at=expires_at)
+            for pk, quantity in targets.items() if quantity > 0
+        ]
+        dropped = [pk for pk, quantity in targets.items() if quantity <= 0 and held.get(pk)]
+        if kept:
+            StockHold.objects.bulk_create(
+                kept,
+                update_conflicts=True,
+                unique_fields=['user', 'product'],
+                update_fields=['quantity', 'expires_at'],
+            )
+        if dropped:
+            StockHold.objects.filter(user=user, product_id__in=dropped).delete()
+
+
+def hold(user, product, quantity):
+    """
+    Make `quantity` units of `product` the user's hold. With holds disabled
+    this is just a stock check.
+    """
+    if not holds_enabled():
+        if quantity > product.stock:
+            raise InsufficientStock(product)
+        return
+    try:
+        set_holds(user, {product.pk: quantity})
+    except InsufficientStock:
+        raise InsufficientStock(product)
+
+
+def user_holds(user, product_ids=None):
+    holds = StockHold.objects.filter(user=user)
+    if product_ids is not None:
+        holds = holds.filter(product_id__in=product_ids)
+    return dict(holds.values_list('product_id', 'quantity'))
+
+
+def release_holds(user, product_ids=None):
+    """Give back the user's holds (on `product_ids` only, if given), e.g. when cart lines are removed"""
+    with transaction.atomic():
+        holds = StockHold.objects.select_for_update().filter(user=user)
+        if product_ids is not None:
+            holds = holds.filter(product_id__in=product_ids)
+        held = dict(holds.values_list('product_id', 'quantity'))
+        if held:
+            adjust_reserved({pk: -quantity for pk, quantity in held.items()})
+            StockHold.objects.filter(user=user, product_id__in=list(held)).delete()
+
+
+def claim_holds(user, product_ids):
+    """
+    Delete the user's holds on `product_ids` and return `{product_id:
+    quantity}` for them, for checkout to pass to `decrement_stock`. Call it
+    inside the checkout transaction: the rows are locked, so an expiry sweep
+    cannot release a hold that is being converted, and a hold the sweep got
+    to first is not returned.
+    """
+    holds = StockHold.objects.select_for_update().filter(user=user, product_id__in=product_ids)
+    claimed = dict(holds.values_list('product_id', 'quantity'))
+    if claimed:
+        StockHold.objects.filter(user=user, product_id__in=list(claimed)).delete()
+    return claimed
+
+
+def release_expired(product_ids=None, now=None, batch_size=SWEEP_BATCH_SIZE):
+    """Release holds that expired before `now`; returns the number of units freed"""
+    now = now or timezone.now()
+    expired = StockHold.objects.filter(expires_at__lt=now).order_by('expires_at')
+    if product_ids is not None:
+        expired = expired.filter(product_id__in=product_ids)
+
+    released = 0
+    while True:
+        holds = list(expired.values('id', 'product_id', 'quantity')[:batch_size])
+        freed = defaultdict(int)
+        with transaction.atomic():
+            for row in holds:
+                # Conditional so a hold renewed since the read above is left alone
+                deleted, _ = StockHold.objects.filter(
+                    pk=row['id'], expires_at__lt=now, quantity=row['quantity']
+                ).delete()
+                if deleted:
+                    freed[row['product_id']] += row['quantity']
+            adjust_reserved({pk: -quantity for pk, quantity in freed.items()})
+        released += sum(freed.values())
+        if len(holds) < batch_size:
+            return released
+
+
+def rebuild_reserved():
+    """Recompute every reserved counter from the hold rows"""
+    totals = StockHold.objects.filter(product=OuterRef('pk')).values('product').annotate(
+        total=Sum('quantity')
+    ).values('total')
+    return Product.objects.update(reserved=Coalesce(Subquery(totals), 0))
+
+
+# ============= Sharded stock =============
+def _split(total, count):
+    base, extra = divmod(total, count)
+    return [base + (1 if index < extra else 0) for index in range(count)]
+
+
+def _write_shards(product_id, total, count):
+    StockShard.objects.filter(product_id=product_id).delete()
+    if count:
+        StockShard.objects.bulk_create([
+            StockShard(product_id=product_id, index=index, stock=stock)
+            for index, stock in enumerate(_split(total, count))
+        ])
+
+
+def shard_total(product_id):
+    return StockShard.objects.filter(product_id=product_id).aggregate(total=Sum('stock'))['total'] or 0
+
+
+def shard_stock(product, count):
+    """Spread the product's current stock over `count` shards; 0 folds it back into `Product.stock`"""
+    with transaction.atomic():
+        current = Product.objects.select_for_update().only('stock', 'stock_shards').get(pk=product.pk)
+        total = shard_total(product.pk) if current.stock_shards else current.stock
+        _write_shards(product.pk, total, count)
+        Product.objects.filter(pk=product.pk).update(stock=total, stock_shards=count)
+    product.stock, product.stock_shards = total, count
+    caching.invalidate_catalog()
+
+
+def set_stock(product, stock):
+    """Set the stock level (e.g. from the admin), redistributing it over the product's shards"""
+    with transaction.atomic():
+        count = Product.objects.select_for_update().values_list('stock_shards', flat=True).get(pk=product.pk)
+        if count:
+            _write_shards(product.pk, stock, count)
+        Product.objects.filter(pk=product.pk).update(stock=stock)
+    product.stock = stock
+    caching.invalidate_catalog()
+
+
+def redistribute_stock(product_ids):
+    """Push `Product.stock` written directly (e.g. by an import) down into the products' shards"""
+    sharded = Product.objects.filter(pk__in=product_ids, stock_shards__gt=0).values_list('pk', 'stock', 'stock_shards')
+    with transaction.atomic():
+        for pk, stock, count in sharded:
+            _write_shards(pk, stock, count)
+
+
+def _take_from_shards(product, quantity):
+    shards = StockShard.objects.filter(product_id=product.pk)
+    indexes = random.sample(range(product.stock_shards), min(SHARD_ATTEMPTS, product.stock_shards))
+    for index in indexes:
+        if shards.filter(index=index, stock__gte=quantity).update(stock=F('stock') - quantity):
+            return True
+
+    # No sampled shard covers the sale on its own: drain shards in index order
+    with transaction.atomic():
+        remaining = quantity
+        for pk, stock in shards.select_for_update().filter(stock__gt=0).order_by('index').values_list('pk', 'stock'):
+            take = min(stock, remaining)
+            if not StockShard.objects.filter(pk=pk, stock__gte=take).update(stock=F('stock') - take):
+                break
+            remaining -= take
+            if not remaining:
+                return True
+        transaction.set_rollback(True)
+    return False
+
+
+def _decrement_sharded(product, quantity, held):
+    with transaction.atomic():
+        if not _take_from_shards(product, quantity):
+            raise InsufficientStock(product)
+        # Units beyond the buyer's own hold must not come out of other carts'
+        # holds: what the shards have left after the sale has to cover them
+        # (the cached `stock` runs ahead of the shards and cannot tell)
+        if held < quantity and holds_enabled() and not Product.objects.filter(pk=product.pk).alias(
+            units=_shard_sum()
+        ).filter(units__gte=F('reserved') - held).exists():
+            raise InsufficientStock(product)
+    if held:
+        Product.objects.filter(pk=product.pk).update(reserved=Greatest(F('reserved') - held, 0))
+
+    # Refresh the cached total at most once per interval rather than on every sale
+    if caching.get_cache().add(f'stock-sync:{product.pk}', 1, settings.STOCK_SHARD_SYNC_INTERVAL):
+        transaction.on_commit(lambda: sync_sharded_stock([product.pk]))
+
+
+def sync_sharded_stock(product_ids=None):
+    """Copy shard totals into `Product.stock` where they differ; returns the number of products updated"""
+    total = _shard_sum()
+    products = Product.objects.filter(stock_shards__gt=0)
+    if product_ids is not None:
+        products = products.filter(pk__in=product_ids)
+    stale = products.exclude(stock=total)
+    with transaction.atomic():
+        # As with unsharded sales, cached catalog pages only go stale when a product sells out or comes back
+        if stale.annotate(total=total).filter(
+            Q(stock__gt=0, total__lte=0) | Q(stock__lte=0, total__gt=0)
+        ).exists():
+            caching.invalidate_catalog()
+        return stale.update(stock=total)
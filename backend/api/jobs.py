@@ -0,0 +1,176 @@
+"""
+Background processing for product import jobs.
+
+The import endpoint stores the upload on an `ImportJob` row and returns
+immediately; the job is then picked up according to
+`settings.IMPORT_JOB_RUNNER`:
+
+* ``thread`` (default): an in-process thread pool started on commit.
+* ``worker``: jobs stay queued in the database until
+  ``python manage.py run_import_jobs`` claims them.
+* ``eager``: run synchronously on commit (tests, debugging).
+
+Jobs are claimed with a conditional UPDATE, so thread pools in several
+gunicorn workers and standalone workers can share one queue safely.
+
+A running job records a heartbeat with each progress report. One whose
+worker died (a restarted gunicorn worker, a killed process) stops beating
+and is marked failed by `fail_stale()` after `settings.IMPORT_JOB_TIMEOUT`
+seconds. Such jobs are not requeued, since a partly applied import without
+upsert cannot be rerun. A pending job that has waited as long lost its
+in-process submission with the worker that accepted it and is submitted
+again. `recover()` does both; ``run_import_jobs`` calls it on every poll,
+and in thread mode it runs when a process starts its pool and when the
+status of an unfinished job is read.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .importers import ProductImporter
+from .models import ImportJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMPORT_JOB_WORKERS,
+            thread_name_prefix='import-job',
+        )
+        # Pick up jobs a previous process accepted but did not finish
+        _executor.submit(_recover_in_thread)
+    return _executor
+
+
+def enqueue(job):
+    """Schedule `job` once the transaction that created it commits"""
+    runner = settings.IMPORT_JOB_RUNNER
+    if runner == 'eager':
+        transaction.on_commit(lambda: run_job(job.pk))
+    elif runner == 'thread':
+        transaction.on_commit(lambda: get_executor().submit(_run_in_thread, job.pk))
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_job(job_id)
+    except Exception:
+        logger.exception('Import job %s crashed', job_id)
+    finally:
+        connection.close()
+
+
+def _recover_in_thread():
+    close_old_connections()
+    try:
+        recover()
+    except Exception:
+        logger.exception('Import job recovery crashed')
+    finally:
+        connection.close()
+
+
+def claim(job_id):
+    """Atomically move a pending job to Running; False if someone else has it"""
+    now = timezone.now()
+    return ImportJob.objects.filter(pk=job_id, status='Pending').update(
+        status='Running', started_at=now, heartbeat_at=now
+    ) == 1
+
+
+def run_job(job_id):
+    if not claim(job_id):
+        return
+    job = ImportJob.objects.get(pk=job_id)
+
+    def report(importer):
+        ImportJob.objects.filter(pk=job.pk, status='Running').update(
+            rows_processed=importer.rows_processed,
+            imported_count=importer.imported_count,
+            error_count=importer.error_count,
+            errors=importer.errors,
+            heartbeat_at=timezone.now(),
+        )
+
+    importer = ProductImporter(upsert=job.upsert, progress=report)
+    result = {}
+    try:
+        with job.file.open('rb') as file:
+            importer.run(file, job.file_format)
+    except Exception as e:
+        result.update(status='Failed', message=f'Import failed: {str(e)}')
+    else:
+        result.update(
+            status='Completed', message=f'Successfully imported {importer.imported_count} products', file=''
+        )
+
+    # Conditional, so a job `fail_stale` gave up on in the meantime stays failed
+    finished = ImportJob.objects.filter(pk=job.pk, status='Running').update(
+        rows_processed=importer.rows_processed,
+        imported_count=importer.imported_count,
+        error_count=importer.error_count,
+        errors=importer.errors,
+        finished_at=timezone.now(),
+        **result,
+    )
+    if not finished:
+        logger.warning('Import job %s finished after it was marked failed', job.pk)
+    elif result['status'] == 'Completed':
+        job.file.delete(save=False)
+
+
+def _unfinished(job_ids):
+    jobs = ImportJob.objects.all()
+    return jobs if job_ids is None else jobs.filter(pk__in=job_ids)
+
+
+def fail_stale(now=None, job_ids=None):
+    """Fail running jobs without a heartbeat for `IMPORT_JOB_TIMEOUT` seconds; returns how many"""
+    now = now or timezone.now()
+    return _unfinished(job_ids).filter(
+        status='Running', heartbeat_at__lt=now - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT)
+    ).update(
+        status='Failed', message='Import failed: the worker stopped responding', finished_at=now
+    )
+
+
+def abandoned(job, now=None):
+    """Whether a loaded job is one `recover()` would act on"""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT)
+    if job.status == 'Running':
+        return job.heartbeat_at is not None and job.heartbeat_at < cutoff
+    return job.status == 'Pending' and settings.IMPORT_JOB_RUNNER == 'thread' and job.created_at < cutoff
+
+
+def recover(job_ids=None):
+    """
+    Fail stale running jobs and, with the thread runner, resubmit jobs
+    pending for over `IMPORT_JOB_TIMEOUT` seconds (all jobs, or `job_ids`).
+    Returns the numbers failed and resubmitted. Resubmitting a job another
+    pool still has queued is harmless: only one run can claim it.
+    """
+    now = timezone.now()
+    failed = fail_stale(now, job_ids)
+    orphaned = []
+    if settings.IMPORT_JOB_RUNNER == 'thread':
+        orphaned = list(_unfinished(job_ids).filter(
+            status='Pending', created_at__lt=now - timedelta(seconds=settings.IMPORT_JOB_TIMEOUT)
+        ).values_list('id', flat=True))
+        for job_id in orphaned:
+            get_executor().submit(_run_in_thread, job_id)
+    return failed, len(orphaned)
+
+
+def pending_job_ids(limit=None):
+    ids = ImportJob.objects.filter(status='Pending').order_by('created_at').values_list('id', flat=True)
+    return list(ids[:limit] if limit else ids)
@@ -0,0 +1,139 @@
+"""
+Mixed read/write throughput under concurrent load.
+
+    python manage.py bench_concurrency --threads 8 --seconds 10
+
+Runs the same workload twice against the configured database:
+
+* ``baseline``: a fresh connection per operation (the old CONN_MAX_AGE=0
+  behaviour) and, on SQLite, rollback journaling with no busy timeout.
+* ``tuned``: persistent connections and the configured `SQLITE_PRAGMAS`.
+
+Unlike the other bench commands the workload needs committed rows visible to
+every thread, so the products it seeds are committed and deleted afterwards.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import F
+from django.test.utils import override_settings
+
+from api import metrics
+from api.benchmarking import percentile
+from api.db import sqlite_pragmas
+from api.models import Category, Product
+
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE', 'synchronous': 'FULL', 'busy_timeout': 0}
+PRAGMA_NAMES = ['journal_mode', 'synchronous', 'busy_timeout']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent catalog reads and stock writes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--products', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.options = options
+        category, product_ids = self.seed(options['products'])
+        try:
+            rows = [
+                self.run_profile('baseline', BASELINE_PRAGMAS, persistent=False, product_ids=product_ids),
+                self.run_profile('tuned', settings.SQLITE_PRAGMAS, persistent=True, product_ids=product_ids),
+            ]
+        finally:
+            connections.close_all()
+            category.delete()
+            metrics.refresh_product_count()
+
+        self.stdout.write(
+            f"\n{'profile':<10}{'ops/s':>10}{'reads':>9}{'writes':>9}{'errors':>8}"
+            f"{'read p95':>11}{'write p95':>11}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['profile']:<10}{row['ops']:>10.0f}{row['reads']:>9}{row['writes']:>9}"
+                f"{row['errors']:>8}{row['read_p95']:>9.1f}ms{row['write_p95']:>9.1f}ms"
+            )
+
+    def seed(self, count):
+        category = Category.objects.create(name='Bench concurrency', slug='bench-concurrency')
+        Product.objects.bulk_create([
+            Product(
+                name=f'Concurrency product {i}', slug=f'bench-concurrency-{i}', category=category,
+                description='', price=100 + i, weight=1, stock=1_000_000,
+            )
+            for i in range(count)
+        ])
+        return category, list(category.products.values_list('id', flat=True))
+
+    def run_profile(self, name, pragmas, persistent, product_ids):
+        connections.close_all()
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            if connection.vendor == 'sqlite':
+                connection.ensure_connection()
+                self.stdout.write(f'{name}: {sqlite_pragmas(connection, PRAGMA_NAMES)}')
+            connection.close()
+
+            stop = time.perf_counter() + self.options['seconds']
+            results = []
+            threads = [
+                threading.Thread(target=self.worker, args=(seed, stop, persistent, product_ids, results))
+                for seed in range(self.options['threads'])
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        reads = [ms for kind, ms in results if kind == 'read']
+        writes = [ms for kind, ms in results if kind == 'write']
+        return {
+            'profile': name,
+            'ops': (len(reads) + len(writes)) / elapsed,
+            'reads': len(reads),
+            'writes': len(writes),
+            'errors': sum(1 for kind, _ in results if kind == 'error'),
+            'read_p95': percentile(reads, 95) if reads else 0,
+            'write_p95': percentile(writes, 95) if writes else 0,
+        }
+
+    def worker(self, seed, stop, persistent, product_ids, results):
+        rng = random.Random(seed)
+        local = []
+        try:
+            while time.perf_counter() < stop:
+                is_write = rng.random() < self.options['write_ratio']
+                start = time.perf_counter()
+                try:
+                    if is_write:
+                        self.write(rng.choice(product_ids))
+                    else:
+                        self.read(rng.randrange(0, 100) * 12)
+                except OperationalError:
+                    local.append(('error', 0))
+                else:
+                    local.append(('write' if is_write else 'read', (time.perf_counter() - start) * 1000))
+                if not persistent:
+                    connection.close()
+        finally:
+            connection.close()
+            results.extend(local)
+
+    def read(self, offset):
+        list(Product.objects.active().for_listing()[offset:offset + 12])
+
+    def write(self, product_id):
+        # Same shape as checkout: a conditional stock update inside a transaction
+        with transaction.atomic():
+            Product.objects.filter(pk=product_id, stock__gte=1).update(stock=F('stock') - 1)
+            Product.objects.filter(pk=product_id).values_list('stock', flat=True).get()
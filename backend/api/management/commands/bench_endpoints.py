@@ -0,0 +1,320 @@
+"""
+Latency and query count of every API route, with per-endpoint query budgets.
+
+    python manage.py bench_endpoints --products 50000 --orders 20000 --repeat 20
+
+Seeds the requested data volumes inside a rolled-back transaction, then
+sends each case through the full stack (middleware, URL routing, JWT
+authentication, serializers) with `APIClient`, and reports p50/p95 latency
+and the most queries one request ran. Throttling, the catalog response
+cache and the slow-query log are switched off so every request reaches the
+database the same way.
+
+A query budget is the most queries a request may run whatever the data
+volume: list endpoints must not grow with the page, so a serializer that
+starts querying per row (an N+1) goes over. The command fails when any
+case exceeds its budget or answers with an unexpected status, so it can
+gate merges; `api.test_benchmarks` runs it on a small data set.
+"""
+import random
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import ExitStack
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.throttling import SimpleRateThrottle
+
+from api import accounts, carts, metrics, search
+from api.benchmarking import api_client, percentile, scratch_transaction
+from api.instrumentation import QueryTimer
+from api.models import Cart, Category, Order, OrderItem, Product, User
+
+BATCH_SIZE = 5000
+PASSWORD = 'Bench@12345'
+STATUSES = [choice for choice, _ in Order.STATUS_CHOICES]
+SHIPPING = {
+    'shipping_address': '1 Bench Street', 'shipping_city': 'Pune', 'shipping_state': 'MH',
+    'shipping_pincode': '411001', 'shipping_phone': '9999999999',
+}
+
+# `path` and `data` may be callables taking the command, for values that
+# depend on the seeded rows; `setup` runs untimed before every request
+Case = namedtuple('Case', 'name method path user expected budget data setup format',
+                  defaults=(None, None, 'json'))
+
+
+def cases():
+    return [
+        # Auth
+        Case('register', 'post', '/api/auth/register/', None, 201, 2,
+             data=lambda bench: bench.new_account()),
+        Case('login', 'post', '/api/auth/login/', None, 200, 1,
+             data={'username': 'bench-customer', 'password': PASSWORD}),
+        Case('profile', 'get', '/api/auth/profile/', 'customer', 200, 1),
+        Case('admin login', 'post', '/api/admin/login/', None, 200, 1,
+             data={'username': 'bench-admin', 'password': PASSWORD}),
+        Case('admin profile', 'get', '/api/admin/profile/', 'admin', 200, 1),
+
+        # Catalog
+        Case('products', 'get', '/api/products/', None, 200, 2),
+        Case('products by category', 'get',
+             lambda bench: f'/api/products/?category={bench.categories[0].slug}&min_price=500&ordering=price',
+             None, 200, 2),
+        Case('products search', 'get', '/api/products/?search=bench', None, 200, 2),
+        Case('products cursor', 'get', '/api/products/?pagination=cursor', None, 200, 1),
+        Case('product detail', 'get', lambda bench: f'/api/products/{bench.products[0].slug}/', None, 200, 1),
+        Case('categories', 'get', '/api/categories/', None, 200, 2),
+
+        # Cart
+        Case('cart', 'get', '/api/cart/', 'customer', 200, 1,
+             setup=lambda bench: bench.fill_cart(10)),
+        Case('cart add', 'post', '/api/cart/', 'customer', 201, 12,
+             data=lambda bench: {'product': bench.products[-1].pk, 'quantity': 1},
+             setup=lambda bench: bench.fill_cart(10)),
+        Case('cart update', 'put', lambda bench: f'/api/cart/{bench.cart_line().pk}/', 'customer', 200, 10,
+             data=lambda bench: {'quantity': bench.rng.randint(1, 3)},
+             setup=lambda bench: bench.fill_cart(10)),
+        Case('cart remove', 'delete', lambda bench: f'/api/cart/{bench.cart_line().pk}/', 'customer', 204, 9,
+             setup=lambda bench: bench.fill_cart(10)),
+        Case('cart clear', 'delete', '/api/cart/clear/', 'customer', 204, 8,
+             setup=lambda bench: bench.fill_cart(10)),
+        Case('cart batch', 'post', '/api/cart/batch/', 'customer', 200, 14,
+             data=lambda bench: {'operations': [
+                 {'op': 'add', 'product': product.pk, 'quantity': 1} for product in bench.products[10:13]
+             ]},
+             setup=lambda bench: bench.fill_cart(10)),
+
+        # Checkout and order history
+        Case('checkout', 'post', '/api/orders/', 'customer', 201, 18, data=SHIPPING,
+             setup=lambda bench: bench.fill_cart(5)),
+        Case('orders', 'get', '/api/orders/', 'customer', 200, 3),
+        Case('order detail', 'get', lambda bench: f'/api/orders/{bench.customer_order.pk}/', 'customer', 200, 2),
+
+        # Admin catalog
+        Case('admin products', 'get', '/api/admin/products/', 'admin', 200, 2),
+        Case('admin products search', 'get', '/api/admin/products/?search=bench&ordering=-stock', 'admin', 200, 2),
+        Case('admin product create', 'post', '/api/admin/products/', 'admin', 201, 6,
+             data=lambda bench: bench.new_product()),
+        Case('admin product update', 'patch', lambda bench: f'/api/admin/products/{bench.products[1].pk}/',
+             'admin', 200, 4, data=lambda bench: {'price': str(bench.rng.randint(100, 20000))}),
+        Case('admin product delete', 'delete', lambda bench: f'/api/admin/products/{bench.scratch_product().pk}/',
+             'admin', 204, 8),
+        Case('admin import', 'post', '/api/admin/products/import_products/', 'admin', 202, 3,
+             data=lambda bench: {'file': bench.import_file()}, format='multipart'),
+        Case('admin import status', 'get', lambda bench: f'/api/admin/products/import/{bench.import_job_id()}/',
+             'admin', 200, 1),
+
+        # Admin orders
+        Case('admin orders', 'get', '/api/admin/orders/', 'admin', 200, 3),
+        Case('admin orders summary', 'get', '/api/admin/orders/?view=summary&status=Pending', 'admin', 200, 2),
+        Case('admin orders cursor', 'get', '/api/admin/orders/?pagination=cursor', 'admin', 200, 2),
+        Case('admin order detail', 'get', lambda bench: f'/api/admin/orders/{bench.orders[0].pk}/', 'admin', 200, 2),
+        Case('admin order status', 'put', lambda bench: f'/api/admin/orders/{bench.orders[1].pk}/update_status/',
+             'admin', 200, 5, data=lambda bench: {'status': bench.rng.choice(STATUSES)}),
+        Case('admin order notes', 'put', lambda bench: f'/api/admin/orders/{bench.orders[2].pk}/add_notes/',
+             'admin', 200, 3, data={'notes': 'Bench note'}),
+        Case('admin order delete', 'delete', lambda bench: f'/api/admin/orders/{bench.scratch_order().pk}/',
+             'admin', 204, 4),
+        Case('admin export 100', 'post', '/api/admin/orders/export_csv/', 'admin', 200, 2,
+             data=lambda bench: {'order_ids': [order.pk for order in bench.orders[:100]]}),
+        Case('admin dashboard', 'get', '/api/admin/dashboard/', 'admin', 200, 4),
+        Case('admin metrics', 'get', '/api/admin/metrics/', 'admin', 200, 0),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API endpoint and check its query budget'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=10000)
+        parser.add_argument('--orders', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--items-per-order', type=int, default=3)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--only', help='Run the cases whose name contains this text')
+        parser.add_argument('--no-budgets', action='store_true', help='Report query counts without failing')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        selected = [case for case in cases() if not options['only'] or options['only'] in case.name]
+
+        with ExitStack() as stack:
+            stack.enter_context(override_settings(
+                CATALOG_CACHE_TIMEOUT=0, SLOW_QUERY_THRESHOLD_MS=0, IMPORT_JOB_RUNNER='worker',
+                MEDIA_ROOT=stack.enter_context(tempfile.TemporaryDirectory()),
+            ))
+            stack.enter_context(mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', {
+                scope: None for scope in SimpleRateThrottle.THROTTLE_RATES
+            }))
+            stack.enter_context(scratch_transaction())
+            self.seed()
+            rows = [self.run_case(case) for case in selected]
+
+        self.stdout.write(f"\n{'endpoint':<26}{'p50':>10}{'p95':>10}{'queries':>9}{'budget':>8}")
+        over = []
+        for case, stats in zip(selected, rows):
+            flag = '' if stats['queries'] <= case.budget else '  OVER BUDGET'
+            if flag:
+                over.append(case.name)
+            self.stdout.write(
+                f"{case.name:<26}{stats['p50']:>8.1f}ms{stats['p95']:>8.1f}ms"
+                f"{stats['queries']:>9}{case.budget:>8}{flag}"
+            )
+        if over and not options['no_budgets']:
+            raise CommandError(f"Query budget exceeded by: {', '.join(over)}")
+
+    # ============= Data =============
+    def seed(self):
+        options = self.options
+        rng = self.rng
+        self.stdout.write(
+            f"Seeding {options['products']} products, {options['orders']} orders, {options['users']} users "
+            f"on {connection.vendor}..."
+        )
+        self.categories = Category.objects.bulk_create([
+            Category(name=f'Bench category {i}', slug=f'bench-category-{i}')
+            for i in range(options['categories'])
+        ])
+        products = [
+            Product(
+                name=f'Bench product {i}', slug=f'bench-product-{i}', category=rng.choice(self.categories),
+                description=f'Bench product {i} description', price=rng.randint(100, 20000), weight=1,
+                stock=1_000_000, is_active=i < 20 or rng.random() < 0.9,
+            )
+            for i in range(max(options['products'], 20))
+        ]
+        for start in range(0, len(products), BATCH_SIZE):
+            Product.objects.bulk_create(products[start:start + BATCH_SIZE])
+        # The first products are active and get the cart and admin traffic
+        self.products = products[:20]
+        search.index_products([product.pk for product in products])
+
+        self.customer = User.objects.create_user(username='bench-customer', password=PASSWORD)
+        self.admin = User.objects.create_user(username='bench-admin', password=PASSWORD, role='admin', is_staff=True)
+        users = [self.customer] + User.objects.bulk_create([
+            User(username=f'bench-user-{i}', email=f'bench-user-{i}@example.com')
+            for i in range(options['users'])
+        ])
+
+        orders = [
+            Order(
+                user=self.customer if i < 20 else rng.choice(users), order_id=f'BENCH-{i}',
+                status=rng.choices(STATUSES, weights=[5, 5, 10, 75, 5])[0],
+                total_amount=rng.randint(100, 50000), **SHIPPING,
+            )
+            for i in range(max(options['orders'], 100))
+        ]
+        for start in range(0, len(orders), BATCH_SIZE):
+            chunk = Order.objects.bulk_create(orders[start:start + BATCH_SIZE])
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=rng.randint(1, 3), price=product.price)
+                for order in chunk
+                for product in rng.sample(products, min(options['items_per_order'], len(products)))
+            ], batch_size=BATCH_SIZE)
+        self.orders = orders
+        self.customer_order = orders[0]
+        now = timezone.now()
+        Order.objects.filter(pk__in=[order.pk for order in orders[:100]]).update(created_at=now - timedelta(days=1))
+        metrics.rebuild()
+
+        self.tokens = {
+            'customer': accounts.issue_tokens(self.customer)['access'],
+            'admin': accounts.issue_tokens(self.admin)['access'],
+        }
+        self.accounts = 0
+        self.import_job = None
+
+    def fill_cart(self, lines):
+        carts.remove_items(self.customer)
+        for product in self.products[:lines]:
+            carts.add_item(self.customer, product.pk, 1)
+
+    def cart_line(self):
+        return Cart.objects.filter(user=self.customer).order_by('pk').first()
+
+    def new_account(self):
+        self.accounts += 1
+        return {
+            'username': f'bench-new-{self.accounts}', 'email': f'bench-new-{self.accounts}@example.com',
+            'password': PASSWORD, 'password2': PASSWORD,
+        }
+
+    def new_product(self):
+        self.accounts += 1
+        return {
+            'name': f'Bench new product {self.accounts}', 'slug': f'bench-new-product-{self.accounts}',
+            'category': self.categories[0].pk, 'description': 'New', 'price': '99.00', 'weight': '1.00',
+            'stock': 10,
+        }
+
+    def scratch_product(self):
+        self.accounts += 1
+        return Product.objects.create(
+            name=f'Bench scratch product {self.accounts}', slug=f'bench-scratch-product-{self.accounts}',
+            category=self.categories[0], description='Scratch', price=99, weight=1, stock=10,
+        )
+
+    def scratch_order(self):
+        self.accounts += 1
+        order = Order.objects.create(user=self.customer, order_id=f'BENCH-SCRATCH-{self.accounts}',
+                                     total_amount=300, **SHIPPING)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=product, quantity=1, price=product.price) for product in self.products[:3]
+        ])
+        return order
+
+    def import_file(self):
+        rows = ['name,slug,category,description,price,weight,stock'] + [
+            f'Bench import {i},bench-import-{i},{self.categories[0].name},Imported,10.00,1.00,5' for i in range(50)
+        ]
+        return SimpleUploadedFile('bench.csv', '\n'.join(rows).encode(), content_type='text/csv')
+
+    def import_job_id(self):
+        if self.import_job is None:
+            response = self.client_for('admin').post(
+                '/api/admin/products/import_products/', {'file': self.import_file()}, format='multipart'
+            )
+            self.import_job = response.json()['job']['id']
+        return self.import_job
+
+    # ============= Requests =============
+    def client_for(self, user):
+        client = api_client()
+        if user:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.tokens[user]}')
+        return client
+
+    def run_case(self, case):
+        client = self.client_for(case.user)
+        durations = []
+        queries = 0
+        for _ in range(self.options['repeat']):
+            if case.setup:
+                case.setup(self)
+            path = case.path(self) if callable(case.path) else case.path
+            data = case.data(self) if callable(case.data) else case.data
+
+            timer = QueryTimer()
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(timer))
+                start = time.perf_counter()
+                response = getattr(client, case.method)(path, data, format=case.format)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                durations.append((time.perf_counter() - start) * 1000)
+
+            if response.status_code != case.expected:
+                raise CommandError(f'{case.name}: expected {case.expected}, got {response.status_code}')
+            queries = max(queries, timer.count)
+        return {'p50': percentile(durations, 50), 'p95': percentile(durations, 95), 'queries': queries}
@@ -0,0 +1,156 @@
+"""
+Simulated flash sale: many buyers race for a small stock of one product.
+
+    python manage.py bench_flash_sale --buyers 200 --stock 50 --threads 16
+
+Each buyer adds 1-2 units to their cart, spends `--think-ms` on the
+checkout form, then places the order. The sale runs twice:
+
+* ``no-holds``: `STOCK_HOLD_TTL=0`, so the cart only checks stock and every
+  buyer who got an item into the cart races for it at checkout.
+* ``holds``: the configured TTL, so units are claimed when they are added
+  and buyers who are too late are turned away at the cart instead.
+
+A failed checkout is a buyer who was let into checkout and then told the
+item is gone; with holds that should not happen. Buyers, carts and orders
+need to be committed to be visible across threads, so the command deletes
+what it created afterwards.
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test.utils import override_settings
+from rest_framework.test import force_authenticate
+
+from api import metrics
+from api.benchmarking import percentile, request_factory
+from api.models import Cart, Category, Product, User
+from api.views import CartViewSet, OrderViewSet
+
+SHIPPING = {
+    'shipping_address': '1 Bench Road',
+    'shipping_city': 'City',
+    'shipping_state': 'State',
+    'shipping_pincode': '123456',
+    'shipping_phone': '9999999999',
+}
+
+add_to_cart = CartViewSet.as_view({'post': 'create'})
+checkout = OrderViewSet.as_view({'post': 'create'})
+
+
+class Command(BaseCommand):
+    help = 'Benchmark checkout contention for a scarce product with and without stock holds'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=200)
+        parser.add_argument('--stock', type=int, default=50)
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--think-ms', type=float, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.factory = request_factory()
+        category = Category.objects.create(name='Bench flash sale', slug='bench-flash-sale')
+        users = User.objects.bulk_create([
+            User(username=f'bench-flash-{i}', email=f'bench-flash-{i}@example.com')
+            for i in range(options['buyers'])
+        ])
+        try:
+            rows = [
+                self.run_sale('no-holds', 0, category, users),
+                self.run_sale('holds', settings.STOCK_HOLD_TTL or 900, category, users),
+            ]
+        finally:
+            connection.close()
+            User.objects.filter(username__startswith='bench-flash-').delete()
+            category.delete()
+            metrics.refresh_product_count()
+
+        self.stdout.write(
+            f"\n{'profile':<10}{'sold':>6}{'orders':>8}{'turned away':>13}{'failed checkouts':>18}"
+            f"{'errors':>8}{'checkout p50':>14}{'checkout p95':>14}{'wall':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['profile']:<10}{row['sold']:>6}{row['orders']:>8}{row['turned_away']:>13}"
+                f"{row['failed']:>18}{row['errors']:>8}{row['p50']:>12.1f}ms{row['p95']:>12.1f}ms"
+                f"{row['wall']:>8.2f}s"
+            )
+
+    def run_sale(self, name, ttl, category, users):
+        # Buyers who failed in the previous sale still have it in their carts
+        Cart.objects.filter(user__in=users).delete()
+        product = Product.objects.create(
+            name=f'Flash sale {name}', slug=f'bench-flash-sale-{name}', category=category,
+            description='', price=100, weight=1, stock=self.options['stock'],
+        )
+        rng = random.Random(self.options['seed'])
+        queue = [(user, rng.randint(1, 2)) for user in users]
+        results = []
+        lock = threading.Lock()
+
+        with override_settings(STOCK_HOLD_TTL=ttl):
+            threads = [
+                threading.Thread(target=self.worker, args=(product, queue, lock, results))
+                for _ in range(self.options['threads'])
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - started
+
+        product.refresh_from_db()
+        if product.stock < 0:
+            raise AssertionError(f'{name}: oversold, stock is {product.stock}')
+        checkouts = [ms for kind, ms in results if kind in ('ordered', 'failed')]
+        return {
+            'profile': name,
+            'sold': self.options['stock'] - product.stock,
+            'orders': sum(1 for kind, _ in results if kind == 'ordered'),
+            'turned_away': sum(1 for kind, _ in results if kind == 'turned_away'),
+            'failed': sum(1 for kind, _ in results if kind == 'failed'),
+            'errors': sum(1 for kind, _ in results if kind == 'error'),
+            'p50': percentile(checkouts, 50) if checkouts else 0,
+            'p95': percentile(checkouts, 95) if checkouts else 0,
+            'wall': wall,
+        }
+
+    def worker(self, product, queue, lock, results):
+        local = []
+        try:
+            while True:
+                with lock:
+                    if not queue:
+                        break
+                    user, quantity = queue.pop()
+                try:
+                    local.append(self.buy(user, product, quantity))
+                except OperationalError:
+                    local.append(('error', 0))
+        finally:
+            connection.close()
+            with lock:
+                results.extend(local)
+
+    def buy(self, user, product, quantity):
+        request = self.factory.post('/api/cart/', {'product': product.id, 'quantity': quantity}, format='json')
+        force_authenticate(request, user=user)
+        if add_to_cart(request).status_code != 201:
+            return ('turned_away', 0)
+
+        time.sleep(self.options['think_ms'] / 1000)
+
+        request = self.factory.post('/api/orders/', SHIPPING, format='json')
+        force_authenticate(request, user=user)
+        start = time.perf_counter()
+        response = checkout(request)
+        elapsed = (time.perf_counter() - start) * 1000
+        return ('ordered' if response.status_code == 201 else 'failed', elapsed)
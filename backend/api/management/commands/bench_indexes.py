@@ -0,0 +1,157 @@
+"""
+Show query plans and latency of the catalog/order access paths with and
+without the composite indexes declared on `Product` and `Order`.
+
+    python manage.py bench_indexes --products 200000 --orders 200000
+
+Everything runs inside a rolled-back transaction; the "without" pass drops
+the indexes in a nested transaction that is rolled back as well.
+"""
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from api.benchmarking import measure, scratch_transaction, summarize
+from api.models import Category, Order, Product, User
+
+STATUSES = [choice for choice, _ in Order.STATUS_CHOICES]
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = 'Benchmark catalog and order queries with and without the composite indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--no-plans', action='store_true', help='Only print timings')
+
+    def handle(self, *args, **options):
+        self.options = options
+        rng = random.Random(options['seed'])
+        with scratch_transaction():
+            self.seed(rng, options)
+            if connection.vendor == 'sqlite':
+                connection.cursor().execute("ANALYZE")
+            results = {'with': self.run('with indexes')}
+            with scratch_transaction():
+                self.drop_indexes()
+                results['without'] = self.run('without indexes')
+
+        self.stdout.write(f"\n{'query':<28}{'p50 with':>12}{'p50 without':>14}{'speedup':>10}")
+        for name, with_stats in results['with'].items():
+            without_stats = results['without'][name]
+            speedup = without_stats['p50'] / with_stats['p50'] if with_stats['p50'] else 0
+            self.stdout.write(
+                f"{name:<28}{with_stats['p50']:>10.2f}ms{without_stats['p50']:>12.2f}ms{speedup:>9.1f}x"
+            )
+
+    # ============= Data =============
+    def seed(self, rng, options):
+        self.stdout.write(f"Seeding {options['products']} products, {options['orders']} orders...")
+        self.categories = [
+            Category.objects.create(name=f'Bench category {i}', slug=f'bench-category-{i}')
+            for i in range(20)
+        ]
+        now = timezone.now()
+
+        products = []
+        for i in range(options['products']):
+            products.append(Product(
+                name=f'Bench product {i}',
+                slug=f'bench-product-{i}',
+                category=rng.choice(self.categories),
+                description='',
+                price=rng.randint(100, 20000),
+                weight=1,
+                stock=rng.randint(0, 100),
+                is_active=rng.random() < 0.9,
+            ))
+            if len(products) == BATCH_SIZE:
+                Product.objects.bulk_create(products)
+                products.clear()
+        Product.objects.bulk_create(products)
+        # auto_now_add ignores explicit values, so spread creation dates afterwards
+        self.spread_dates(Product, now)
+
+        self.users = User.objects.bulk_create([
+            User(username=f'bench-user-{i}', email=f'bench-user-{i}@example.com')
+            for i in range(options['users'])
+        ])
+        orders = []
+        for i in range(options['orders']):
+            orders.append(Order(
+                user=rng.choice(self.users),
+                order_id=f'BENCH-{i}',
+                # Most orders end up delivered; the admin queue lives in the rest
+                status=rng.choices(STATUSES, weights=[5, 5, 10, 75, 5])[0],
+                total_amount=rng.randint(100, 50000),
+                shipping_address='-', shipping_city='-', shipping_state='-',
+                shipping_pincode='000000', shipping_phone='0000000000',
+            ))
+            if len(orders) == BATCH_SIZE:
+                Order.objects.bulk_create(orders)
+                orders.clear()
+        Order.objects.bulk_create(orders)
+        self.spread_dates(Order, now)
+        self.now = now
+
+    def spread_dates(self, model, now):
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id FROM {table}')
+            ids = [row[0] for row in cursor.fetchall()]
+            cursor.executemany(
+                f'UPDATE {table} SET created_at = %s WHERE id = %s',
+                [(now - timedelta(minutes=len(ids) - n), pk) for n, pk in enumerate(ids)],
+            )
+
+    def drop_indexes(self):
+        # Plain DROP INDEX: the SQLite schema editor refuses to run inside a transaction
+        with connection.cursor() as cursor:
+            for model in (Product, Order):
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+
+    # ============= Queries =============
+    def queries(self):
+        category = self.categories[0]
+        since = self.now - timedelta(days=3)
+        return {
+            'catalog newest': lambda: Product.objects.active().for_listing()[:12],
+            'catalog category by price': lambda: Product.objects.active().filter(
+                category=category, price__gte=1000, price__lte=5000
+            ).order_by('price')[:12],
+            'catalog category count': lambda: Product.objects.active().filter(category=category).order_by(),
+            'admin orders newest': lambda: Order.objects.all()[:20],
+            'admin orders by status': lambda: Order.objects.filter(status='Pending')[:20],
+            'admin orders date range': lambda: Order.objects.filter(created_at__gte=since)[:20],
+            'customer order history': lambda: Order.objects.filter(user=self.users[0])[:20],
+        }
+
+    def run(self, label):
+        self.stdout.write(f'\n=== {label} ===')
+        results = {}
+        for name, build in self.queries().items():
+            evaluate = (lambda: build().count()) if name.endswith('count') else (lambda: list(build()))
+            if not self.options['no_plans']:
+                self.stdout.write(f'-- {name}')
+                self.stdout.write(self.explain(build(), label))
+            evaluate()
+            results[name] = summarize(measure(evaluate, self.options['repeat']))
+        return results
+
+    def explain(self, queryset, label):
+        sql, params = queryset.query.sql_with_params()
+        # Tagging the statement keeps sqlite3's statement cache from handing back
+        # a plan prepared before the indexes were dropped
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql} /* {label} */', params)
+            rows = cursor.fetchall()
+        return '\n'.join(' '.join(str(column) for column in row) for row in rows)
@@ -0,0 +1,95 @@
+"""
+JSON rendering and parsing cost, DRF's stdlib classes against `api.renderers`.
+
+    python manage.py bench_json --repeat 500
+
+Serializes real catalog pages and admin order lists (orders with nested
+items) from rows seeded in a rolled-back transaction, then times turning
+that output into bytes with each renderer and the bytes back into data
+with each parser. Serialization itself is done once, outside the timings.
+"""
+from io import BytesIO
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import parsers, renderers as drf_renderers
+
+from api import renderers
+from api.benchmarking import measure, scratch_transaction, summarize
+from api.models import Category, Order, OrderItem, Product, User
+from api.serializers import OrderSerializer, ProductListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the stdlib and orjson JSON renderers and parsers on serializer output'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=500)
+        parser.add_argument('--items-per-order', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson is not installed; only the stdlib renderer is available')
+        with scratch_transaction():
+            payloads = self.payloads(options['items_per_order'])
+
+        pairs = [
+            ('stdlib', drf_renderers.JSONRenderer(), parsers.JSONParser()),
+            ('orjson', renderers.JSONRenderer(), renderers.JSONParser()),
+        ]
+        self.stdout.write(
+            f"{'payload':<30}{'bytes':>9}{'backend':>9}{'render p50':>12}{'parse p50':>12}"
+        )
+        for name, data in payloads:
+            expected = pairs[0][1].render(data)
+            if pairs[1][1].render(data) != expected:
+                raise CommandError(f'{name}: renderers disagree')
+            results = {}
+            for backend, renderer, parser in pairs:
+                render = summarize(measure(lambda: renderer.render(data), options['repeat']))
+                parse = summarize(measure(lambda: parser.parse(BytesIO(expected), None, {}), options['repeat']))
+                results[backend] = (render['p50'], parse['p50'])
+                self.stdout.write(
+                    f"{name:<30}{len(expected):>9}{backend:>9}{render['p50']:>10.3f}ms{parse['p50']:>10.3f}ms"
+                )
+            (render_std, parse_std), (render_fast, parse_fast) = results['stdlib'], results['orjson']
+            self.stdout.write(
+                f"{'':<30}{'':>9}{'speedup':>9}{render_std / render_fast:>11.1f}x{parse_std / parse_fast:>11.1f}x"
+            )
+
+    def payloads(self, items_per_order):
+        category = Category.objects.create(name='Bench JSON', slug='bench-json')
+        products = Product.objects.bulk_create([
+            Product(
+                name=f'Bench JSON product {i}', slug=f'bench-json-{i}', category=category,
+                description='Noise-cancelling over-ear headphones with a 30 hour battery. ' * 4,
+                price=f'{999 + i}.99', weight='0.25', stock=50,
+                image=f'https://images.example.com/products/{i}.jpg',
+            )
+            for i in range(100)
+        ])
+        user = User.objects.create_user(username='bench-json', email='bench-json@example.com')
+        orders = Order.objects.bulk_create([
+            Order(
+                user=user, order_id=f'BENCH-JSON-{i}', total_amount='4999.97',
+                shipping_address='12 MG Road, Near City Mall', shipping_city='Pune',
+                shipping_state='Maharashtra', shipping_pincode='411001', shipping_phone='9876543210',
+            )
+            for i in range(100)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=products[(n + k) % 100], quantity=k + 1, price=products[k].price)
+            for n, order in enumerate(orders)
+            for k in range(items_per_order)
+        ])
+
+        def page(results):
+            return {'count': len(results), 'next': None, 'previous': None, 'results': results}
+
+        listing = Product.objects.filter(category=category).for_listing()
+        admin_orders = Order.objects.filter(user=user).with_items()
+        return [
+            ('product page (12)', page(ProductListSerializer(listing[:12], many=True).data)),
+            ('product page (100)', page(ProductListSerializer(listing[:100], many=True).data)),
+            ('admin orders (12, nested)', page(OrderSerializer(admin_orders[:12], many=True).data)),
+            ('admin orders (100, nested)', page(OrderSerializer(admin_orders[:100], many=True).data)),
+        ]
@@ -0,0 +1,75 @@
+"""
+Login cost per password hasher configuration.
+
+    python manage.py bench_login --repeat 20
+
+Each configuration hashes a user's password, then times the login view
+for the right password, a wrong one and an unknown username. Everything
+runs on one thread, so logins/s is the throughput of a single core.
+Configurations whose hasher library is not installed are skipped.
+"""
+import importlib.util
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from api import views
+from api.benchmarking import measure, request_factory, scratch_transaction, summarize
+from api.models import User
+
+PASSWORD = 'Bench@12345'
+
+
+def configurations():
+    """(name, preferred hasher, settings overrides, required module)"""
+    return [
+        ('pbkdf2 600k (Django default)', 'api.hashers.PBKDF2PasswordHasher', {'PBKDF2_ITERATIONS': 600000}, None),
+        (f'pbkdf2 {settings.PBKDF2_ITERATIONS // 1000}k (configured)', 'api.hashers.PBKDF2PasswordHasher', {}, None),
+        ('argon2 100MiB t=2 p=8 (Django default)', 'api.hashers.Argon2PasswordHasher',
+         {'ARGON2_MEMORY_COST': 102400, 'ARGON2_TIME_COST': 2, 'ARGON2_PARALLELISM': 8}, 'argon2'),
+        (f'argon2 {settings.ARGON2_MEMORY_COST // 1024}MiB t={settings.ARGON2_TIME_COST} '
+         f'p={settings.ARGON2_PARALLELISM} (configured)', 'api.hashers.Argon2PasswordHasher', {}, 'argon2'),
+        (f'bcrypt {settings.BCRYPT_ROUNDS} rounds (configured)', 'api.hashers.BCryptSHA256PasswordHasher', {}, 'bcrypt'),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark login throughput per password hasher configuration'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        self.factory = request_factory()
+        self.stdout.write(
+            f"{'configuration':<42}{'case':<10}{'mean':>10}{'p95':>10}{'logins/s/core':>15}"
+        )
+        for name, hasher, overrides, module in configurations():
+            if module and importlib.util.find_spec(module) is None:
+                self.stdout.write(f'{name:<42}skipped: {module} is not installed')
+                continue
+            hashers = [hasher] + [path for path in settings.PASSWORD_HASHERS if path != hasher]
+            with override_settings(PASSWORD_HASHERS=hashers, **overrides), scratch_transaction():
+                self.run_configuration(name, options['repeat'])
+
+    def run_configuration(self, name, repeat):
+        User.objects.create_user(username='bench-login', password=PASSWORD)
+        assert get_hasher().algorithm in User.objects.get(username='bench-login').password
+
+        cases = [
+            ('valid', 'bench-login', PASSWORD, 200),
+            ('wrong', 'bench-login', 'wrong-password', 401),
+            ('unknown', 'bench-login-missing', PASSWORD, 401),
+        ]
+        for case, username, password, expected in cases:
+            def login():
+                request = self.factory.post('/api/auth/login/', {'username': username, 'password': password})
+                response = views.login(request)
+                assert response.status_code == expected, response.status_code
+            login()  # warm up (and build the dummy hash)
+            stats = summarize(measure(login, repeat))
+            self.stdout.write(
+                f"{name:<42}{case:<10}{stats['mean']:>8.1f}ms{stats['p95']:>8.1f}ms{1000 / stats['mean']:>15.1f}"
+            )
@@ -0,0 +1,96 @@
+"""
+Compare full-text catalog search against the old icontains SearchFilter.
+
+    python manage.py bench_search --products 100000
+"""
+import random
+
+from django.core.management.base import BaseCommand
+from rest_framework import filters
+
+from api import search
+from api.benchmarking import measure, request_factory, scratch_transaction, summarize
+from api.models import Category, Product
+from api.views import ProductListView
+
+WORDS = [
+    'wireless', 'bluetooth', 'headphones', 'smart', 'watch', 'cotton', 'shirt',
+    'denim', 'jeans', 'python', 'guide', 'novel', 'cookware', 'kettle', 'yoga',
+    'mat', 'resistance', 'bands', 'blocks', 'remote', 'skincare', 'straightener',
+    'phone', 'holder', 'vacuum', 'premium', 'portable', 'classic', 'deluxe', 'mini',
+]
+CATEGORIES = ['Electronics', 'Clothing', 'Books', 'Home & Kitchen', 'Sports', 'Toys', 'Beauty', 'Automotive']
+# Long-tail vocabulary so descriptions look more like real copy than keyword soup
+FILLER = [f'term{i}' for i in range(5000)]
+TERMS = ['wire', 'wireless headphones', 'kettle', 'automotive', 'nomatchterm']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark full-text product search against the icontains SearchFilter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=100000)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--keep', action='store_true', help='Keep the generated products')
+
+    def handle(self, *args, **options):
+        if not search.is_supported():
+            self.stderr.write('Full-text search is not available on this database; '
+                              'only the icontains baseline would run.')
+
+        with scratch_transaction(keep=options['keep']):
+            self.seed(options['products'], random.Random(options['seed']))
+            self.run(options['repeat'])
+
+    def seed(self, count, rng):
+        self.stdout.write(f'Seeding {count} products...')
+        categories = [
+            Category.objects.get_or_create(name=name, defaults={'slug': f'bench-{i}'})[0]
+            for i, name in enumerate(CATEGORIES)
+        ]
+        batch = []
+        for i in range(count):
+            words = rng.sample(WORDS, 3)
+            batch.append(Product(
+                name=' '.join(words).title(),
+                slug=f'bench-product-{i}',
+                category=rng.choice(categories),
+                description=' '.join(rng.choices(FILLER, k=38) + rng.sample(WORDS, 2)),
+                price=rng.randint(100, 20000),
+                weight=1,
+                stock=rng.randint(0, 100),
+            ))
+            if len(batch) == 5000:
+                self.flush(batch)
+        self.flush(batch)
+
+    def flush(self, batch):
+        created = Product.objects.bulk_create(batch)
+        ids = [p.pk for p in created if p.pk]
+        if len(ids) == len(created):
+            search.index_products(ids)
+        else:
+            search.rebuild_index()
+        batch.clear()
+
+    def run(self, repeat):
+        factory = request_factory()
+        backends = {
+            'fulltext': ProductListView.as_view(throttle_classes=[]),
+            'icontains': ProductListView.as_view(
+                throttle_classes=[],
+                filter_backends=[filters.SearchFilter, filters.OrderingFilter],
+            ),
+        }
+
+        self.stdout.write(f"{'term':<24}{'backend':<12}{'hits':>8}{'p50 ms':>10}{'p95 ms':>10}")
+        for term in TERMS:
+            for name, view in backends.items():
+                request = lambda: view(factory.get('/api/products/', {'search': term}))
+                response = request()
+                stats = summarize(measure(lambda: request().render(), repeat))
+                self.stdout.write(
+                    f"{term:<24}{name:<12}{response.data['count']:>8}"
+                    f"{stats['p50']:>10.1f}{stats['p95']:>10.1f}"
+                )
@@ -0,0 +1,108 @@
+"""
+Checkout contention on a single best-seller.
+
+    python manage.py bench_stock_contention --threads 16 --seconds 5 --shards 16
+
+Every thread sells one unit at a time of the same product through
+`inventory.decrement_stock`, inside a transaction shaped like checkout.
+The product is sold once with plain stock and once with its stock spread
+over `--shards` counter rows.
+
+SQLite locks the whole database for a write, so sharding rows cannot add
+write concurrency there; the figures are only meaningful on PostgreSQL,
+where each conditional UPDATE locks just the row it touches.
+"""
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from django.test.utils import override_settings
+
+from api import inventory, metrics
+from api.benchmarking import percentile
+from api.models import Category, Product
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent sales of one product with and without sharded stock'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--shards', type=int, default=16)
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.stdout.write(f'database: {connection.vendor}')
+        category = Category.objects.create(name='Bench contention', slug='bench-contention')
+        try:
+            rows = [
+                self.run_profile('plain', category, 0),
+                self.run_profile(f"{options['shards']} shards", category, options['shards']),
+            ]
+        finally:
+            connections.close_all()
+            category.delete()
+            metrics.refresh_product_count()
+
+        self.stdout.write(f"\n{'profile':<12}{'sales/s':>10}{'sales':>8}{'errors':>8}{'p50':>10}{'p95':>10}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['profile']:<12}{row['rate']:>10.0f}{row['sales']:>8}{row['errors']:>8}"
+                f"{row['p50']:>8.1f}ms{row['p95']:>8.1f}ms"
+            )
+
+    def run_profile(self, name, category, shards):
+        product = Product.objects.create(
+            name=f'Contention {name}', slug=f"bench-contention-{shards}", category=category,
+            description='', price=100, weight=1, stock=10_000_000,
+        )
+        if shards:
+            inventory.shard_stock(product, shards)
+        connections.close_all()
+
+        stop = time.perf_counter() + self.options['seconds']
+        results = []
+        # Holds are out of scope: measure the stock write alone
+        with override_settings(STOCK_HOLD_TTL=0):
+            threads = [
+                threading.Thread(target=self.worker, args=(product, stop, results))
+                for _ in range(self.options['threads'])
+            ]
+            started = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - started
+
+        sales = [ms for kind, ms in results if kind == 'sale']
+        inventory.sync_sharded_stock([product.pk])
+        product.refresh_from_db()
+        if product.stock != 10_000_000 - len(sales):
+            raise AssertionError(f'{name}: stock {product.stock} does not match {len(sales)} sales')
+        return {
+            'profile': name,
+            'rate': len(sales) / elapsed,
+            'sales': len(sales),
+            'errors': sum(1 for kind, _ in results if kind == 'error'),
+            'p50': percentile(sales, 50) if sales else 0,
+            'p95': percentile(sales, 95) if sales else 0,
+        }
+
+    def worker(self, product, stop, results):
+        local = []
+        try:
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        inventory.decrement_stock(product, 1)
+                except OperationalError:
+                    local.append(('error', 0))
+                else:
+                    local.append(('sale', (time.perf_counter() - start) * 1000))
+        finally:
+            connection.close()
+            results.extend(local)
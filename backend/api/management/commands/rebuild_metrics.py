@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api import metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute dashboard counters and daily revenue buckets from orders and products'
+
+    def handle(self, *args, **options):
+        metrics.rebuild()
+        counters = metrics.snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt metrics: {counters['total_orders']} orders, "
+            f"{counters['total_revenue']} revenue, {counters['total_products']} products"
+        ))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import inventory
+
+
+class Command(BaseCommand):
+    help = 'Release expired stock holds and refresh sharded stock totals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Sweep once and exit')
+        parser.add_argument('--interval', type=float, default=30.0, help='Seconds between sweeps')
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Recompute every reserved counter from the hold rows first')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write(f'Rebuilt reserved counters for {inventory.rebuild_reserved()} products')
+        while True:
+            released = inventory.release_expired()
+            if released:
+                self.stdout.write(f'Released {released} held units')
+            synced = inventory.sync_sharded_stock()
+            if synced:
+                self.stdout.write(f'Refreshed stock totals for {synced} sharded products')
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api import jobs
+
+
+class Command(BaseCommand):
+    help = 'Process queued product import jobs (use with IMPORT_JOB_RUNNER=worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds between queue polls')
+
+    def handle(self, *args, **options):
+        while True:
+            failed, _ = jobs.recover()
+            if failed:
+                self.stdout.write(f'Failed {failed} import job(s) whose worker stopped responding')
+            for job_id in jobs.pending_job_ids():
+                self.stdout.write(f'Running import job {job_id}')
+                jobs.run_job(job_id)
+            if options['once']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,405 @@
+"""
+Seed the demo catalog, optionally with a synthetic data set at production scale.
+
+    python manage.py seed_data
+    python manage.py seed_data --users 1000000 --products 200000 --orders 3000000 --carts 50000
+
+Without volume options this creates the admin account and the demo
+categories and products, skipping whatever already exists.
+
+Synthetic rows are written with `bulk_create` in batches, one transaction
+per batch, and are reproducible: the same options, `--seed` and
+`--end-date` generate the same rows. The distributions are skewed the way
+real traffic is:
+
+* hot products: items pick products with Zipf weights (`--skew`), so a few
+  best-sellers appear in a large share of orders and carts;
+* repeat buyers: orders pick customers with flatter Zipf weights, so most
+  users order rarely or never and a small group orders often;
+* seasonal dates: orders span `--days` up to `--end-date`, with a
+  festive-season peak in October/November, busier weekends and evenings,
+  and volume growing over the period. Older orders are mostly delivered.
+
+Synthetic users share the password given by `--password`, hashed once.
+The search index and dashboard counters are rebuilt at the end.
+"""
+import bisect
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from api import caching, metrics, search
+from api.models import Cart, Category, Order, OrderItem, Product, User
+
+ADMIN_USERNAME = 'admin'
+ADMIN_PASSWORD = 'Admin@12345'
+
+DEMO_CATEGORIES = ['Electronics', 'Clothing', 'Books', 'Home & Kitchen', 'Sports', 'Toys', 'Beauty', 'Automotive']
+
+# (name, category, description, price, weight, stock, image)
+DEMO_PRODUCTS = [
+    ('Wireless Bluetooth Headphones', 'Electronics',
+     'Premium quality wireless headphones with noise cancellation and 30-hour battery life.',
+     '2999.00', '0.25', 50, 'https://images.unsplash.com/photo-1505740420928-5e560c06d30e?w=500'),
+    ('Smart Watch Series 5', 'Electronics',
+     'Latest smartwatch with health tracking, GPS, and waterproof design.',
+     '15999.00', '0.15', 30, 'https://images.unsplash.com/photo-1523275335684-37898b6baf30?w=500'),
+    ('Cotton T-Shirt (Pack of 3)', 'Clothing',
+     'Comfortable 100% cotton t-shirts in assorted colors.',
+     '799.00', '0.40', 100, 'https://images.unsplash.com/photo-1521572163474-6864f9cf17ab?w=500'),
+    ('Denim Jeans - Slim Fit', 'Clothing',
+     'Classic slim fit denim jeans with stretch comfort.',
+     '1499.00', '0.60', 75, 'https://images.unsplash.com/photo-1542272604-787c3835535d?w=500'),
+    ('The Complete Python Guide', 'Books',
+     'Comprehensive guide to Python programming for beginners to advanced.',
+     '599.00', '0.80', 40, 'https://images.unsplash.com/photo-1589998059171-988d887df646?w=500'),
+    ('Fiction Novel - Bestseller', 'Books',
+     'Award-winning fiction novel by renowned author.',
+     '399.00', '0.50', 60, 'https://images.unsplash.com/photo-1544947950-fa07a98d237f?w=500'),
+    ('Non-Stick Cookware Set', 'Home & Kitchen',
+     '5-piece non-stick cookware set with glass lids.',
+     '3499.00', '4.50', 25, 'https://images.unsplash.com/photo-1556911220-bff31c812dba?w=500'),
+    ('Electric Kettle 1.8L', 'Home & Kitchen',
+     'Fast boiling electric kettle with auto shut-off feature.',
+     '899.00', '1.20', 45, 'https://images.unsplash.com/photo-1564890369478-c89ca6d9cde9?w=500'),
+    ('Yoga Mat with Carry Bag', 'Sports',
+     'Premium quality yoga mat with excellent grip and cushioning.',
+     '1299.00', '1.50', 35, 'https://images.unsplash.com/photo-1601925260368-ae2f83cf8b7f?w=500'),
+    ('Resistance Bands Set', 'Sports',
+     'Set of 5 resistance bands for home workout.',
+     '799.00', '0.80', 50, 'https://images.unsplash.com/photo-1598289431512-b97b0917affc?w=500'),
+    ('Educational Building Blocks', 'Toys',
+     'Creative building blocks set for kids aged 3+.',
+     '1199.00', '2.00', 40, 'https://images.unsplash.com/photo-1572635196237-14b3f281503f?w=500'),
+    ('Remote Control Car', 'Toys',
+     'High-speed RC car with rechargeable battery.',
+     '2499.00', '1.80', 20, 'https://images.unsplash.com/photo-1558618666-fcd25c85cd64?w=500'),
+    ('Skincare Gift Set', 'Beauty',
+     'Complete skincare routine set with cleanser, toner, and moisturizer.',
+     '1999.00', '0.70', 30, 'https://images.unsplash.com/photo-1556228720-195a672e8a03?w=500'),
+    ('Hair Straightener', 'Beauty',
+     'Ceramic hair straightener with adjustable temperature.',
+     '1599.00', '0.50', 25, 'https://images.unsplash.com/photo-1522338242992-e1a54906a8da?w=500'),
+    ('Car Phone Holder', 'Automotive',
+     'Universal car phone mount with 360-degree rotation.',
+     '399.00', '0.20', 80, 'https://images.unsplash.com/photo-1591768575649-dcc9e2f9c1e1?w=500'),
+    ('Car Vacuum Cleaner', 'Automotive',
+     'Portable car vacuum with powerful suction.',
+     '1899.00', '1.00', 35, 'https://images.unsplash.com/photo-1607860108855-64acf2078ed9?w=500'),
+]
+
+ADJECTIVES = ['Classic', 'Premium', 'Compact', 'Portable', 'Wireless', 'Organic', 'Deluxe', 'Smart',
+              'Eco', 'Ultra', 'Vintage', 'Pro', 'Essential', 'Rugged', 'Slim', 'Family']
+NOUNS = ['Speaker', 'Jacket', 'Notebook', 'Blender', 'Racket', 'Puzzle', 'Serum', 'Charger', 'Lamp',
+         'Backpack', 'Bottle', 'Sneakers', 'Camera', 'Mixer', 'Helmet', 'Candle', 'Keyboard', 'Tent']
+
+# Relative order volume per month and per hour of the day
+MONTH_WEIGHTS = {1: 0.8, 2: 0.8, 3: 0.9, 4: 0.9, 5: 1.0, 6: 0.9, 7: 1.0, 8: 1.1, 9: 1.1, 10: 1.6, 11: 1.8, 12: 1.3}
+HOUR_WEIGHTS = [1, 1, 1, 1, 1, 1, 2, 3, 4, 5, 5, 6, 6, 6, 6, 6, 6, 7, 8, 9, 10, 9, 6, 3]
+# Shoppers are repeat buyers more often than products are best-sellers
+BUYER_SKEW = 0.7
+
+
+def zipf_cum_weights(count, exponent):
+    """Cumulative Zipf weights for `count` ranks, for `random.choices(cum_weights=...)`"""
+    total = 0.0
+    cum = []
+    for rank in range(1, count + 1):
+        total += 1 / rank ** exponent
+        cum.append(total)
+    return cum
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let generated rows keep their own values in `auto_now`/`auto_now_add` fields"""
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = 'Seed the demo catalog and optionally generate users, products, carts and orders in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0)
+        parser.add_argument('--products', type=int, default=0)
+        parser.add_argument('--orders', type=int, default=0)
+        parser.add_argument('--carts', type=int, default=0, help='Users given an active cart')
+        parser.add_argument('--categories', type=int, default=len(DEMO_CATEGORIES),
+                            help='Categories for generated products (the demo ones first)')
+        parser.add_argument('--items-per-order', type=float, default=2.5, help='Mean order lines per order')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent of product popularity')
+        parser.add_argument('--days', type=int, default=365, help='Days of order history')
+        parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                            help='Last day of order history, YYYY-MM-DD (default: today)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='seed', help='Username and slug prefix of generated rows')
+        parser.add_argument('--password', default='User@12345', help='Password of generated users')
+
+    def handle(self, *args, **options):
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.batch_size = options['batch_size']
+        self.end = options['end_date'] or timezone.localdate()
+
+        self.create_admin()
+        categories = self.create_demo_catalog()
+
+        synthetic = options['users'] or options['products'] or options['orders'] or options['carts']
+        if not synthetic:
+            self.stdout.write(self.style.SUCCESS(
+                f'Database seeded. Admin credentials: {ADMIN_USERNAME} / {ADMIN_PASSWORD}'
+            ))
+            return
+
+        if (options['orders'] or options['carts']) and not (options['users'] and options['products']):
+            raise CommandError('--orders and --carts need --users and --products')
+        if (
+            User.objects.filter(username=f'{self.prefix}-user-0').exists() or
+            Product.objects.filter(slug=f'{self.prefix}-product-0').exists()
+        ):
+            raise CommandError(f"Rows with prefix '{self.prefix}' already exist; pass another --prefix")
+
+        started = time.perf_counter()
+        categories = self.create_categories(categories)
+        user_ids = self.create_users()
+        products = self.create_products(categories)
+        if options['orders']:
+            self.create_orders(user_ids, products)
+        if options['carts']:
+            self.create_carts(user_ids, products)
+
+        self.stdout.write('Rebuilding the search index and dashboard counters...')
+        search.index_products([pk for pk, _ in products])
+        metrics.rebuild()
+        caching.bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - started:.1f}s'))
+
+    def report(self, table, rows, started):
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(f'{table:<12}{rows:>12,} rows in {elapsed:>7.1f}s ({rate:>10,.0f} rows/s)')
+
+    def batches(self, count):
+        for start in range(0, count, self.batch_size):
+            yield range(start, min(count, start + self.batch_size))
+
+    # ============= Demo data =============
+    def create_admin(self):
+        if User.objects.filter(username=ADMIN_USERNAME).exists():
+            self.stdout.write('Admin user already exists')
+            return
+        User.objects.create_user(
+            username=ADMIN_USERNAME, email='admin@example.com', password=ADMIN_PASSWORD,
+            first_name='Admin', last_name='User', role='admin', is_staff=True, is_superuser=True,
+        )
+        self.stdout.write(f'Admin user created: {ADMIN_USERNAME} / {ADMIN_PASSWORD}')
+
+    def create_demo_catalog(self):
+        before = Category.objects.count(), Product.objects.count()
+        Category.objects.bulk_create(
+            [Category(name=name, slug=slugify(name)) for name in DEMO_CATEGORIES], ignore_conflicts=True
+        )
+        categories = {category.name: category for category in Category.objects.filter(name__in=DEMO_CATEGORIES)}
+        Product.objects.bulk_create([
+            Product(
+                name=name, slug=slugify(name), category=categories[category], description=description,
+                price=Decimal(price), weight=Decimal(weight), stock=stock, image=image, is_active=True,
+            )
+            for name, category, description, price, weight, stock, image in DEMO_PRODUCTS
+        ], ignore_conflicts=True)
+        search.index_products(
+            Product.objects.filter(slug__in=[slugify(row[0]) for row in DEMO_PRODUCTS]).values_list('id', flat=True)
+        )
+        metrics.refresh_product_count()
+        caching.bump_catalog_version()
+        self.stdout.write(
+            f'Created {Category.objects.count() - before[0]} categories, '
+            f'{Product.objects.count() - before[1]} demo products'
+        )
+        return [categories[name] for name in DEMO_CATEGORIES]
+
+    # ============= Synthetic data =============
+    def create_categories(self, categories):
+        extra = self.options['categories'] - len(categories)
+        if extra > 0:
+            categories = categories + Category.objects.bulk_create([
+                Category(name=f'{self.prefix.title()} category {i}', slug=f'{self.prefix}-category-{i}')
+                for i in range(extra)
+            ])
+        return categories[:max(self.options['categories'], 1)]
+
+    def create_users(self):
+        count = self.options['users']
+        started = time.perf_counter()
+        password = make_password(self.options['password'])
+        first_joined = self.end - timedelta(days=self.options['days'] * 2)
+        span_seconds = (self.end - first_joined).days * 86400
+        start_dt = timezone.make_aware(datetime.combine(first_joined, dt_time()))
+        ids = []
+        for batch in self.batches(count):
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        username=f'{self.prefix}-user-{i}', email=f'{self.prefix}-user-{i}@example.com',
+                        password=password, role='user',
+                        date_joined=start_dt + timedelta(seconds=self.rng.randrange(span_seconds)),
+                    )
+                    for i in batch
+                ])
+            ids += [user.pk for user in users]
+        self.report('users', count, started)
+        return ids
+
+    def create_products(self, categories):
+        """Create the products; returns (pk, price) pairs, hottest first"""
+        count = self.options['products']
+        rng = self.rng
+        started = time.perf_counter()
+        start_dt = timezone.make_aware(datetime.combine(self.end - timedelta(days=self.options['days']), dt_time()))
+        span_seconds = self.options['days'] * 86400
+        products = []
+        with explicit_timestamps(Product._meta.get_field('created_at'), Product._meta.get_field('updated_at')):
+            for batch in self.batches(count):
+                rows = []
+                for i in batch:
+                    created = start_dt + timedelta(seconds=rng.randrange(span_seconds))
+                    name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}'
+                    rows.append(Product(
+                        name=name, slug=f'{self.prefix}-product-{i}', category=rng.choice(categories),
+                        description=f'{name}: generated product for load testing.',
+                        # Log-normal prices: mostly a few hundred, with a long tail
+                        price=Decimal(min(max(round(rng.lognormvariate(6.8, 1.0)), 49), 199999)),
+                        weight=Decimal(rng.randint(1, 500)) / 100,
+                        stock=0 if rng.random() < 0.05 else rng.randint(1, 500),
+                        is_active=rng.random() < 0.95,
+                        created_at=created, updated_at=created,
+                    ))
+                with transaction.atomic():
+                    Product.objects.bulk_create(rows)
+                products += [(product.pk, product.price) for product in rows]
+        self.report('products', count, started)
+        # Popularity is independent of creation order
+        rng.shuffle(products)
+        return products
+
+    def order_clock(self, count):
+        """
+        Maps order number to timestamp: `count` orders spread over the history
+        with seasonal, weekly and daily patterns, in chronological order so
+        ids and `created_at` grow together as they do in production.
+        """
+        days = [self.end - timedelta(days=n) for n in range(self.options['days'] - 1, -1, -1)]
+        day_weights = list(accumulate(
+            MONTH_WEIGHTS[day.month] * (1.3 if day.weekday() >= 5 else 1.0) * (1 + n / len(days))
+            for n, day in enumerate(days)
+        ))
+        hour_weights = list(accumulate(HOUR_WEIGHTS))
+
+        def clock(i):
+            # Quantile of order i, located in the day weights, then the hour weights
+            position = (i + self.rng.random()) / count * day_weights[-1]
+            day = min(bisect.bisect(day_weights, position), len(days) - 1)
+            previous = day_weights[day - 1] if day else 0
+            within = (position - previous) / (day_weights[day] - previous) * hour_weights[-1]
+            hour = min(bisect.bisect(hour_weights, within), 23)
+            previous = hour_weights[hour - 1] if hour else 0
+            second = min(int((within - previous) / HOUR_WEIGHTS[hour] * 3600), 3599)
+            return timezone.make_aware(datetime.combine(days[day], dt_time(hour, second // 60, second % 60)))
+        return clock
+
+    def order_status(self, created):
+        age = (self.end - timezone.localtime(created).date()).days
+        if self.rng.random() < 0.04:
+            return 'Cancelled'
+        if age <= 1:
+            return 'Pending'
+        if age <= 3:
+            return 'Processing'
+        if age <= 7:
+            return 'Shipped'
+        return 'Delivered'
+
+    def pick_products(self, products, product_weights, lines):
+        chosen = {}
+        while len(chosen) < min(lines, len(products)):
+            pk, price = products[bisect.bisect(product_weights, self.rng.random() * product_weights[-1])]
+            chosen[pk] = price
+        return chosen
+
+    def create_orders(self, user_ids, products):
+        count = self.options['orders']
+        rng = self.rng
+        started = time.perf_counter()
+        # Buyer popularity is independent of signup order
+        buyers = user_ids[:]
+        rng.shuffle(buyers)
+        buyer_weights = zipf_cum_weights(len(buyers), BUYER_SKEW)
+        product_weights = zipf_cum_weights(len(products), self.options['skew'])
+        extra_lines = max(self.options['items_per_order'] - 1, 0)
+        clock = self.order_clock(count)
+        items = 0
+
+        created_at = Order._meta.get_field('created_at')
+        updated_at = Order._meta.get_field('updated_at')
+        with explicit_timestamps(created_at, updated_at):
+            for batch in self.batches(count):
+                customers = rng.choices(buyers, cum_weights=buyer_weights, k=len(batch))
+                orders, lines = [], []
+                for i, user_id in zip(batch, customers):
+                    created = clock(i)
+                    quantity_lines = 1 + min(int(rng.expovariate(1 / extra_lines)) if extra_lines else 0, 9)
+                    chosen = self.pick_products(products, product_weights, quantity_lines)
+                    order = Order(
+                        user_id=user_id, order_id=f'ORD-{self.prefix.upper()}{i:09d}',
+                        status=self.order_status(created), total_amount=0,
+                        shipping_address=f'{rng.randint(1, 999)} Market Road', shipping_city='Pune',
+                        shipping_state='Maharashtra', shipping_pincode=f'4110{rng.randint(10, 99)}',
+                        shipping_phone=f'9{rng.randrange(10 ** 9):09d}',
+                        created_at=created, updated_at=created,
+                    )
+                    for pk, price in chosen.items():
+                        quantity = 1 if rng.random() < 0.8 else rng.randint(2, 4)
+                        order.total_amount += price * quantity
+                        lines.append(OrderItem(order=order, product_id=pk, quantity=quantity, price=price))
+                    orders.append(order)
+                with transaction.atomic():
+                    Order.objects.bulk_create(orders)
+                    OrderItem.objects.bulk_create(lines, batch_size=self.batch_size)
+                items += len(lines)
+        self.report('orders', count, started)
+        self.report('order items', items, started)
+
+    def create_carts(self, user_ids, products):
+        count = min(self.options['carts'], len(user_ids))
+        rng = self.rng
+        started = time.perf_counter()
+        product_weights = zipf_cum_weights(len(products), self.options['skew'])
+        shoppers = rng.sample(user_ids, count)
+        rows = 0
+        for batch in self.batches(count):
+            lines = []
+            for n in batch:
+                for pk in self.pick_products(products, product_weights, rng.randint(1, 4)):
+                    lines.append(Cart(user_id=shoppers[n], product_id=pk, quantity=rng.randint(1, 2)))
+            with transaction.atomic():
+                Cart.objects.bulk_create(lines)
+            rows += len(lines)
+        self.report('cart lines', rows, started)
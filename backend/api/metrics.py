@@ -0,0 +1,171 @@
+"""
+Incrementally maintained dashboard metrics.
+
+Instead of aggregating the orders and products tables on every dashboard
+load, order/product writes adjust a handful of counter rows with atomic
+`F()` updates:
+
+* ``MetricCounter('orders')``: order count and total revenue
+* ``MetricCounter('status:<Status>')``: orders per status
+* ``MetricCounter('products')``: product count
+* ``DailyOrderStats``: orders and revenue per (local) day
+
+Every checkout touches the same few counter rows, so the updates are
+applied once the order's transaction commits (`transaction.on_commit`)
+rather than inside it: each is then a single autocommitted statement and
+checkouts do not queue on the counter row locks until they commit.
+
+`rebuild()` (``python manage.py rebuild_metrics``) recomputes everything
+from the source tables if the counters ever drift, e.g. after raw SQL
+maintenance or a process dying between a commit and its counter updates.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyOrderStats, MetricCounter, Order, Product
+
+ORDERS = 'orders'
+PRODUCTS = 'products'
+STATUS_PREFIX = 'status:'
+
+
+def status_key(status):
+    return f'{STATUS_PREFIX}{status}'
+
+
+def _upsert(model, lookup, **deltas):
+    """Add `deltas` to the row matching `lookup`, creating it if needed"""
+    updates = {field: F(field) + delta for field, delta in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        model.objects.filter(**lookup).update(**updates)
+
+
+def increment(name, count=0, amount=0):
+    _upsert(MetricCounter, {'name': name}, count=count, amount=amount)
+
+
+def _order_delta(order, sign):
+    amount = Decimal(order.total_amount) * sign
+    status = order.status
+    day = timezone.localdate(order.created_at)
+
+    def apply():
+        increment(ORDERS, count=sign, amount=amount)
+        increment(status_key(status), count=sign)
+        _upsert(DailyOrderStats, {'date': day}, order_count=sign, revenue=amount)
+    transaction.on_commit(apply)
+
+
+def record_order_created(order):
+    _order_delta(order, 1)
+
+
+def record_order_deleted(order):
+    _order_delta(order, -1)
+
+
+def record_amount_change(order, old_amount):
+    """Move revenue by an edit of `order.total_amount` from `old_amount`"""
+    delta = Decimal(order.total_amount) - Decimal(old_amount)
+    if not delta:
+        return
+    day = timezone.localdate(order.created_at)
+
+    def apply():
+        increment(ORDERS, amount=delta)
+        _upsert(DailyOrderStats, {'date': day}, revenue=delta)
+    transaction.on_commit(apply)
+
+
+def record_status_change(old_status, new_status, count=1):
+    if old_status == new_status or not count:
+        return
+
+    def apply():
+        increment(status_key(old_status), count=-count)
+        increment(status_key(new_status), count=count)
+    transaction.on_commit(apply)
+
+
+def record_bulk_status_change(queryset, new_status):
+    """Call before `queryset.update(status=new_status)`, which skips signals"""
+    for row in queryset.order_by().values('status').annotate(n=Count('id')):
+        record_status_change(row['status'], new_status, row['n'])
+
+
+def set_counter(name, count=0, amount=0):
+    MetricCounter.objects.update_or_create(name=name, defaults={'count': count, 'amount': amount})
+
+
+def refresh_product_count():
+    set_counter(PRODUCTS, count=Product.objects.count())
+
+
+@transaction.atomic
+def rebuild():
+    MetricCounter.objects.all().delete()
+    DailyOrderStats.objects.all().delete()
+
+    totals = Order.objects.aggregate(count=Count('id'), amount=Sum('total_amount'))
+    counters = [
+        MetricCounter(name=ORDERS, count=totals['count'], amount=totals['amount'] or 0),
+        MetricCounter(name=PRODUCTS, count=Product.objects.count()),
+    ]
+    counters += [
+        MetricCounter(name=status_key(row['status']), count=row['n'])
+        for row in Order.objects.order_by().values('status').annotate(n=Count('id'))
+    ]
+    MetricCounter.objects.bulk_create(counters)
+
+    DailyOrderStats.objects.bulk_create([
+        DailyOrderStats(date=row['day'], order_count=row['n'], revenue=row['revenue'])
+        for row in Order.objects.order_by().annotate(
+            day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+        ).values('day').annotate(n=Count('id'), revenue=Sum('total_amount'))
+    ])
+
+
+# ============= Reads =============
+def snapshot():
+    """All counters in one query"""
+    counters = {c.name: c for c in MetricCounter.objects.all()}
+    orders = counters.get(ORDERS)
+    return {
+        'total_orders': orders.count if orders else 0,
+        'total_revenue': orders.amount if orders else Decimal('0'),
+        'total_products': counters[PRODUCTS].count if PRODUCTS in counters else 0,
+        'orders_by_status': {
+            status: counters[status_key(status)].count if status_key(status) in counters else 0
+            for status, _ in Order.STATUS_CHOICES
+        },
+    }
+
+
+def revenue_by_day(days=30):
+    """Daily buckets for the last `days` days, oldest first, with gaps filled"""
+    today = timezone.localdate()
+    start = today - timedelta(days=days - 1)
+    buckets = {
+        row.date: row for row in DailyOrderStats.objects.filter(date__gte=start, date__lte=today)
+    }
+    series = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        row = buckets.get(day)
+        series.append({
+            'date': day.isoformat(),
+            'orders': row.order_count if row else 0,
+            'revenue': float(row.revenue) if row else 0.0,
+        })
+    return series
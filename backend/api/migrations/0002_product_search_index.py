@@ -0,0 +1,60 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:34
+
+import api.search
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE api_product_fts USING fts5("
+            "name, category_name, description, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE api_product_fts ("
+            "rowid bigint PRIMARY KEY REFERENCES api_product (id) ON DELETE CASCADE "
+            "DEFERRABLE INITIALLY DEFERRED, "
+            "api_product_fts tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            "CREATE INDEX api_product_fts_gin ON api_product_fts USING GIN (api_product_fts)"
+        )
+    else:
+        return
+
+    Product = apps.get_model('api', 'Product')
+    api.search.index_products(
+        Product.objects.using(connection.alias).values_list('id', flat=True),
+        using=connection.alias,
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in api.search.SUPPORTED_VENDORS:
+        schema_editor.execute('DROP TABLE IF EXISTS api_product_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('product', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_document', serialize=False, to='api.product')),
+                ('document', api.search.SearchDocumentField(db_column='api_product_fts')),
+            ],
+            options={
+                'db_table': 'api_product_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
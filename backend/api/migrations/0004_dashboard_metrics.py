@@ -0,0 +1,66 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:46
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+
+def backfill_metrics(apps, schema_editor):
+    db = schema_editor.connection.alias
+    Order = apps.get_model('api', 'Order')
+    Product = apps.get_model('api', 'Product')
+    MetricCounter = apps.get_model('api', 'MetricCounter')
+    DailyOrderStats = apps.get_model('api', 'DailyOrderStats')
+
+    orders = Order.objects.using(db).order_by()
+    totals = orders.aggregate(count=Count('id'), amount=Sum('total_amount'))
+    counters = [
+        MetricCounter(name='orders', count=totals['count'], amount=totals['amount'] or 0),
+        MetricCounter(name='products', count=Product.objects.using(db).count()),
+    ]
+    counters += [
+        MetricCounter(name=f"status:{row['status']}", count=row['n'])
+        for row in orders.values('status').annotate(n=Count('id'))
+    ]
+    MetricCounter.objects.using(db).bulk_create(counters)
+
+    DailyOrderStats.objects.using(db).bulk_create([
+        DailyOrderStats(date=row['day'], order_count=row['n'], revenue=row['revenue'])
+        for row in orders.annotate(
+            day=TruncDate('created_at', tzinfo=timezone.get_current_timezone())
+        ).values('day').annotate(n=Count('id'), revenue=Sum('total_amount'))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_importjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyOrderStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('order_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'verbose_name_plural': 'Daily order stats',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MetricCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('count', models.BigIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+        ),
+        migrations.RunPython(backfill_metrics, migrations.RunPython.noop),
+    ]
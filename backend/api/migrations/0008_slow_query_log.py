@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_stock_shards'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('slot', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('recorded_at', models.DateTimeField()),
+                ('duration_ms', models.FloatField()),
+                ('database', models.CharField(max_length=50)),
+                ('sql', models.TextField(help_text='Normalized statement, without parameters')),
+                ('view', models.CharField(blank=True, max_length=255)),
+                ('call_site', models.CharField(blank=True, max_length=255)),
+                ('plan', models.TextField(blank=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Slow queries',
+                'ordering': ['-recorded_at'],
+            },
+        ),
+    ]
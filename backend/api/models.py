@@ -1,6 +1,10 @@
+import uuid
 from django.db import models
+from django.db.models.functions import Substr
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+from .search import SearchDocumentField
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -24,6 +28,25 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class ProductQuerySet(models.QuerySet):
+    """Catalog query layer shared by the public and admin product views"""
+    LIST_EXCERPT_LENGTH = 200
+
+    def active(self):
+        return self.filter(is_active=True)
+
+    def with_category(self):
+        return self.select_related('category')
+
+    def for_listing(self):
+        """
+        Join categories and skip the full description on list pages,
+        exposing a short DB-side excerpt as `description_excerpt` instead.
+        """
+        return self.with_category().defer('description').annotate(
+            description_excerpt=Substr('description', 1, self.LIST_EXCERPT_LENGTH)
+        )
+
 class Product(models.Model):
     name = models.CharField(max_length=255)
     slug = models.SlugField(max_length=255, unique=True)
@@ -32,16 +55,51 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
     weight = models.DecimalField(max_digits=6, decimal_places=2, help_text="Weight in kg", validators=[MinValueValidator(0)])
     stock = models.IntegerField(validators=[MinValueValidator(0)])
+    # Units held for carts (sum of StockHold.quantity), maintained by api.inventory
+    reserved = models.PositiveIntegerField(default=0, editable=False)
+    stock_shards = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Spread stock over this many counter rows so concurrent checkouts do not queue on one row (0 = off)"
+    )
     image = models.URLField(max_length=500, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
     
+    objects = ProductQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        # Partial indexes over active products: the catalog only ever reads those,
+        # and `filter(is_active=True)` compiles to a bare `WHERE is_active` on
+        # SQLite, which cannot seek into an index that leads with is_active
+        indexes = [
+            # Catalog listing: newest first
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True),
+                         name='product_active_created_idx'),
+            # Catalog filters: category page with a price range / price ordering
+            models.Index(fields=['category', 'price'], condition=models.Q(is_active=True),
+                         name='product_active_cat_price_idx'),
+        ]
     
     def __str__(self):
         return self.name
+    
+    @property
+    def available_stock(self):
+        return max(self.stock - self.reserved, 0)
+
+class ProductSearchDocument(models.Model):
+    """Full-text index row for a product, maintained by `api.search`"""
+    product = models.OneToOneField(
+        Product, primary_key=True, on_delete=models.DO_NOTHING, db_constraint=False,
+        db_column='rowid', related_name='search_document'
+    )
+    document = SearchDocumentField(db_column='api_product_fts')
+    
+    class Meta:
+        managed = False
+        db_table = 'api_product_fts'
 
 class Cart(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart')
@@ -59,6 +117,53 @@ class Cart(models.Model):
     def total_price(self):
         return self.product.price * self.quantity
 
+class StockShard(models.Model):
+    """One slice of a sharded product's stock; `Product.stock` caches their total"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='shards')
+    index = models.PositiveSmallIntegerField()
+    stock = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ('product', 'index')
+    
+    def __str__(self):
+        return f"{self.product.name} #{self.index}: {self.stock}"
+
+class StockHold(models.Model):
+    """Units of a product set aside for a user's cart until `expires_at`"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_holds')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='holds')
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('user', 'product')
+        indexes = [
+            models.Index(fields=['expires_at'], name='stockhold_expires_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.product.name} x {self.quantity}"
+
+class OrderQuerySet(models.QuerySet):
+    def with_items(self):
+        """Join the customer and prefetch items with their products"""
+        return self.select_related('user').prefetch_related(
+            models.Prefetch('items', queryset=OrderItem.objects.select_related('product'))
+        )
+    
+    def with_item_totals(self):
+        """Join the customer and annotate `item_count`/`total_quantity` instead of loading items"""
+        queryset = self.select_related('user').annotate(
+            item_count=models.Count('items'),
+            total_quantity=models.Sum('items__quantity')
+        )
+        # Meta.ordering is not applied to aggregated queries
+        if not queryset.query.order_by:
+            queryset = queryset.order_by(*self.model._meta.ordering)
+        return queryset
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('Pending', 'Pending'),
@@ -84,12 +189,21 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = OrderQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Admin order list: newest first, optionally within a date range
+            models.Index(fields=['-created_at'], name='order_created_idx'),
+            # Admin order list filtered by status
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            # Customer order history
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.order_id:
-            import uuid
             self.order_id = f"ORD-{uuid.uuid4().hex[:8].upper()}"
         super().save(*args, **kwargs)
     
@@ -107,4 +221,83 @@ class OrderItem(models.Model):
     
     @property
     def total_price(self):
-        return self.price * self.quantity
\ No newline at end of file
+        return self.price * self.quantity
+
+class ImportJob(models.Model):
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Running', 'Running'),
+        ('Completed', 'Completed'),
+        ('Failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='import_jobs')
+    file = models.FileField(upload_to='imports/')
+    file_format = models.CharField(max_length=10)
+    upsert = models.BooleanField(default=False)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Pending')
+    
+    rows_processed = models.IntegerField(default=0)
+    imported_count = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    message = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    heartbeat_at = models.DateTimeField(blank=True, null=True, help_text='Last progress report while running')
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"Import {self.id} ({self.status})"
+    
+    @property
+    def rows_per_second(self):
+        if not self.started_at:
+            return 0
+        elapsed = ((self.finished_at or timezone.now()) - self.started_at).total_seconds()
+        return round(self.rows_processed / elapsed, 1) if elapsed > 0 else 0
+
+class MetricCounter(models.Model):
+    """Running total maintained by `api.metrics` (e.g. 'orders', 'status:Pending', 'products')"""
+    name = models.CharField(max_length=50, unique=True)
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    def __str__(self):
+        return f"{self.name}: {self.count} / {self.amount}"
+
+class DailyOrderStats(models.Model):
+    """Per-day order count and revenue bucket maintained by `api.metrics`"""
+    date = models.DateField(unique=True)
+    order_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    
+    class Meta:
+        ordering = ['-date']
+        verbose_name_plural = "Daily order stats"
+    
+    def __str__(self):
+        return f"{self.date}: {self.order_count} orders, {self.revenue}"
+
+class SlowQuery(models.Model):
+    """Slot of the slow-query ring buffer written by `api.slow_queries`"""
+    slot = models.PositiveIntegerField(primary_key=True)
+    recorded_at = models.DateTimeField()
+    duration_ms = models.FloatField()
+    database = models.CharField(max_length=50)
+    sql = models.TextField(help_text="Normalized statement, without parameters")
+    view = models.CharField(max_length=255, blank=True)
+    call_site = models.CharField(max_length=255, blank=True)
+    plan = models.TextField(blank=True)
+    
+    class Meta:
+        ordering = ['-recorded_at']
+        verbose_name_plural = "Slow queries"
+    
+    def __str__(self):
+        return f"{self.duration_ms:.0f} ms: {self.sql[:80]}"
@@ -0,0 +1,174 @@
+"""
+Pagination classes for the catalog and order lists.
+
+`PageNumberPagination` runs a COUNT(*) and an OFFSET scan per page, which
+gets slower the deeper the client pages. `KeysetPagination` seeks on the
+ordering column plus the primary key instead, so every page costs a single
+indexed range query and stays stable while rows are being inserted.
+"""
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on `(<ordering field>, id)`.
+
+    The ordering field is taken from the `ordering` query parameter when the
+    view lists it in `ordering_fields`, otherwise `default_ordering` is used.
+    No total count is returned.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering_param = api_settings.ORDERING_PARAM
+    default_ordering = '-created_at'
+    tiebreaker = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.field = queryset.model._meta.get_field(self.ordering.lstrip('-'))
+        descending = self.ordering.startswith('-')
+
+        position, self.reverse = self.decode_cursor(request)
+        # Walking backwards flips the scan direction; results are re-reversed below
+        scan_descending = descending != self.reverse
+
+        if position is not None:
+            value, pk = position
+            lookup = 'lt' if scan_descending else 'gt'
+            queryset = queryset.filter(
+                Q(**{f'{self.field.name}__{lookup}': value}) |
+                Q(**{self.field.name: value, f'{self.tiebreaker}__{lookup}': pk})
+            )
+
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field.name}', f'{prefix}{self.tiebreaker}')
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if self.reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        self.page = results
+        return results
+
+    def get_ordering(self, request, queryset, view):
+        allowed = set(getattr(view, 'ordering_fields', None) or [])
+        requested = request.query_params.get(self.ordering_param, '')
+        for term in requested.split(','):
+            term = term.strip()
+            if term and term.lstrip('-') in allowed:
+                return term
+        return self.default_ordering
+
+    def encode_cursor(self, obj, reverse):
+        payload = {
+            'v': self.field.value_to_string(obj),
+            'id': getattr(obj, self.tiebreaker),
+            'o': self.ordering,
+        }
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            if payload['o'] != self.ordering:
+                raise ValueError('cursor does not match ordering')
+            value = self.field.to_python(payload['v'])
+            pk = int(payload['id'])
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return (value, pk), bool(payload.get('r'))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class SelectablePagination(PageNumberPagination):
+    """
+    Page-number pagination by default; switches to `KeysetPagination` when
+    the request passes `?pagination=cursor` or carries a `cursor` parameter.
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def __init__(self):
+        self.keyset = None
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return (
+            params.get(self.mode_query_param) == 'cursor' or
+            self.keyset_class.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_next_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_next_link()
+        return super().get_next_link()
+
+    def get_previous_link(self):
+        if self.keyset is not None:
+            return self.keyset.get_previous_link()
+        return super().get_previous_link()
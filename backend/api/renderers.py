@@ -0,0 +1,60 @@
+"""
+JSON rendering and parsing with orjson.
+
+`JSONRenderer` and `JSONParser` are drop-in replacements for DRF's, used
+through `REST_FRAMEWORK` settings. With orjson installed and
+`settings.FAST_JSON` on, bodies are encoded and decoded by orjson. Otherwise
+DRF's stdlib implementation is used unchanged.
+
+The output matches DRF's compact, unescaped-UTF-8 JSON. Dates, times,
+datetimes, Decimals and other values orjson does not handle itself (lazy
+strings, querysets) are passed to DRF's `JSONEncoder`, so they keep the
+formats clients already see. Serializer output is plain dicts, lists and
+strings by the time it gets here, and orjson encodes those natively. The
+renderer falls back to stdlib for indented output (browsable API,
+`; indent=` in Accept) and for values orjson rejects, such as integers
+wider than 64 bits.
+"""
+from django.conf import settings
+from rest_framework import parsers, renderers
+from rest_framework.exceptions import ParseError
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    _default = JSONEncoder().default
+
+
+def enabled():
+    return orjson is not None and settings.FAST_JSON
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not enabled() or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as DRF: U+2028/U+2029 are valid JSON but end lines in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class JSONParser(parsers.JSONParser):
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not enabled() or encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
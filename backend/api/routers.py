@@ -0,0 +1,85 @@
+"""
+Read-replica routing.
+
+Reads go to the primary unless code opts in with `use_replica()` (or the
+`ReplicaReadMixin` / `reads_from_replica` helpers for views); writes always
+go to the primary. The opt-in lives in a context variable, so it is scoped
+to the current thread or task and never leaks between requests.
+
+The replica alias comes from `settings.DATABASE_REPLICA_ALIAS`; when it is
+unset every read stays on the primary. Code that must see a write that may
+not have replicated yet reads inside `use_replica(False)`; the catalog
+cache does so when it fills pages shortly after a catalog write (see
+`api.caching`).
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+_read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+def replica_alias():
+    return getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+
+
+def report_alias():
+    """Alias for reads that outlive a `use_replica()` block, e.g. streamed exports"""
+    return replica_alias() or DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_replica(enabled=True):
+    """Route reads inside the block to the replica, if one is configured; `False` keeps them on the primary"""
+    token = _read_from_replica.set(bool(enabled and replica_alias()))
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _read_from_replica.get():
+            return None
+        # Authentication must see users the moment they register
+        if model._meta.label == settings.AUTH_USER_MODEL:
+            return DEFAULT_DB_ALIAS
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        # Django would otherwise save an instance back to the database it was read from
+        instance = hints.get('instance')
+        if instance is not None and replica_alias() and instance._state.db == replica_alias():
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+
+# ============= View helpers =============
+class ReplicaReadMixin:
+    """Serve safe (GET/HEAD/OPTIONS) requests of a view from the replica"""
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            with use_replica():
+                return super().dispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+
+def reads_from_replica(view):
+    """Decorator for function views that only read"""
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with use_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,174 @@
+"""
+Full-text product search.
+
+Products are mirrored into a side table that the database can search with
+an inverted index instead of scanning `api_product` with `LIKE '%term%'`:
+
+* SQLite: an FTS5 virtual table (`rowid` = product id) ranked with bm25.
+* PostgreSQL: a table with a GIN-indexed `tsvector` column ranked with
+  ts_rank.
+
+Both live under the same table/column names so the unmanaged
+`ProductSearchDocument` model can join them to `Product` through the ORM.
+The index is kept in sync by the signal handlers in `api.signals` and by
+`index_products()` after bulk writes.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, models
+from django.db.models import Func, Value
+from rest_framework import filters
+
+SEARCH_TABLE = 'api_product_fts'
+SEARCH_COLUMN = 'api_product_fts'
+SEARCH_CONFIG = 'simple'
+SUPPORTED_VENDORS = ('sqlite', 'postgresql')
+
+# Relative weights of (name, category_name, description) for bm25
+SQLITE_WEIGHTS = (10.0, 5.0, 1.0)
+
+TERM_RE = re.compile(r'\w+', re.UNICODE)
+BATCH_SIZE = 500
+
+
+class SearchDocumentField(models.TextField):
+    """The searchable document column of `ProductSearchDocument`"""
+
+
+@SearchDocumentField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+    def as_postgresql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} @@ to_tsquery('{SEARCH_CONFIG}', {rhs})", lhs_params + rhs_params
+
+
+class SearchRank(Func):
+    """Relevance of a matched document; lower sorts first on every backend"""
+    output_field = models.FloatField()
+
+    def __init__(self, document, query):
+        super().__init__(document, Value(query))
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        document, _ = compiler.compile(self.source_expressions[0])
+        weights = ', '.join(str(w) for w in SQLITE_WEIGHTS)
+        return f'bm25({document}, {weights})', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        document, document_params = compiler.compile(self.source_expressions[0])
+        query, query_params = compiler.compile(self.source_expressions[1])
+        sql = f"-ts_rank({document}, to_tsquery('{SEARCH_CONFIG}', {query}))"
+        return sql, document_params + query_params
+
+
+def is_supported(conn=None):
+    return (conn or connection).vendor in SUPPORTED_VENDORS
+
+
+def build_query(terms, vendor=None):
+    """
+    Turn raw search terms into a prefix-matching full-text query where
+    every word must match, e.g. ['wire', 'head'] -> '"wire"* "head"*'.
+    Returns '' when the terms contain no searchable words.
+    """
+    vendor = vendor or connection.vendor
+    words = [word.lower() for term in terms for word in TERM_RE.findall(term)]
+    if not words:
+        return ''
+    if vendor == 'postgresql':
+        return ' & '.join(f'{word}:*' for word in words)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+# ============= Index maintenance =============
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def index_products(product_ids, using=None):
+    """(Re)index the given products; safe to call for new and existing rows"""
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for chunk in _chunks(product_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            if conn.vendor == 'postgresql':
+                cursor.execute(f"""
+                    INSERT INTO {SEARCH_TABLE} (rowid, {SEARCH_COLUMN})
+                    SELECT p.id,
+                           setweight(to_tsvector('{SEARCH_CONFIG}', p.name), 'A') ||
+                           setweight(to_tsvector('{SEARCH_CONFIG}', c.name), 'B') ||
+                           setweight(to_tsvector('{SEARCH_CONFIG}', p.description), 'C')
+                    FROM api_product p JOIN api_category c ON c.id = p.category_id
+                    WHERE p.id IN ({placeholders})
+                    ON CONFLICT (rowid) DO UPDATE SET {SEARCH_COLUMN} = EXCLUDED.{SEARCH_COLUMN}
+                """, chunk)
+            else:
+                cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', chunk)
+                cursor.execute(f"""
+                    INSERT INTO {SEARCH_TABLE} (rowid, name, category_name, description)
+                    SELECT p.id, p.name, c.name, p.description
+                    FROM api_product p JOIN api_category c ON c.id = p.category_id
+                    WHERE p.id IN ({placeholders})
+                """, chunk)
+
+
+def remove_products(product_ids, using=None):
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    if not is_supported(conn):
+        return
+    with conn.cursor() as cursor:
+        for chunk in _chunks(product_ids):
+            placeholders = ', '.join(['%s'] * len(chunk))
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})', chunk)
+
+
+def rebuild_index(using=None):
+    """Drop every indexed document and reindex the whole catalog"""
+    from .models import Product
+
+    conn = connections[using or DEFAULT_DB_ALIAS]
+    if not is_supported(conn):
+        return 0
+    with conn.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+    ids = list(Product.objects.using(conn.alias).values_list('id', flat=True))
+    index_products(ids, using=conn.alias)
+    return len(ids)
+
+
+# ============= DRF filter backend =============
+class ProductSearchFilter(filters.SearchFilter):
+    """
+    Drop-in replacement for `SearchFilter` on product views. Uses the
+    full-text index when the database supports it, ordering matches by
+    relevance unless the request asks for an explicit `ordering`; falls back
+    to the view's `search_fields` with icontains otherwise.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        conn = connections[queryset.db]
+        query = build_query(terms, conn.vendor)
+        if not is_supported(conn) or not query:
+            return super().filter_queryset(request, queryset, view)
+
+        return queryset.filter(
+            search_document__document__match=query
+        ).annotate(
+            search_rank=SearchRank('search_document__document', query)
+        ).order_by('search_rank', 'id')
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import Product, Category, Cart, Order, OrderItem
+from .models import Product, Category, Cart, Order, OrderItem, ImportJob
+from .carts import MAX_BATCH_OPERATIONS
 
 User = get_user_model()
 
@@ -42,13 +43,18 @@ class CategorySerializer(serializers.ModelSerializer):
 
 class ProductSerializer(serializers.ModelSerializer):
     category_name = serializers.CharField(source='category.name', read_only=True)
+    available_stock = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = Product
         fields = ['id', 'name', 'slug', 'category', 'category_name', 'description', 
-                  'price', 'weight', 'stock', 'image', 'is_active', 'created_at', 'updated_at']
+                  'price', 'weight', 'stock', 'available_stock', 'image', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
+class ProductListSerializer(ProductSerializer):
+    """Catalog list representation; expects `Product.objects.for_listing()`"""
+    description = serializers.CharField(source='description_excerpt', read_only=True)
+
 class CartSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_price = serializers.DecimalField(source='product.price', max_digits=10, decimal_places=2, read_only=True)
@@ -61,6 +67,30 @@ class CartSerializer(serializers.ModelSerializer):
                   'quantity', 'total_price', 'created_at']
         read_only_fields = ['created_at']
 
+class CartSummarySerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    item_count = serializers.IntegerField()
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2)
+
+class CartOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'set', 'remove'])
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, required=False)
+    
+    def validate(self, data):
+        if data['op'] == 'set' and 'quantity' not in data:
+            raise serializers.ValidationError({'quantity': 'This field is required.'})
+        data.setdefault('quantity', 1)
+        return data
+
+class CartBatchSerializer(serializers.Serializer):
+    operations = CartOperationSerializer(many=True, allow_empty=False)
+    
+    def validate_operations(self, value):
+        if len(value) > MAX_BATCH_OPERATIONS:
+            raise serializers.ValidationError(f'At most {MAX_BATCH_OPERATIONS} operations per request.')
+        return value
+
 class OrderItemSerializer(serializers.ModelSerializer):
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_image = serializers.URLField(source='product.image', read_only=True)
@@ -82,8 +112,30 @@ class OrderSerializer(serializers.ModelSerializer):
                   'created_at', 'updated_at', 'items']
         read_only_fields = ['order_id', 'created_at', 'updated_at']
 
+class OrderListSerializer(serializers.ModelSerializer):
+    """Admin grid row: item totals instead of nested items"""
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+    item_count = serializers.IntegerField(read_only=True)
+    total_quantity = serializers.IntegerField(read_only=True)
+    
+    class Meta:
+        model = Order
+        fields = ['id', 'order_id', 'user', 'user_email', 'status', 'total_amount',
+                  'item_count', 'total_quantity', 'created_at', 'updated_at']
+        read_only_fields = fields
+
 class OrderCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ['shipping_address', 'shipping_city', 'shipping_state', 
-                  'shipping_pincode', 'shipping_phone']
\ No newline at end of file
+                  'shipping_pincode', 'shipping_phone']
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    rows_per_second = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'status', 'file_format', 'upsert', 'rows_processed', 'imported_count',
+                  'error_count', 'errors', 'message', 'rows_per_second',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
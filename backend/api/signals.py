@@ -0,0 +1,70 @@
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+from .models import User, Category, Product, Order
+from . import authentication, caching, metrics, search
+
+
+@receiver(post_save, sender=Product)
+def index_saved_product(sender, instance, created, using, **kwargs):
+    search.index_products([instance.pk], using=using)
+    caching.invalidate_catalog()
+    if created:
+        metrics.increment(metrics.PRODUCTS, count=1)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_deleted_product(sender, instance, using, **kwargs):
+    search.remove_products([instance.pk], using=using)
+    caching.invalidate_catalog()
+    metrics.increment(metrics.PRODUCTS, count=-1)
+
+
+@receiver(post_save, sender=Category)
+def reindex_category_products(sender, instance, created, using, **kwargs):
+    caching.invalidate_catalog()
+    if created:
+        return
+    product_ids = Product.objects.using(using).filter(category=instance).values_list('id', flat=True)
+    search.index_products(product_ids, using=using)
+
+
+@receiver(post_delete, sender=Category)
+def invalidate_deleted_category(sender, instance, **kwargs):
+    caching.invalidate_catalog()
+
+
+# ============= Dashboard metrics =============
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    # Read __dict__ so deferred loads (.only()) don't trigger a query
+    instance._saved_status = instance.__dict__.get('status')
+    instance._saved_total = instance.__dict__.get('total_amount')
+
+
+@receiver(post_save, sender=Order)
+def update_order_metrics(sender, instance, created, **kwargs):
+    if created:
+        metrics.record_order_created(instance)
+    else:
+        if instance._saved_status is not None:
+            metrics.record_status_change(instance._saved_status, instance.status)
+        if instance._saved_total is not None:
+            metrics.record_amount_change(instance, instance._saved_total)
+    instance._saved_status = instance.status
+    instance._saved_total = instance.total_amount
+
+
+@receiver(post_delete, sender=Order)
+def remove_order_metrics(sender, instance, **kwargs):
+    metrics.record_order_deleted(instance)
+
+
+# ============= Authentication =============
+@receiver(post_save, sender=User)
+def refresh_auth_status(sender, instance, **kwargs):
+    authentication.remember_status(instance)
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    authentication.forget_user(instance.pk)
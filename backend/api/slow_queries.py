@@ -0,0 +1,136 @@
+"""
+Sampling slow-query log.
+
+`log_slow_queries` is installed as an execute wrapper on every database
+connection. Statements that take at least `SLOW_QUERY_THRESHOLD_MS` are
+sampled at `SLOW_QUERY_SAMPLE_RATE` and recorded with their normalized SQL
+(parameters are never stored), the route of the request and the first call
+site in project code, and the database's plan for SELECTs (`EXPLAIN QUERY
+PLAN` on SQLite, `EXPLAIN` elsewhere).
+
+Entries go into `SlowQuery`, a ring buffer of `SLOW_QUERY_LOG_SIZE` slots
+browsable in the Django admin. Slots are allocated from the table itself,
+so every process shares one buffer: the next free slot while it fills up,
+then the slot of the oldest entry. Two processes logging at the same moment
+may pick the same slot, in which case the later entry replaces the other.
+Entries are written once the surrounding transaction commits, so a request
+that rolls back leaves nothing behind and a slow statement never waits on
+its own log entry. A failed write (a locked database, a table not migrated
+yet) is logged and dropped; it never reaches the code that ran the query.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+# Transaction control is issued while Django is switching transaction state,
+# when the log cannot safely run statements of its own
+TRANSACTION_CONTROL = re.compile(r'\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)\b', re.IGNORECASE)
+
+# Set while the log writes or explains, so its own statements are not logged
+_busy = ContextVar('slow_query_log_busy', default=False)
+_this_file = os.path.abspath(__file__)
+
+
+def normalize(sql):
+    """Collapse whitespace and IN lists so repeats of a statement read the same"""
+    sql = re.sub(r'\s+', ' ', sql).strip()
+    return re.sub(r'IN \((?:%s, )*%s\)', 'IN (...)', sql)
+
+
+def call_site():
+    """First frame in project code outside this module, as 'api/views.py:123 in product_list'"""
+    root = os.path.join(str(settings.BASE_DIR), '')
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(root) and filename != _this_file:
+            return f'{os.path.relpath(filename, root)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return ''
+
+
+def explain(connection, sql, params):
+    if not re.match(r'\s*(SELECT|WITH)\b', sql, re.IGNORECASE):
+        return ''
+    try:
+        # A savepoint, so a failed EXPLAIN cannot break the caller's transaction
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    except DatabaseError as e:
+        return f'EXPLAIN failed: {e}'
+
+
+def _next_slot():
+    from .models import SlowQuery
+
+    size = settings.SLOW_QUERY_LOG_SIZE
+    log = SlowQuery.objects.filter(slot__lt=size)
+    top = log.aggregate(top=Max('slot'))['top']
+    if top is None or top + 1 < size:
+        return 0 if top is None else top + 1
+    return log.order_by('recorded_at', 'slot').values_list('slot', flat=True).first()
+
+
+def record(connection, sql, params, many, seconds):
+    from .models import SlowQuery
+
+    entry = SlowQuery(
+        recorded_at=timezone.now(),
+        duration_ms=seconds * 1000,
+        database=connection.alias,
+        sql=normalize(sql),
+        view=instrumentation.current_view()[:255],
+        call_site=call_site()[:255],
+        plan='' if many else explain(connection, sql, params),
+    )
+
+    def save():
+        token = _busy.set(True)
+        try:
+            entry.slot = _next_slot()
+            SlowQuery.objects.bulk_create(
+                [entry], update_conflicts=True, unique_fields=['slot'],
+                update_fields=['recorded_at', 'duration_ms', 'database', 'sql', 'view', 'call_site', 'plan'],
+            )
+        except DatabaseError:
+            logger.exception('Could not record a slow query')
+        finally:
+            _busy.reset(token)
+    transaction.on_commit(save, using=DEFAULT_DB_ALIAS)
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if not threshold or _busy.get() or TRANSACTION_CONTROL.match(sql):
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    seconds = time.perf_counter() - start
+    if seconds * 1000 >= threshold and random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+        token = _busy.set(True)
+        try:
+            record(context['connection'], sql, params, many, seconds)
+        finally:
+            _busy.reset(token)
+    return result
+
+
+def install(sender, connection, **kwargs):
+    """`connection_created` receiver that adds the wrapper to new connections"""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_queries)
@@ -1,7 +1,13 @@
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from .models import User, Category, Product, Order, OrderItem
+from . import metrics
 from decimal import Decimal
 
 class AdminAuthTestCase(TestCase):
@@ -279,4 +285,173 @@ class AdminSecurityTestCase(TestCase):
     def test_TC_A8_admin_dashboard_unauthorized(self):
         """TC-A8: Dashboard endpoint requires admin"""
         response = self.client.get('/api/admin/dashboard/')
-        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class AdminOrderExportTestCase(TestCase):
+    """Test streaming CSV export of orders"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='testadmin',
+            password='Admin@123',
+            role='admin',
+            is_staff=True
+        )
+        self.client.force_authenticate(self.admin)
+        self.category = Category.objects.create(name='Electronics', slug='electronics')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', slug=f'product-{i}', category=self.category,
+                description='Test', price=Decimal('10.00'), weight=Decimal('1.0'), stock=10
+            )
+            for i in range(3)
+        ]
+    
+    def create_orders(self, count):
+        for i in range(count):
+            user = User.objects.create_user(username=f'buyer{User.objects.count()}', email=f'b{i}@test.com')
+            order = Order.objects.create(
+                user=user, total_amount=Decimal('30.00'),
+                shipping_address='1 St', shipping_city='City', shipping_state='State',
+                shipping_pincode='123456', shipping_phone='1234567890'
+            )
+            for product in self.products:
+                OrderItem.objects.create(order=order, product=product, quantity=1, price=product.price)
+    
+    def export(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/admin/orders/export_csv/', {}, format='json')
+            content = b''.join(response.streaming_content).decode()
+        return response, content, len(ctx)
+    
+    def test_export_streams_all_orders(self):
+        """POST /api/admin/orders/export_csv/ streams one CSV row per order"""
+        self.create_orders(3)
+        response, content, _ = self.export()
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = content.strip().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertIn('Product 0 x 1, Product 1 x 1, Product 2 x 1', content)
+    
+    def test_export_query_count_is_constant(self):
+        """Export queries do not grow with the number of orders"""
+        self.create_orders(2)
+        _, _, small = self.export()
+        self.create_orders(10)
+        _, _, large = self.export()
+        self.assertEqual(small, large)
+
+
+class AdminDashboardMetricsTestCase(TestCase):
+    """Test dashboard counters maintained on order writes"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='testadmin', role='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+        self.category = Category.objects.create(name='Electronics', slug='electronics')
+        self.product = Product.objects.create(
+            name='Test Product', slug='test-product', category=self.category,
+            description='Test', price=Decimal('100.00'), weight=Decimal('1.0'), stock=10
+        )
+    
+    def create_order(self, amount, status='Pending'):
+        # Counters are updated once the writing transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return Order.objects.create(
+                user=self.admin, status=status, total_amount=Decimal(amount),
+                shipping_address='1 St', shipping_city='City', shipping_state='State',
+                shipping_pincode='123456', shipping_phone='1234567890'
+            )
+    
+    def dashboard(self):
+        response = self.client.get('/api/admin/dashboard/?days=7')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def test_counters_follow_order_lifecycle(self):
+        """Creating, updating and deleting orders keeps totals in sync"""
+        first = self.create_order('100.00')
+        self.create_order('50.50')
+        
+        data = self.dashboard()
+        self.assertEqual(data['total_orders'], 2)
+        self.assertEqual(data['pending_orders'], 2)
+        self.assertEqual(data['total_revenue'], 150.50)
+        self.assertEqual(data['total_products'], 1)
+        self.assertEqual(len(data['revenue_by_day']), 7)
+        self.assertEqual(data['revenue_by_day'][-1]['orders'], 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/admin/orders/{first.id}/update_status/', {'status': 'Shipped'})
+        data = self.dashboard()
+        self.assertEqual(data['pending_orders'], 1)
+        self.assertEqual(data['orders_by_status']['Shipped'], 1)
+        
+        first.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        data = self.dashboard()
+        self.assertEqual(data['total_orders'], 1)
+        self.assertEqual(data['orders_by_status']['Shipped'], 0)
+        self.assertEqual(data['total_revenue'], 50.50)
+    
+    def test_amount_edit_moves_revenue(self):
+        """Editing an order's total through the admin API adjusts revenue"""
+        order = self.create_order('100.00')
+        self.create_order('50.00')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/admin/orders/{order.id}/', {'total_amount': '80.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = self.dashboard()
+        self.assertEqual(data['total_orders'], 2)
+        self.assertEqual(data['total_revenue'], 130.00)
+        self.assertEqual(data['revenue_by_day'][-1]['revenue'], 130.00)
+        
+        before = metrics.snapshot()
+        call_command('rebuild_metrics', stdout=StringIO())
+        self.assertEqual(metrics.snapshot(), before)
+    
+    def test_counters_written_after_commit(self):
+        """Order writes leave the shared counter rows alone until they commit"""
+        with self.captureOnCommitCallbacks() as callbacks, CaptureQueriesContext(connection) as ctx:
+            Order.objects.create(
+                user=self.admin, total_amount=Decimal('10.00'),
+                shipping_address='1 St', shipping_city='City', shipping_state='State',
+                shipping_pincode='123456', shipping_phone='1234567890'
+            )
+        self.assertFalse([q for q in ctx.captured_queries if 'api_metriccounter' in q['sql']])
+        self.assertEqual(self.dashboard()['total_orders'], 0)
+        
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.dashboard()['total_orders'], 1)
+    
+    def test_rebuild_matches_incremental_counters(self):
+        """manage.py rebuild_metrics reproduces the incremental totals"""
+        self.create_order('10.00')
+        self.create_order('20.00', status='Delivered')
+        before = metrics.snapshot()
+        
+        call_command('rebuild_metrics', stdout=StringIO())
+        self.assertEqual(metrics.snapshot(), before)
+    
+    def test_dashboard_query_count_is_constant(self):
+        """Dashboard cost does not depend on table sizes"""
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                self.dashboard()
+            return len(ctx)
+        
+        self.create_order('10.00')
+        small = count_queries()
+        for _ in range(10):
+            order = self.create_order('10.00')
+            OrderItem.objects.create(order=order, product=self.product, quantity=1, price=Decimal('10.00'))
+        self.assertEqual(count_queries(), small)
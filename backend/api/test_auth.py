@@ -0,0 +1,135 @@
+from unittest import mock
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import accounts, hashers
+from .models import User
+
+PBKDF2 = 'api.hashers.PBKDF2PasswordHasher'
+
+
+@override_settings(PASSWORD_HASHERS=[PBKDF2, 'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher'],
+                   PBKDF2_ITERATIONS=1000)
+class LoginTestCase(TestCase):
+    """Test POST /api/auth/login/"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='shopper', password='User@123')
+
+    def login(self, username, password):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password})
+
+    def stored_hash(self):
+        return User.objects.get(pk=self.user.pk).password
+
+    def test_login(self):
+        """TC-L01: valid credentials get tokens; a wrong password or unknown user gets 401"""
+        response = self.login('shopper', 'User@123')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.data['tokens'])
+        self.assertEqual(response.data['user']['username'], 'shopper')
+
+        self.assertEqual(self.login('shopper', 'wrong').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login('nobody', 'User@123').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.login('', '').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_unknown_user_costs_one_hash(self):
+        """TC-L02: unknown usernames run the same single password verification as known ones"""
+        verify = hashers.PBKDF2PasswordHasher.verify
+        for username in ('shopper', 'nobody'):
+            with mock.patch.object(hashers.PBKDF2PasswordHasher, 'verify', autospec=True,
+                                   side_effect=verify) as verified:
+                self.login(username, 'wrong')
+            self.assertEqual(verified.call_count, 1, username)
+            self.assertEqual(identify_hasher(verified.call_args.args[2]).algorithm, 'pbkdf2_sha256')
+
+    def test_rehash_when_work_factor_changes(self):
+        """TC-L03: a successful login re-hashes with the configured work factor"""
+        with override_settings(PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login('shopper', 'User@123').status_code, status.HTTP_200_OK)
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$2000$'))
+
+        # Failed attempts never touch the stored hash
+        self.login('shopper', 'wrong')
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$2000$'))
+
+    def test_rehash_to_preferred_hasher(self):
+        """TC-L04: hashes from an older hasher are upgraded on the next login"""
+        User.objects.filter(pk=self.user.pk).update(password=make_password('User@123', hasher='pbkdf2_sha1'))
+
+        self.assertEqual(self.login('shopper', 'User@123').status_code, status.HTTP_200_OK)
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$1000$'))
+
+    def test_admin_login_requires_admin_role(self):
+        """TC-L05: admin login uses the same check and still rejects non-admins"""
+        response = self.client.post('/api/admin/login/', {'username': 'shopper', 'password': 'User@123'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ClaimsAuthenticationTestCase(TestCase):
+    """Test ClaimsJWTAuthentication"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='shopper', email='shopper@test.com', password='User@123')
+        self.admin = User.objects.create_user(username='boss', password='Admin@123', role='admin')
+
+    def authenticate(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {accounts.issue_tokens(user)['access']}")
+
+    def test_no_auth_queries(self):
+        """TC-L06: requests authenticate from the token claims without loading the user"""
+        self.authenticate(self.user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/cart/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([q['sql'] for q in ctx if 'api_user' in q['sql']], [])
+
+        self.authenticate(self.admin)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/admin/products/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([q['sql'] for q in ctx if 'api_user' in q['sql']], [])
+
+    def test_profile_loads_user(self):
+        """TC-L07: views that need more than the claims still see the full user"""
+        self.authenticate(self.user)
+        response = self.client.get('/api/auth/profile/')
+        self.assertEqual(response.data['email'], 'shopper@test.com')
+
+    def test_deactivation_and_role_change_revoke(self):
+        """TC-L08: saving a user as inactive or with another role invalidates its tokens"""
+        self.authenticate(self.user)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/cart/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.authenticate(self.admin)
+        self.admin.role = 'user'
+        self.admin.save()
+        self.assertEqual(self.client.get('/api/admin/products/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_status_reread_after_ttl(self):
+        """TC-L09: changes that skip signals are picked up once the cached status expires"""
+        self.authenticate(self.user)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertEqual(self.client.get('/api/cart/').status_code, status.HTTP_200_OK)
+
+        cache.clear()
+        self.assertEqual(self.client.get('/api/cart/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_tokens_without_claims(self):
+        """TC-L10: tokens issued before the claims existed still authenticate via the database"""
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get('/api/cart/').status_code, status.HTTP_200_OK)
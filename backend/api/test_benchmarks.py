@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from .management.commands import bench_endpoints
+from .models import Product
+
+
+class EndpointBudgetTestCase(TestCase):
+    """Run the endpoint benchmark on a small data set as a query-budget gate"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_endpoints_within_query_budgets(self):
+        """TC-B01: Every endpoint answers as expected within its query budget"""
+        out = StringIO()
+        call_command(
+            'bench_endpoints', products=60, orders=120, users=10, categories=3, repeat=2, stdout=out
+        )
+        report = out.getvalue()
+        for case in bench_endpoints.cases():
+            self.assertIn(case.name, report)
+        self.assertNotIn('OVER BUDGET', report)
+
+    def test_seeded_rows_are_rolled_back(self):
+        """TC-B02: The benchmark leaves no rows behind"""
+        call_command('bench_endpoints', products=20, orders=100, users=2, repeat=1, only='categories', stdout=StringIO())
+        self.assertFalse(Product.objects.exists())
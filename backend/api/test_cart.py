@@ -0,0 +1,246 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Category, Product, Cart
+from decimal import Decimal
+
+
+class CartTestCase(TestCase):
+    """Test /api/cart/"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='shopper', password='User@123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Audio', slug='audio')
+        self.products = Product.objects.bulk_create([
+            Product(
+                name=f'Product {i}', slug=f'product-{i}', category=self.category,
+                description='Test', price=Decimal('10.00') + i, weight=Decimal('1.0'), stock=5
+            )
+            for i in range(20)
+        ])
+
+    def count_queries(self, method, url, data=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, data, format='json')
+        return len(ctx), response
+
+    def test_add_creates_then_increments(self):
+        """TC-CA01: adding the same product twice increments one line"""
+        product = self.products[0]
+        response = self.client.post('/api/cart/', {'product': product.id, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['product_name'], product.name)
+
+        response = self.client.post('/api/cart/', {'product': product.id, 'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['quantity'], 5)
+        self.assertEqual(response.data['total_price'], '50.00')
+        self.assertEqual(Cart.objects.get(user=self.user, product=product).quantity, 5)
+
+    def test_add_rejects_over_stock(self):
+        """TC-CA02: the running line quantity may not exceed stock"""
+        product = self.products[0]
+        self.client.post('/api/cart/', {'product': product.id, 'quantity': 4}, format='json')
+        response = self.client.post('/api/cart/', {'product': product.id, 'quantity': 2}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Cart.objects.get(user=self.user, product=product).quantity, 4)
+
+    def test_add_validation(self):
+        """TC-CA03: bad quantities are 400, unknown or inactive products 404"""
+        for quantity in (0, -1, 'abc', 1.5):
+            response = self.client.post('/api/cart/', {'product': self.products[0].id, 'quantity': quantity}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, quantity)
+
+        response = self.client.post('/api/cart/', {'product': 999999}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        Product.objects.filter(pk=self.products[1].pk).update(is_active=False)
+        response = self.client.post('/api/cart/', {'product': self.products[1].id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_add_query_count_is_constant(self):
+        """TC-CA04: adding costs the same number of queries for any cart size"""
+        small, _ = self.count_queries('post', '/api/cart/', {'product': self.products[0].id})
+        small_increment, _ = self.count_queries('post', '/api/cart/', {'product': self.products[0].id})
+        for product in self.products[1:18]:
+            self.client.post('/api/cart/', {'product': product.id}, format='json')
+        large, response = self.count_queries('post', '/api/cart/', {'product': self.products[19].id})
+        large_increment, _ = self.count_queries('post', '/api/cart/', {'product': self.products[19].id})
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(small, large)
+        self.assertEqual(small_increment, large_increment)
+
+    def test_list_includes_summary(self):
+        """TC-CA05: the list returns every line plus server-computed totals in one query"""
+        Cart.objects.bulk_create([Cart(user=self.user, product=p, quantity=2) for p in self.products[:15]])
+
+        queries, response = self.count_queries('get', '/api/cart/')
+        self.assertEqual(queries, 1)
+        self.assertEqual(response.data['count'], 15)
+        self.assertEqual(len(response.data['results']), 15)
+        self.assertEqual(response.data['item_count'], 30)
+        expected = sum((p.price * 2 for p in self.products[:15]), Decimal('0'))
+        self.assertEqual(Decimal(response.data['subtotal']), expected)
+
+    def test_update_quantity(self):
+        """TC-CA06: PUT sets the quantity with a fixed query count and checks stock"""
+        line = Cart.objects.create(user=self.user, product=self.products[0], quantity=1)
+        other = Cart.objects.create(user=self.user, product=self.products[1], quantity=1)
+
+        small, _ = self.count_queries('put', f'/api/cart/{other.id}/', {'quantity': 2})
+        Cart.objects.bulk_create([Cart(user=self.user, product=p, quantity=1) for p in self.products[2:]])
+        queries, response = self.count_queries('put', f'/api/cart/{line.id}/', {'quantity': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 4)
+        self.assertEqual(queries, small)
+
+        response = self.client.put(f'/api/cart/{line.id}/', {'quantity': 6}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.patch(f'/api/cart/{line.id}/', {'quantity': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_lines_are_hidden(self):
+        """TC-CA07: lines of another user cannot be updated or deleted"""
+        other = User.objects.create_user(username='other', password='User@123')
+        line = Cart.objects.create(user=other, product=self.products[0], quantity=1)
+
+        response = self.client.put(f'/api/cart/{line.id}/', {'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.delete(f'/api/cart/{line.id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Cart.objects.filter(pk=line.pk).exists())
+
+    def test_delete_line(self):
+        """TC-CA08: DELETE removes the line and releases its hold"""
+        product = self.products[0]
+        line = self.client.post('/api/cart/', {'product': product.id, 'quantity': 2}, format='json').data
+        response = self.client.delete(f"/api/cart/{line['id']}/")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Cart.objects.filter(pk=line['id']).exists())
+        product.refresh_from_db()
+        self.assertEqual(product.reserved, 0)
+
+
+class CartBatchTestCase(TestCase):
+    """Test POST /api/cart/batch/"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='shopper', password='User@123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Audio', slug='audio')
+        self.products = Product.objects.bulk_create([
+            Product(
+                name=f'Product {i}', slug=f'product-{i}', category=self.category,
+                description='Test', price=Decimal('10.00'), weight=Decimal('1.0'), stock=5
+            )
+            for i in range(10)
+        ])
+
+    def batch(self, *operations):
+        return self.client.post('/api/cart/batch/', {'operations': list(operations)}, format='json')
+
+    def quantities(self):
+        return dict(Cart.objects.filter(user=self.user).values_list('product_id', 'quantity'))
+
+    def test_add_set_remove(self):
+        """TC-CB01: operations apply in order and the resulting cart is returned"""
+        p = self.products
+        Cart.objects.create(user=self.user, product=p[0], quantity=1)
+        Cart.objects.create(user=self.user, product=p[1], quantity=1)
+
+        response = self.batch(
+            {'op': 'add', 'product': p[0].id, 'quantity': 2},
+            {'op': 'remove', 'product': p[1].id},
+            {'op': 'add', 'product': p[2].id},
+            {'op': 'set', 'product': p[3].id, 'quantity': 4},
+            {'op': 'add', 'product': p[3].id},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.quantities(), {p[0].id: 3, p[2].id: 1, p[3].id: 5})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['item_count'], 9)
+        self.assertEqual(response.data['subtotal'], '90.00')
+
+    def test_rejected_batch_changes_nothing(self):
+        """TC-CB02: one failing operation rejects the whole batch"""
+        p = self.products
+        Cart.objects.create(user=self.user, product=p[0], quantity=1)
+
+        response = self.batch(
+            {'op': 'remove', 'product': p[0].id},
+            {'op': 'add', 'product': p[1].id, 'quantity': 6},
+            {'op': 'add', 'product': 999999},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([e['index'] for e in response.data['operations']], [1, 2])
+        self.assertEqual(self.quantities(), {p[0].id: 1})
+
+    def test_stock_checked_against_final_quantity(self):
+        """TC-CB03: a later set can bring an over-stock add back within stock"""
+        product = self.products[0]
+        response = self.batch(
+            {'op': 'add', 'product': product.id, 'quantity': 5},
+            {'op': 'add', 'product': product.id, 'quantity': 5},
+            {'op': 'set', 'product': product.id, 'quantity': 2},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.quantities(), {product.id: 2})
+
+    def test_payload_validation(self):
+        """TC-CB04: malformed operations are rejected before touching the database"""
+        product = self.products[0]
+        for operations in ([], [{'op': 'bump', 'product': product.id}],
+                           [{'op': 'set', 'product': product.id}],
+                           [{'op': 'add', 'product': product.id, 'quantity': 0}]):
+            response = self.client.post('/api/cart/batch/', {'operations': operations}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, operations)
+
+    def test_query_count_independent_of_batch_size(self):
+        """TC-CB05: one product query, one line query and one write per kind, whatever the batch size"""
+        def run(products):
+            Cart.objects.filter(user=self.user).delete()
+            Cart.objects.bulk_create([Cart(user=self.user, product=p, quantity=1) for p in products[:2]])
+            # Touches every kind of write: remove, update and insert
+            operations = [{'op': 'remove', 'product': products[0].id}]
+            operations += [{'op': 'add', 'product': p.id} for p in products[1:]]
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.batch(*operations)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(ctx)
+
+        self.assertEqual(run(self.products[:3]), run(self.products))
+
+    def test_line_created_concurrently(self):
+        """TC-CB06: a batch whose new line collides with one another request inserted is retried"""
+        product = self.products[0]
+        bulk_create = Cart.objects.bulk_create
+        calls = []
+
+        def collide_once(lines, *args, **kwargs):
+            # The rival's committed row cannot be faked inside this test's
+            # transaction, so the first insert just fails the way it would
+            calls.append(lines)
+            if len(calls) == 1:
+                raise IntegrityError('UNIQUE constraint failed: api_cart.user_id, api_cart.product_id')
+            return bulk_create(lines, *args, **kwargs)
+
+        with mock.patch.object(Cart.objects, 'bulk_create', side_effect=collide_once):
+            response = self.batch({'op': 'add', 'product': product.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.quantities(), {product.id: 1})
@@ -0,0 +1,307 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Category, Product, ProductQuerySet
+from . import caching, inventory
+from decimal import Decimal
+
+
+def create_products(category, count, start=0):
+    return Product.objects.bulk_create([
+        Product(
+            name=f'Product {i}',
+            slug=f'product-{i}',
+            category=category,
+            description='A long description ' * 50,
+            price=Decimal('10.00') + i,
+            weight=Decimal('1.0'),
+            stock=10
+        )
+        for i in range(start, start + count)
+    ])
+
+
+@override_settings(CATALOG_CACHE_TIMEOUT=0)
+class CatalogQueryCountTestCase(TestCase):
+    """Catalog endpoints cost a constant number of queries per page"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.categories = [
+            Category.objects.create(name=f'Category {i}', slug=f'category-{i}')
+            for i in range(3)
+        ]
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx), response
+
+    def test_product_list_query_count_is_constant(self):
+        """GET /api/products/ does not issue a query per product"""
+        create_products(self.categories[0], 2)
+        small, _ = self.count_queries('/api/products/')
+
+        for idx, category in enumerate(self.categories):
+            create_products(category, 10, start=100 * (idx + 1))
+        large, response = self.count_queries('/api/products/')
+
+        self.assertEqual(len(response.data['results']), 12)
+        self.assertEqual(small, large)
+        self.assertLessEqual(large, 2)
+
+    def test_product_list_returns_category_and_excerpt(self):
+        """List rows carry category_name and a truncated description"""
+        create_products(self.categories[1], 1)
+        _, response = self.count_queries('/api/products/')
+
+        row = response.data['results'][0]
+        self.assertEqual(row['category_name'], 'Category 1')
+        self.assertEqual(len(row['description']), ProductQuerySet.LIST_EXCERPT_LENGTH)
+
+    def test_product_detail_single_query(self):
+        """GET /api/products/:slug returns the full description in one query"""
+        product = create_products(self.categories[2], 1)[0]
+        queries, response = self.count_queries(f'/api/products/{product.slug}/')
+
+        self.assertEqual(queries, 1)
+        self.assertEqual(response.data['description'], product.description)
+        self.assertEqual(response.data['category_name'], 'Category 2')
+
+    def test_admin_product_list_query_count_is_constant(self):
+        """GET /api/admin/products/ joins categories instead of N+1 lookups"""
+        User.objects.create_user(
+            username='testadmin',
+            password='Admin@123',
+            role='admin',
+            is_staff=True
+        )
+        response = self.client.post('/api/admin/login/', {
+            'username': 'testadmin',
+            'password': 'Admin@123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['tokens']['access']}")
+
+        create_products(self.categories[0], 2)
+        small, _ = self.count_queries('/api/admin/products/')
+        create_products(self.categories[1], 20, start=100)
+        large, _ = self.count_queries('/api/admin/products/')
+
+        self.assertEqual(small, large)
+
+
+class CatalogKeysetPaginationTestCase(TestCase):
+    """Cursor pagination over the catalog"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Electronics', slug='electronics')
+        create_products(self.category, 30)
+
+    def walk(self, url):
+        names = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            names.extend(row['name'] for row in response.data['results'])
+            url = response.data['next']
+        return names
+
+    def test_cursor_pages_cover_catalog_in_price_order(self):
+        """?pagination=cursor&ordering=-price walks every product once"""
+        names = self.walk('/api/products/?pagination=cursor&ordering=-price')
+        expected = list(Product.objects.order_by('-price', '-id').values_list('name', flat=True))
+        self.assertEqual(names, expected)
+
+    def test_cursor_pages_stable_under_inserts(self):
+        """Rows inserted ahead of the cursor do not shift later pages"""
+        first = self.client.get('/api/products/?pagination=cursor')
+        seen = [row['name'] for row in first.data['results']]
+
+        create_products(self.category, 5, start=1000)
+        seen += self.walk(first.data['next'])
+
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+
+    def test_previous_link_returns_prior_page(self):
+        """The previous cursor yields the page that was just left"""
+        first = self.client.get('/api/products/?pagination=cursor&ordering=price')
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_cursor_constant_queries(self):
+        """Keyset pages skip the COUNT(*) query"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/products/?pagination=cursor')
+        self.assertEqual(len(ctx), 1)
+
+    def test_invalid_cursor_returns_404(self):
+        """Garbage cursors are rejected"""
+        response = self.client.get('/api/products/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProductSearchTestCase(TestCase):
+    """Full-text catalog search"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.electronics = Category.objects.create(name='Electronics', slug='electronics')
+        self.books = Category.objects.create(name='Books', slug='books')
+        self.headphones = Product.objects.create(
+            name='Wireless Headphones', slug='wireless-headphones', category=self.electronics,
+            description='Noise cancelling over-ear headphones',
+            price=Decimal('2999.00'), weight=Decimal('0.25'), stock=5
+        )
+        self.guide = Product.objects.create(
+            name='Audio Guide', slug='audio-guide', category=self.books,
+            description='Choosing wireless gear for your home studio',
+            price=Decimal('599.00'), weight=Decimal('0.80'), stock=5
+        )
+
+    def search(self, term, **params):
+        response = self.client.get('/api/products/', {'search': term, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [row['slug'] for row in response.data['results']]
+
+    def test_prefix_match_ranks_name_hits_first(self):
+        """?search=wire matches by prefix and ranks name matches above description matches"""
+        self.assertEqual(self.search('wire'), ['wireless-headphones', 'audio-guide'])
+
+    def test_all_words_must_match(self):
+        """Multi-word searches require every word"""
+        self.assertEqual(self.search('wireless head'), ['wireless-headphones'])
+
+    def test_category_name_is_searchable(self):
+        """Category names are part of the indexed document"""
+        self.assertEqual(self.search('books'), ['audio-guide'])
+
+    def test_explicit_ordering_overrides_rank(self):
+        """?ordering=price beats relevance order"""
+        self.assertEqual(self.search('wireless', ordering='price'), ['audio-guide', 'wireless-headphones'])
+
+    def test_index_follows_saves_and_deletes(self):
+        """Edits, category renames and deletes are reflected in results"""
+        self.guide.name = 'Studio Handbook'
+        self.guide.save()
+        self.assertEqual(self.search('handbook'), ['audio-guide'])
+
+        self.books.name = 'Literature'
+        self.books.save()
+        self.assertEqual(self.search('literature'), ['audio-guide'])
+
+        self.headphones.delete()
+        self.assertEqual(self.search('headphones'), [])
+
+    def test_punctuation_only_search_falls_back(self):
+        """Terms with no words fall back to the icontains filter"""
+        self.assertEqual(self.search('%%'), [])
+
+
+class CatalogResponseCacheTestCase(TestCase):
+    """Catalog responses are cached until a catalog write bumps the version"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Audio', slug='audio')
+        self.product = Product.objects.create(
+            name='Headphones', slug='headphones', category=self.category,
+            description='Wireless', price=Decimal('99.00'), weight=Decimal('0.3'), stock=5
+        )
+
+    def get(self, url, **headers):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, **headers)
+        return response, len(ctx)
+
+    def test_repeat_request_served_from_cache(self):
+        """TC-C01: second identical request runs no queries"""
+        first, _ = self.get('/api/products/?category=audio&page=1')
+        second, queries = self.get('/api/products/?page=1&category=audio&utm_source=mail')
+
+        self.assertEqual(queries, 0)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_query_params_are_part_of_key(self):
+        """TC-C02: different filters are cached separately"""
+        self.get('/api/products/?max_price=10')
+        response, queries = self.get('/api/products/?max_price=100')
+
+        self.assertGreater(queries, 0)
+        self.assertEqual(response.data['count'], 1)
+
+    def test_if_none_match_returns_304(self):
+        """TC-C03: a matching ETag gets 304 with no body"""
+        response, _ = self.get('/api/products/headphones/')
+        etag = response['ETag']
+
+        response, _ = self.get('/api/products/headphones/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_product_save_invalidates(self):
+        """TC-C04: saving a product bumps the catalog version"""
+        before, _ = self.get('/api/products/headphones/')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.price = Decimal('79.00')
+            self.product.save()
+
+        after, queries = self.get('/api/products/headphones/')
+        self.assertGreater(queries, 0)
+        self.assertEqual(after.data['price'], '79.00')
+        self.assertNotEqual(before['ETag'], after['ETag'])
+
+    def test_only_sell_out_invalidates(self):
+        """TC-C08: sales leave cached pages alone until one sells the product out"""
+        self.get('/api/products/headphones/')
+        version = caching.catalog_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.decrement_stock(self.product, 3)
+        self.assertEqual(caching.catalog_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            inventory.decrement_stock(self.product, 2)
+        response, _ = self.get('/api/products/headphones/')
+        self.assertEqual(response.data['stock'], 0)
+
+    def test_category_delete_invalidates(self):
+        """TC-C05: deleting a category clears cached category lists"""
+        response, _ = self.get('/api/categories/')
+        self.assertEqual(len(response.data['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.delete()
+
+        response, _ = self.get('/api/categories/')
+        self.assertEqual(len(response.data['results']), 0)
+
+    def test_version_survives_eviction(self):
+        """TC-C06: bumping works when the version key has been evicted"""
+        version = caching.catalog_version()
+        caching.get_cache().delete(caching.CATALOG_VERSION_KEY)
+        caching.bump_catalog_version()
+        self.assertNotEqual(caching.catalog_version(), version)
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=0)
+    def test_cache_can_be_disabled(self):
+        """TC-C07: a zero timeout skips caching entirely"""
+        self.get('/api/products/')
+        _, queries = self.get('/api/products/')
+        self.assertGreater(queries, 0)
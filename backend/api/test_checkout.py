@@ -0,0 +1,170 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Category, Product, Cart, Order, OrderItem
+from decimal import Decimal
+
+SHIPPING = {
+    'shipping_address': '123 Test St',
+    'shipping_city': 'Test City',
+    'shipping_state': 'Test State',
+    'shipping_pincode': '123456',
+    'shipping_phone': '1234567890'
+}
+
+
+def create_product(category, slug, stock, price='100.00'):
+    return Product.objects.create(
+        name=slug.replace('-', ' ').title(),
+        slug=slug,
+        category=category,
+        description='Test',
+        price=Decimal(price),
+        weight=Decimal('1.0'),
+        stock=stock
+    )
+
+
+class CheckoutTestCase(TestCase):
+    """Test POST /api/orders/"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='buyer', password='User@123')
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Electronics', slug='electronics')
+
+    def fill_cart(self, count, stock=10, quantity=2):
+        products = [create_product(self.category, f'product-{i}', stock) for i in range(count)]
+        Cart.objects.bulk_create([
+            Cart(user=self.user, product=product, quantity=quantity) for product in products
+        ])
+        return products
+
+    def test_checkout_creates_order_and_decrements_stock(self):
+        """Checkout writes order items, decrements stock and empties the cart"""
+        products = self.fill_cart(3)
+        response = self.client.post('/api/orders/', SHIPPING)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('600.00'))
+        self.assertEqual(len(response.data['items']), 3)
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+        for product in products:
+            product.refresh_from_db()
+            self.assertEqual(product.stock, 8)
+
+    def test_insufficient_stock_rolls_back_everything(self):
+        """A short line aborts the whole order without touching other stock"""
+        products = self.fill_cart(2)
+        Product.objects.filter(pk=products[1].pk).update(stock=1)
+
+        response = self.client.post('/api/orders/', SHIPPING)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn(products[1].name, response.data['error'])
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 2)
+        products[0].refresh_from_db()
+        self.assertEqual(products[0].stock, 10)
+
+    def test_empty_cart(self):
+        """Checkout with an empty cart returns 400"""
+        response = self.client.post('/api/orders/', SHIPPING)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_query_count_independent_of_cart_size(self):
+        """Order writes do not grow with the number of cart lines"""
+        def checkout_queries(count):
+            self.fill_cart(count)
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post('/api/orders/', SHIPPING)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            writes = [q for q in ctx.captured_queries if not q['sql'].startswith('SELECT')]
+            stock_updates = [q for q in writes if 'UPDATE "api_product"' in q['sql']]
+            return len(writes) - len(stock_updates), len(stock_updates)
+
+        # Warm up so the dashboard counter rows already exist
+        checkout_queries(1)
+        Product.objects.all().delete()
+        small_writes, small_updates = checkout_queries(1)
+        Product.objects.all().delete()
+        large_writes, large_updates = checkout_queries(8)
+
+        self.assertEqual(small_writes, large_writes)
+        self.assertEqual((small_updates, large_updates), (1, 8))
+
+    def test_cart_read_inside_transaction(self):
+        """Cart lines are priced from rows read inside the order transaction"""
+        self.fill_cart(2)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/orders/', SHIPPING)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        sql = [q['sql'] for q in ctx.captured_queries]
+        savepoint = next(i for i, q in enumerate(sql) if q.startswith('SAVEPOINT'))
+        cart_read = next(i for i, q in enumerate(sql) if q.startswith('SELECT') and 'FROM "api_cart"' in q)
+        self.assertLess(savepoint, cart_read)
+        self.assertEqual(Decimal(response.data['total_amount']), Decimal('400.00'))
+
+
+class ConcurrentCheckoutTestCase(TransactionTestCase):
+    """Concurrent checkouts must never oversell"""
+
+    BUYERS = 12
+    STOCK = 5
+    RETRIES = 50
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='Electronics', slug='electronics')
+        self.product = create_product(category, 'hot-item', self.STOCK)
+        self.buyers = []
+        for i in range(self.BUYERS):
+            user = User.objects.create(username=f'buyer{i}')
+            Cart.objects.create(user=user, product=self.product, quantity=1)
+            self.buyers.append(user)
+
+    def test_no_oversell_under_concurrent_checkout(self):
+        barrier = threading.Barrier(self.BUYERS)
+        results = []
+
+        def checkout(user):
+            client = APIClient()
+            client.force_authenticate(user)
+            barrier.wait()
+            try:
+                # SQLite reports lock conflicts instead of waiting; retry like a client would
+                for _ in range(self.RETRIES):
+                    try:
+                        results.append(client.post('/api/orders/', SHIPPING).status_code)
+                        return
+                    except OperationalError:
+                        time.sleep(0.01)
+                results.append(None)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=checkout, args=(user,)) for user in self.buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.product.refresh_from_db()
+        sold = OrderItem.objects.filter(product=self.product).count()
+
+        self.assertEqual(len(results), self.BUYERS)
+        self.assertNotIn(None, results)
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual(sold, self.STOCK)
+        self.assertEqual(Order.objects.count(), self.STOCK)
+        self.assertEqual(Cart.objects.count(), self.BUYERS - self.STOCK)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from .db import configure_connection, sqlite_pragmas
+
+
+class SQLitePragmaTestCase(SimpleTestCase):
+    """New SQLite connections are tuned from settings.SQLITE_PRAGMAS"""
+    databases = {'default'}
+
+    def setUp(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+
+    def test_pragmas_applied_on_connect(self):
+        """TC-DB01: busy_timeout and synchronous come from settings"""
+        connection.ensure_connection()
+        values = sqlite_pragmas(connection, ['busy_timeout', 'synchronous'])
+
+        self.assertEqual(values['busy_timeout'], settings.SQLITE_PRAGMAS['busy_timeout'])
+        self.assertEqual(values['synchronous'], 1)  # NORMAL
+
+    def test_pragmas_follow_settings(self):
+        """TC-DB02: overriding SQLITE_PRAGMAS changes what is applied"""
+        connection.ensure_connection()
+        with override_settings(SQLITE_PRAGMAS={'busy_timeout': 1234}):
+            configure_connection(sender=None, connection=connection)
+            self.assertEqual(sqlite_pragmas(connection, ['busy_timeout'])['busy_timeout'], 1234)
+        configure_connection(sender=None, connection=connection)
@@ -0,0 +1,221 @@
+from datetime import timedelta
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import inventory
+from .models import User, Category, Product, Cart, StockHold
+
+SHIPPING = {
+    'shipping_address': '123 Test St',
+    'shipping_city': 'Test City',
+    'shipping_state': 'Test State',
+    'shipping_pincode': '123456',
+    'shipping_phone': '1234567890'
+}
+
+
+class StockHoldTestCase(TestCase):
+    """Test cart stock holds"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='shopper', password='User@123')
+        self.rival = User.objects.create_user(username='rival', password='User@123')
+        self.client = self.client_for(self.user)
+        category = Category.objects.create(name='Audio', slug='audio')
+        self.product = Product.objects.create(
+            name='Headphones', slug='headphones', category=category, description='Test',
+            price=Decimal('100.00'), weight=Decimal('1.0'), stock=5
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+
+    def add(self, client, quantity):
+        return client.post('/api/cart/', {'product': self.product.id, 'quantity': quantity}, format='json')
+
+    def reserved(self):
+        self.product.refresh_from_db()
+        return self.product.reserved
+
+    def expire_holds(self):
+        StockHold.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+    def test_add_places_hold(self):
+        """TC-H01: adding to the cart holds the units and counts them as reserved"""
+        self.add(self.client, 2)
+        self.add(self.client, 1)
+
+        hold = StockHold.objects.get(user=self.user, product=self.product)
+        self.assertEqual(hold.quantity, 3)
+        self.assertGreater(hold.expires_at, timezone.now())
+        self.assertEqual(self.reserved(), 3)
+        self.assertEqual(self.product.available_stock, 2)
+
+        response = self.client.get(f'/api/products/{self.product.slug}/')
+        self.assertEqual(response.data['available_stock'], 2)
+
+    def test_held_units_unavailable_to_others(self):
+        """TC-H02: units held by one cart cannot be added or bought by another"""
+        self.add(self.client, 4)
+        rival = self.client_for(self.rival)
+
+        self.assertEqual(self.add(rival, 2).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.add(rival, 1).status_code, status.HTTP_201_CREATED)
+
+        # A line added without a hold still cannot take held units at checkout
+        Cart.objects.filter(user=self.rival).update(quantity=2)
+        response = rival.post('/api/orders/', SHIPPING)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 5)
+
+    def test_update_and_remove_resize_hold(self):
+        """TC-H03: changing or removing lines resizes or releases the hold"""
+        line = self.add(self.client, 2).data
+        self.client.put(f"/api/cart/{line['id']}/", {'quantity': 4}, format='json')
+        self.assertEqual(self.reserved(), 4)
+
+        self.client.put(f"/api/cart/{line['id']}/", {'quantity': 1}, format='json')
+        self.assertEqual(self.reserved(), 1)
+
+        self.client.delete('/api/cart/clear/')
+        self.assertEqual(self.reserved(), 0)
+        self.assertFalse(StockHold.objects.exists())
+
+    def test_batch_resizes_holds(self):
+        """TC-H04: batch mutations hold the final quantities"""
+        response = self.client.post('/api/cart/batch/', {'operations': [
+            {'op': 'add', 'product': self.product.id, 'quantity': 4},
+            {'op': 'set', 'product': self.product.id, 'quantity': 3},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.reserved(), 3)
+
+        self.add(self.client_for(self.rival), 2)
+        response = self.client.post('/api/cart/batch/', {'operations': [
+            {'op': 'add', 'product': self.product.id},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['operations'][0]['index'], 0)
+        self.assertEqual(Cart.objects.get(user=self.user).quantity, 3)
+
+    def test_expired_holds_are_released(self):
+        """TC-H05: the sweep command frees expired holds and leaves live ones"""
+        self.add(self.client, 3)
+        self.add(self.client_for(self.rival), 1)
+        StockHold.objects.filter(user=self.user).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command('release_stock_holds', '--once', verbosity=0, stdout=StringIO())
+        self.assertEqual(self.reserved(), 1)
+        self.assertEqual(list(StockHold.objects.values_list('user__username', flat=True)), ['rival'])
+
+    def test_expired_holds_reclaimed_on_demand(self):
+        """TC-H06: an add that is short of stock first releases expired holds"""
+        self.add(self.client, 5)
+        self.expire_holds()
+
+        response = self.add(self.client_for(self.rival), 4)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reserved(), 4)
+
+        # The abandoned cart can only take back what is left
+        response = self.client.put(f"/api/cart/{Cart.objects.get(user=self.user).id}/", {'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_converts_holds(self):
+        """TC-H07: checkout turns the buyer's holds into stock decrements"""
+        self.add(self.client, 3)
+        self.add(self.client_for(self.rival), 2)
+
+        response = self.client.post('/api/orders/', SHIPPING)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.reserved(), 2)
+        self.assertEqual(self.product.stock, 2)
+        self.assertFalse(StockHold.objects.filter(user=self.user).exists())
+
+    def test_checkout_races_expiry_sweep(self):
+        """TC-H11: a sweep during checkout cannot release a hold being converted"""
+        self.add(self.client, 3)
+        self.add(self.client_for(self.rival), 2)
+        StockHold.objects.filter(user=self.user).update(expires_at=timezone.now() - timedelta(seconds=1))
+        decrement_stock = inventory.decrement_stock
+
+        def sweep_then_decrement(*args, **kwargs):
+            call_command('release_stock_holds', '--once', verbosity=0, stdout=StringIO())
+            decrement_stock(*args, **kwargs)
+
+        with mock.patch.object(inventory, 'decrement_stock', side_effect=sweep_then_decrement):
+            response = self.client.post('/api/orders/', SHIPPING)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        # The rival's hold is still counted, not released twice
+        self.assertEqual(self.reserved(), 2)
+        self.assertEqual(self.product.stock, 2)
+
+    def test_resize_races_expiry_sweep(self):
+        """TC-H12: a sweep just before a hold is resized is not released twice"""
+        self.add(self.client, 3)
+        self.add(self.client_for(self.rival), 2)
+        self.expire_holds()
+        StockHold.objects.filter(user=self.rival).update(expires_at=timezone.now() + timedelta(minutes=5))
+        set_holds = inventory.set_holds
+
+        def sweep_then_set(*args, **kwargs):
+            call_command('release_stock_holds', '--once', verbosity=0, stdout=StringIO())
+            set_holds(*args, **kwargs)
+
+        line = Cart.objects.get(user=self.user)
+        with mock.patch.object(inventory, 'set_holds', side_effect=sweep_then_set):
+            response = self.client.put(f'/api/cart/{line.id}/', {'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.reserved(), 4)
+        self.assertEqual(StockHold.objects.get(user=self.user).quantity, 2)
+
+    def test_rebuild_reserved(self):
+        """TC-H08: reserved counters can be recomputed from the hold rows"""
+        self.add(self.client, 3)
+        Product.objects.update(reserved=0)
+
+        call_command('release_stock_holds', '--once', '--rebuild', verbosity=0, stdout=StringIO())
+        self.assertEqual(self.reserved(), 3)
+
+    @override_settings(STOCK_HOLD_TTL=0)
+    def test_holds_disabled(self):
+        """TC-H09: with STOCK_HOLD_TTL=0 carts only check stock"""
+        self.add(self.client, 4)
+        self.assertEqual(self.add(self.client_for(self.rival), 4).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.add(self.client, 2).status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(self.reserved(), 0)
+        self.assertFalse(StockHold.objects.exists())
+        self.assertEqual(self.client.post('/api/orders/', SHIPPING).status_code, status.HTTP_201_CREATED)
+
+    @override_settings(STOCK_HOLD_TTL=0)
+    def test_batch_with_holds_disabled(self):
+        """TC-H10: with STOCK_HOLD_TTL=0 batch mutations only check stock"""
+        response = self.client.post('/api/cart/batch/', {'operations': [
+            {'op': 'add', 'product': self.product.id, 'quantity': 3},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.reserved(), 0)
+        self.assertFalse(StockHold.objects.exists())
+
+        response = self.client.post('/api/cart/batch/', {'operations': [
+            {'op': 'set', 'product': self.product.id, 'quantity': 6},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Nothing is set aside, so another buyer can take every unit
+        rival = self.client_for(self.rival)
+        self.assertEqual(self.add(rival, 5).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(rival.post('/api/orders/', SHIPPING).status_code, status.HTTP_201_CREATED)
@@ -0,0 +1,227 @@
+import json
+import uuid
+from datetime import timedelta
+from io import StringIO
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Category, Product, ImportJob
+from . import importers, jobs
+from decimal import Decimal
+
+CSV_HEADER = 'name,slug,category,description,price,weight,stock,image,is_active\n'
+
+
+class ImportTestMixin:
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='testadmin', role='admin', is_staff=True)
+        self.client.force_authenticate(self.admin)
+
+    def queue(self, name, content, **data):
+        file = SimpleUploadedFile(name, content.encode('utf-8'))
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/admin/products/import_products/', {'file': file, **data})
+
+    def status_of(self, response):
+        return self.client.get(f"/api/admin/products/import/{response.data['job']['id']}/")
+
+
+@override_settings(IMPORT_JOB_RUNNER='eager')
+class ProductImportTestCase(ImportTestMixin, TestCase):
+    """Test product imports end to end, reading results from the job status"""
+
+    def upload(self, name, content, **data):
+        response = self.queue(name, content, **data)
+        if response.status_code != status.HTTP_202_ACCEPTED:
+            return response
+        return self.status_of(response)
+
+    def test_csv_import(self):
+        """CSV rows are imported and categories created once"""
+        content = CSV_HEADER + ''.join(
+            f'Product {i},product-{i},{"Books" if i % 2 else "Toys"},Desc,{i}.50,0.5,{i},,true\n'
+            for i in range(25)
+        )
+        response = self.upload('feed.csv', content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['imported_count'], 25)
+        self.assertEqual(response.data['errors'], [])
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(Product.objects.get(slug='product-3').price, Decimal('3.50'))
+
+    def test_json_import(self):
+        """JSON arrays are imported with defaults for optional fields"""
+        content = json.dumps([
+            {'name': 'Wireless Mouse', 'category': 'Electronics', 'price': 599.0},
+            {'name': 'Keyboard', 'slug': 'kb', 'price': '1299.00', 'stock': 4, 'is_active': False},
+        ])
+        response = self.upload('feed.json', content)
+
+        self.assertEqual(response.data['imported_count'], 2)
+        mouse = Product.objects.get(slug='wireless-mouse')
+        self.assertEqual(mouse.category.name, 'Electronics')
+        self.assertFalse(Product.objects.get(slug='kb').is_active)
+        self.assertEqual(Product.objects.get(slug='kb').category.name, 'Uncategorized')
+
+    def test_row_errors_are_reported(self):
+        """Bad rows are skipped with row numbers; good rows still import"""
+        content = CSV_HEADER + (
+            'Good,good,Books,,10,1,1,,true\n'
+            ',missing-name,Books,,10,1,1,,true\n'
+            'Bad Price,bad-price,Books,,abc,1,1,,true\n'
+        )
+        response = self.upload('feed.csv', content)
+
+        self.assertEqual(response.data['imported_count'], 1)
+        self.assertEqual(len(response.data['errors']), 2)
+        self.assertTrue(response.data['errors'][0].startswith('Row 3:'))
+        self.assertTrue(response.data['errors'][1].startswith('Row 4:'))
+
+    def test_existing_slug_without_upsert_is_an_error(self):
+        """Existing slugs are rejected unless upsert is requested"""
+        self.upload('feed.csv', CSV_HEADER + 'Old,item,Books,,10,1,1,,true\n')
+        response = self.upload('feed.csv', CSV_HEADER + 'New,item,Books,,20,1,5,,true\n')
+
+        self.assertEqual(response.data['imported_count'], 0)
+        self.assertIn("already exists", response.data['errors'][0])
+        self.assertEqual(Product.objects.get(slug='item').name, 'Old')
+
+    def test_upsert_updates_existing_products(self):
+        """upsert=true updates products matched by slug"""
+        self.upload('feed.csv', CSV_HEADER + 'Old,item,Books,,10,1,1,,true\n')
+        created_at = Product.objects.get(slug='item').created_at
+        response = self.upload('feed.csv', CSV_HEADER + 'New,item,Toys,,20,1,5,,true\n', upsert='true')
+
+        self.assertEqual(response.data['imported_count'], 1)
+        product = Product.objects.get(slug='item')
+        self.assertEqual((product.name, product.stock, product.category.name), ('New', 5, 'Toys'))
+        self.assertEqual(product.created_at, created_at)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_imported_products_are_searchable(self):
+        """Bulk imports refresh the full-text index"""
+        self.upload('feed.csv', CSV_HEADER + 'Espresso Machine,espresso,Kitchen,,10,1,1,,true\n')
+        response = self.client.get('/api/products/', {'search': 'espr'})
+        self.assertEqual([row['slug'] for row in response.data['results']], ['espresso'])
+
+    def test_invalid_json_fails(self):
+        """Malformed JSON fails the job as a whole"""
+        response = self.upload('feed.json', '{"name": "not an array"}')
+        self.assertEqual(response.data['status'], 'Failed')
+        self.assertIn('array', response.data['message'])
+
+    def test_unknown_format(self):
+        response = self.upload('feed.xml', '<products/>')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(IMPORT_JOB_RUNNER='worker')
+class ImportJobTestCase(ImportTestMixin, TestCase):
+    """Import jobs are queued and processed outside the request"""
+
+    def test_upload_returns_job_immediately(self):
+        """POST returns 202 with a pending job; the worker command completes it"""
+        response = self.queue('feed.csv', CSV_HEADER + 'Lamp,lamp,Home,,10,1,1,,true\n')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['job']['status'], 'Pending')
+        self.assertFalse(Product.objects.exists())
+
+        call_command('run_import_jobs', '--once', stdout=StringIO())
+
+        job = self.status_of(response).data
+        self.assertEqual(job['status'], 'Completed')
+        self.assertEqual((job['rows_processed'], job['imported_count'], job['error_count']), (1, 1, 0))
+        self.assertGreater(job['rows_per_second'], 0)
+        self.assertTrue(Product.objects.filter(slug='lamp').exists())
+
+    def test_job_claimed_once(self):
+        """A job already claimed is not run again"""
+        response = self.queue('feed.csv', CSV_HEADER + 'Lamp,lamp,Home,,10,1,1,,true\n')
+        job_id = response.data['job']['id']
+        ImportJob.objects.filter(pk=job_id).update(status='Running')
+
+        call_command('run_import_jobs', '--once', stdout=StringIO())
+        self.assertFalse(Product.objects.exists())
+
+    def test_stale_running_job_fails(self):
+        """A running job whose worker stopped reporting progress is failed by the worker command"""
+        stale = self.queue('feed.csv', CSV_HEADER + 'Lamp,lamp,Home,,10,1,1,,true\n').data['job']['id']
+        live = self.queue('feed.csv', CSV_HEADER + 'Desk,desk,Home,,10,1,1,,true\n').data['job']['id']
+        for job_id in (stale, live):
+            self.assertTrue(jobs.claim(job_id))
+        ImportJob.objects.filter(pk=stale).update(heartbeat_at=timezone.now() - timedelta(seconds=601))
+
+        out = StringIO()
+        call_command('run_import_jobs', '--once', stdout=out)
+        self.assertIn('Failed 1 import job', out.getvalue())
+        job = ImportJob.objects.get(pk=stale)
+        self.assertEqual(job.status, 'Failed')
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(ImportJob.objects.get(pk=live).status, 'Running')
+
+    def test_late_finish_keeps_failed_status(self):
+        """A job failed as stale while its import was still running stays failed"""
+        job_id = self.queue('feed.csv', CSV_HEADER + 'Lamp,lamp,Home,,10,1,1,,true\n').data['job']['id']
+        run = importers.ProductImporter.run
+
+        def given_up_on(importer, *args):
+            ImportJob.objects.filter(pk=job_id).update(heartbeat_at=timezone.now() - timedelta(seconds=601))
+            jobs.fail_stale()
+            return run(importer, *args)
+
+        with mock.patch.object(importers.ProductImporter, 'run', given_up_on):
+            jobs.run_job(job_id)
+        job = ImportJob.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'Failed')
+        self.assertIn('stopped responding', job.message)
+
+    @override_settings(IMPORT_JOB_RUNNER='thread')
+    def test_thread_mode_recovers_jobs_on_status_read(self):
+        """With the thread runner, reading the status of an orphaned or stale job recovers it"""
+        with mock.patch.object(jobs, 'get_executor') as get_executor:
+            orphaned = self.queue('feed.csv', CSV_HEADER + 'Lamp,lamp,Home,,10,1,1,,true\n')
+            stale = self.queue('feed.csv', CSV_HEADER + 'Desk,desk,Home,,10,1,1,,true\n')
+            get_executor.reset_mock()
+            old = timezone.now() - timedelta(seconds=601)
+            ImportJob.objects.filter(pk=orphaned.data['job']['id']).update(created_at=old)
+            jobs.claim(stale.data['job']['id'])
+            ImportJob.objects.filter(pk=stale.data['job']['id']).update(heartbeat_at=old)
+
+            self.assertEqual(self.status_of(stale).data['status'], 'Failed')
+            get_executor.return_value.submit.assert_not_called()
+            self.assertEqual(self.status_of(orphaned).data['status'], 'Pending')
+            get_executor.return_value.submit.assert_called_once_with(
+                jobs._run_in_thread, uuid.UUID(orphaned.data['job']['id'])
+            )
+
+    def test_unknown_job(self):
+        response = self.client.get('/api/admin/products/import/00000000-0000-0000-0000-000000000000/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class JsonStreamTestCase(TestCase):
+    """iter_json_rows decodes arrays incrementally"""
+
+    def test_elements_spanning_chunks(self):
+        items = [{'name': f'Item {i}', 'note': 'é' * i} for i in range(50)]
+        file = SimpleUploadedFile('feed.json', json.dumps(items, indent=2).encode('utf-8'))
+        rows = list(importers.iter_json_rows(file, chunk_size=7))
+        self.assertEqual([item for _, item in rows], items)
+        self.assertEqual(rows[-1][0], 50)
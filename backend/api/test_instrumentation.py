@@ -0,0 +1,85 @@
+import re
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import instrumentation
+from .models import User, Category, Product
+
+
+class InstrumentationTestCase(TestCase):
+    """Test RequestTimingMiddleware and /api/admin/metrics/"""
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.registry.reset()
+        self.client = APIClient()
+        category = Category.objects.create(name='Audio', slug='audio')
+        Product.objects.create(
+            name='Headphones', slug='headphones', category=category, description='Test',
+            price=Decimal('10.00'), weight=Decimal('1.0'), stock=5
+        )
+
+    def test_server_timing_is_opt_in(self):
+        """TC-I01: Server-Timing is only sent when SERVER_TIMING is on, with the real query count"""
+        self.assertNotIn('Server-Timing', self.client.get('/api/products/'))
+
+        cache.clear()
+        with override_settings(SERVER_TIMING=True), CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/products/')
+        timing = response['Server-Timing']
+        self.assertIn(f'db;desc="{len(ctx)} queries"', timing)
+        for metric in ('view', 'render', 'total'):
+            self.assertRegex(timing, rf'{metric};dur=\d+\.\d')
+
+    def test_metrics_endpoint(self):
+        """TC-I02: per-route histograms and counters are exported in Prometheus format"""
+        for _ in range(3):
+            self.client.get('/api/products/headphones/')
+        self.client.get('/api/products/missing/')
+
+        admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/admin/metrics/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+
+        body = response.content.decode()
+        labels = 'route="api/products/<slug:slug>/",method="GET"'
+        self.assertIn(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4', body)
+        self.assertIn(f'http_request_duration_seconds_count{{{labels}}} 4', body)
+        self.assertIn(f'http_responses_total{{{labels},status="2xx"}} 3', body)
+        self.assertIn(f'http_responses_total{{{labels},status="4xx"}} 1', body)
+        self.assertRegex(body, re.escape(f'http_request_db_queries_total{{{labels}}} ') + r'[1-9]')
+
+    def test_metrics_require_admin(self):
+        """TC-I03: the metrics endpoint is admin-only"""
+        self.assertEqual(self.client.get('/api/admin/metrics/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(User.objects.create_user(username='shopper', password='User@123'))
+        self.assertEqual(self.client.get('/api/admin/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_streamed_response_recorded_when_closed(self):
+        """TC-I04: a streamed body's queries and bytes are recorded once the stream is closed"""
+        admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.client.force_authenticate(admin)
+        key = ('api/admin/orders/export_csv/$', 'POST')
+
+        response = self.client.post('/api/admin/orders/export_csv/', {}, format='json')
+        self.assertNotIn(key, instrumentation.registry.routes)
+
+        with CaptureQueriesContext(connection) as ctx:
+            content = b''.join(response.streaming_content)
+        self.assertGreater(len(ctx), 0)
+        response.close()
+
+        stats = instrumentation.registry.routes[key]
+        self.assertEqual(stats.count, 1)
+        self.assertEqual(stats.response_bytes, len(content))
+        self.assertGreaterEqual(stats.db_queries, len(ctx))
+        for c in connections.all():
+            self.assertFalse(any(isinstance(w, instrumentation.QueryTimer) for w in c.execute_wrappers))
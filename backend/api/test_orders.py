@@ -0,0 +1,73 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from .models import User, Category, Product, Order, OrderItem
+from decimal import Decimal
+
+
+class OrderListQueryCountTestCase(TestCase):
+    """Order listings cost a constant number of queries per page"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(username='testadmin', role='admin', is_staff=True)
+        self.customer = User.objects.create_user(username='customer', email='c@test.com')
+        category = Category.objects.create(name='Electronics', slug='electronics')
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}', slug=f'product-{i}', category=category,
+                description='Test', price=Decimal('10.00'), weight=Decimal('1.0'), stock=10
+            )
+            for i in range(5)
+        ]
+
+    def create_orders(self, count, items=5):
+        for _ in range(count):
+            order = Order.objects.create(
+                user=self.customer, total_amount=Decimal('50.00'),
+                shipping_address='1 St', shipping_city='City', shipping_state='State',
+                shipping_pincode='123456', shipping_phone='1234567890'
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=2, price=product.price)
+                for product in self.products[:items]
+            ])
+
+    def count_queries(self, user, url):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx), response.data
+
+    def assert_constant(self, user, url):
+        self.create_orders(1, items=1)
+        small, _ = self.count_queries(user, url)
+        self.create_orders(12)
+        large, data = self.count_queries(user, url)
+        self.assertEqual(small, large)
+        return large, data
+
+    def test_customer_order_list(self):
+        """GET /api/orders/ prefetches items and products"""
+        queries, data = self.assert_constant(self.customer, '/api/orders/')
+        self.assertEqual(len(data['results'][0]['items']), 5)
+        self.assertLessEqual(queries, 4)
+
+    def test_admin_order_list(self):
+        """GET /api/admin/orders/ prefetches users, items and products"""
+        queries, data = self.assert_constant(self.admin, '/api/admin/orders/')
+        self.assertEqual(data['results'][0]['user_email'], 'c@test.com')
+        self.assertLessEqual(queries, 4)
+
+    def test_admin_order_summary_list(self):
+        """GET /api/admin/orders/?view=summary returns item totals without nesting"""
+        queries, data = self.assert_constant(self.admin, '/api/admin/orders/?view=summary')
+        row = data['results'][0]
+        self.assertNotIn('items', row)
+        self.assertEqual((row['item_count'], row['total_quantity']), (5, 10))
+        self.assertLessEqual(queries, 2)
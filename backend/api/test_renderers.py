@@ -0,0 +1,99 @@
+import datetime
+import unittest
+import uuid
+from decimal import Decimal
+from io import BytesIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework import renderers as drf_renderers, status
+from rest_framework.test import APIClient
+
+from . import renderers
+from .models import User, Category, Product, Order, OrderItem
+from .serializers import OrderSerializer, ProductListSerializer
+
+
+@unittest.skipIf(renderers.orjson is None, 'orjson is not installed')
+class FastJSONTestCase(TestCase):
+    """Test the orjson renderer and parser against DRF's stdlib ones"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='buyer', email='buyer@test.com', password='Buyer@123')
+        category = Category.objects.create(name='Audio', slug='audio')
+        self.product = Product.objects.create(
+            name='Headphones \u2028 "Pro"', slug='headphones', category=category, description='Ünïcödé ₹',
+            price=Decimal('1999.99'), weight=Decimal('0.25'), stock=5
+        )
+        self.order = Order.objects.create(
+            user=self.user, total_amount=Decimal('3999.98'), shipping_address='1 Road', shipping_city='Pune',
+            shipping_state='MH', shipping_pincode='411001', shipping_phone='9999999999'
+        )
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=2, price=Decimal('1999.99'))
+
+    def assertSameJSON(self, data):
+        fast = renderers.JSONRenderer().render(data)
+        self.assertEqual(fast, drf_renderers.JSONRenderer().render(data))
+        return fast
+
+    def test_serializer_output_is_identical(self):
+        """TC-J01: Product and nested order/item payloads render byte for byte like DRF"""
+        orders = OrderSerializer(Order.objects.with_items(), many=True).data
+        products = ProductListSerializer(Product.objects.for_listing(), many=True).data
+        body = self.assertSameJSON({'count': 1, 'results': orders, 'products': products})
+        self.assertIn(b'"total_amount":"3999.98"', body)
+        self.assertIn(b'"price":"1999.99"', body)
+        self.assertIn(b'\\u2028', body)
+
+    def test_native_values_are_identical(self):
+        """TC-J02: Decimals, datetimes, dates, times, UUIDs and lazy strings format like DRF"""
+        tz = datetime.timezone(datetime.timedelta(hours=5, minutes=30))
+        self.assertSameJSON({
+            'revenue': Decimal('12.50'),
+            'utc': datetime.datetime(2026, 10, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            'local': datetime.datetime(2026, 10, 1, 18, 0, tzinfo=tz),
+            'naive': datetime.datetime(2026, 10, 1, 18, 0, 1),
+            'day': datetime.date(2026, 10, 1),
+            'time': datetime.time(9, 15, 30, 654321),
+            'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'label': gettext_lazy('Pending'),
+            'numbers': (1, 2.5, None, True),
+        })
+
+    def test_fallbacks(self):
+        """TC-J03: Indented output, huge integers and FAST_JSON=False use the stdlib renderer"""
+        renderer = renderers.JSONRenderer()
+        self.assertEqual(
+            renderer.render({'a': 1}, 'application/json; indent=2'),
+            drf_renderers.JSONRenderer().render({'a': 1}, 'application/json; indent=2'),
+        )
+        self.assertSameJSON({'big': 2 ** 70})
+        with override_settings(FAST_JSON=False), mock.patch.object(renderers.orjson, 'dumps') as dumps:
+            renderer.render({'a': 1})
+        dumps.assert_not_called()
+
+    def test_parser(self):
+        """TC-J04: Request bodies parse with orjson; malformed JSON is a 400"""
+        parsed = renderers.JSONParser().parse(BytesIO('{"price": 10.5, "name": "₹"}'.encode()), None, {})
+        self.assertEqual(parsed, {'price': 10.5, 'name': '₹'})
+
+        self.client.force_authenticate(self.user)
+        response = self.client.post(
+            '/api/cart/', {'product': self.product.pk, 'quantity': 2}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        response = self.client.post('/api/cart/', '{"product": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+    def test_api_responses(self):
+        """TC-J05: API responses go through the orjson renderer"""
+        with mock.patch.object(renderers.orjson, 'dumps', wraps=renderers.orjson.dumps) as dumps:
+            response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(dumps.called)
+        self.assertEqual(response.json()['results'][0]['price'], '1999.99')
@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections, router, transaction
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import caching, routers
+from .models import User, Category, Product, Order
+
+REPLICA = 'replica'
+
+
+@override_settings(DATABASE_REPLICA_ALIAS=REPLICA, CATALOG_CACHE_TIMEOUT=0)
+class ReplicaRoutingTestCase(TestCase):
+    """
+    The test database stands in for the primary and a second SQLite file for
+    the replica. Nothing replicates between them, so which one a request
+    read from is visible in the response.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Registered after the test runner has set up its databases, so this
+        # is a real second file rather than a test mirror of the primary
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.settings[REPLICA] = {
+            **connections.settings['default'],
+            'NAME': os.path.join(cls.replica_dir, 'replica.sqlite3'),
+        }
+        call_command('migrate', database=REPLICA, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.replica_dir)
+        super().tearDownClass()
+
+    def setUp(self):
+        # Roll back whatever a test writes to the replica
+        replica_atomic = transaction.atomic(using=REPLICA)
+        replica_atomic.__enter__()
+        self.addCleanup(replica_atomic.__exit__, None, None, None)
+        self.addCleanup(transaction.set_rollback, True, using=REPLICA)
+
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            username='admin', email='admin@test.com', password='admin123', role='admin'
+        )
+
+    def create_product(self, using, name):
+        category, _ = Category.objects.using(using).get_or_create(
+            slug='audio', defaults={'name': 'Audio'}
+        )
+        return Product.objects.using(using).create(
+            name=name, slug=name.lower(), category=category, description='',
+            price=Decimal('10.00'), weight=Decimal('1.0'), stock=5
+        )
+
+    def create_replica_order(self):
+        User.objects.using(REPLICA).create(pk=self.admin.pk, username='admin', email='admin@test.com')
+        return Order.objects.using(REPLICA).create(
+            user_id=self.admin.pk, total_amount=Decimal('42.00'), shipping_address='1 Road',
+            shipping_city='City', shipping_state='State', shipping_pincode='123456',
+            shipping_phone='9999999999'
+        )
+
+    def test_catalog_reads_from_replica(self):
+        """TC-R01: public catalog GETs are served by the replica"""
+        self.create_product('default', 'Primary')
+        self.create_product(REPLICA, 'Replica')
+
+        response = self.client.get('/api/products/')
+        self.assertEqual([p['name'] for p in response.data['results']], ['Replica'])
+
+        response = self.client.get('/api/products/replica/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_writes_go_to_primary(self):
+        """TC-R02: writes inside a replica block, and saves of replica rows, hit the primary"""
+        with routers.use_replica():
+            Category.objects.create(name='Books', slug='books')
+        self.assertTrue(Category.objects.using('default').filter(slug='books').exists())
+        self.assertFalse(Category.objects.using(REPLICA).filter(slug='books').exists())
+
+        replica_product = self.create_product(REPLICA, 'Replica')
+        self.assertEqual(router.db_for_write(Product, instance=replica_product), 'default')
+
+    @override_settings(CATALOG_CACHE_TIMEOUT=300)
+    def test_catalog_write_fills_cache_from_primary(self):
+        """TC-R03: right after a catalog write, catalog pages are cached from the primary only"""
+        self.create_product('default', 'Primary')
+        self.create_product(REPLICA, 'Replica')
+        caching.bump_catalog_version()
+
+        response = self.client.get('/api/products/')
+        self.assertEqual([p['name'] for p in response.data['results']], ['Primary'])
+
+        # Other replica reads are not held back by the catalog write
+        order = self.create_replica_order()
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get('/api/admin/dashboard/')
+        self.assertEqual([o['order_id'] for o in response.data['recent_orders']], [order.order_id])
+
+        with override_settings(DATABASE_REPLICA_LAG=0):
+            caching.bump_catalog_version()
+            response = self.client.get('/api/products/')
+        self.assertEqual([p['name'] for p in response.data['results']], ['Replica'])
+
+    def test_authentication_uses_primary(self):
+        """TC-R04: a user missing from the replica can still authenticate"""
+        self.client.force_authenticate(user=None)
+        response = self.client.post('/api/admin/login/', {'username': 'admin', 'password': 'admin123'})
+        token = response.data['tokens']['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        response = self.client.get('/api/categories/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dashboard_reads_from_replica(self):
+        """TC-R05: admin dashboard reports come from the replica"""
+        order = self.create_replica_order()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.get('/api/admin/dashboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([o['order_id'] for o in response.data['recent_orders']], [order.order_id])
+
+    def test_export_streams_from_replica(self):
+        """TC-R06: streamed CSV exports read the replica"""
+        order = self.create_replica_order()
+        self.client.force_authenticate(user=self.admin)
+
+        response = self.client.post('/api/admin/orders/export_csv/', {}, format='json')
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn(order.order_id, content)
+
+    @override_settings(DATABASE_REPLICA_ALIAS=None)
+    def test_no_replica_configured(self):
+        """TC-R07: without a replica alias every read uses the primary"""
+        self.create_product('default', 'Primary')
+        self.create_product(REPLICA, 'Replica')
+
+        response = self.client.get('/api/products/')
+        self.assertEqual([p['name'] for p in response.data['results']], ['Primary'])
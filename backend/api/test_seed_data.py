@@ -0,0 +1,67 @@
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F, Sum
+from django.test import TestCase
+
+from . import metrics
+from .management.commands.seed_data import DEMO_PRODUCTS
+from .models import Cart, Order, OrderItem, Product, User
+
+
+class SeedDataTestCase(TestCase):
+    """Test the seed_data command"""
+
+    def setUp(self):
+        cache.clear()
+
+    def seed(self, **options):
+        call_command('seed_data', stdout=StringIO(), **options)
+
+    def test_demo_catalog_is_idempotent(self):
+        """TC-SD01: Without volumes, seeds the admin and demo catalog once"""
+        self.seed()
+        self.seed()
+        self.assertEqual(User.objects.get(username='admin').role, 'admin')
+        self.assertEqual(Product.objects.count(), len(DEMO_PRODUCTS))
+        self.assertEqual(metrics.snapshot()['total_products'], len(DEMO_PRODUCTS))
+
+    def test_synthetic_volumes(self):
+        """TC-SD02: Generates the requested rows with consistent totals and dated history"""
+        self.seed(users=50, products=40, orders=200, carts=10, end_date=date(2026, 10, 1), days=30, batch_size=64)
+        orders = Order.objects.filter(order_id__startswith='ORD-SEED')
+        self.assertEqual(User.objects.filter(username__startswith='seed-user-').count(), 50)
+        self.assertEqual(Product.objects.filter(slug__startswith='seed-product-').count(), 40)
+        self.assertEqual(orders.count(), 200)
+        self.assertTrue(Cart.objects.exists())
+        for order in orders.annotate(items_total=Sum(F('items__price') * F('items__quantity')))[:20]:
+            self.assertEqual(order.total_amount, order.items_total)
+        dates = list(orders.order_by('id').values_list('created_at', flat=True))
+        self.assertEqual(dates, sorted(dates))
+        self.assertLessEqual(dates[-1].date(), date(2026, 10, 1))
+        self.assertEqual(metrics.snapshot()['total_orders'], 200)
+        self.assertTrue(self.client.login(username='seed-user-0', password='User@12345'))
+
+    def test_same_seed_same_data(self):
+        """TC-SD03: A second run with another prefix reproduces the same choices"""
+        options = {'users': 20, 'products': 20, 'orders': 50, 'end_date': date(2026, 10, 1)}
+        self.seed(**options)
+        self.seed(prefix='again', **options)
+
+        def lines(prefix):
+            return list(
+                OrderItem.objects.filter(order__order_id__startswith=f'ORD-{prefix.upper()}').order_by('id')
+                .values_list('product__slug', 'quantity')
+            )
+        first = [(slug.replace('seed-', ''), quantity) for slug, quantity in lines('seed')]
+        second = [(slug.replace('again-', ''), quantity) for slug, quantity in lines('again')]
+        self.assertEqual(first, second)
+
+    def test_existing_prefix_is_refused(self):
+        """TC-SD04: Re-running synthetic generation with the same prefix fails cleanly"""
+        self.seed(users=5, products=5)
+        with self.assertRaises(CommandError):
+            self.seed(users=5, products=5)
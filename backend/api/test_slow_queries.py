@@ -0,0 +1,85 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from . import slow_queries
+from .models import Category, Product, SlowQuery
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0.000001, SLOW_QUERY_SAMPLE_RATE=1.0)
+class SlowQueryLogTestCase(TestCase):
+    """Test the sampling slow-query log"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = Category.objects.create(name='Audio', slug='audio')
+        Product.objects.create(
+            name='Headphones', slug='headphones', category=category, description='Test',
+            price=Decimal('10.00'), weight=Decimal('1.0'), stock=5
+        )
+
+    def test_request_queries_are_logged_with_plan_and_origin(self):
+        """TC-Q01: A slow SELECT is stored normalized, with its route, call site and plan"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get('/api/products/')
+
+        entries = SlowQuery.objects.filter(sql__contains='FROM "api_product"')
+        self.assertTrue(entries.exists())
+        entry = entries.first()
+        self.assertEqual(entry.view, 'GET api/products/')
+        self.assertRegex(entry.call_site, r'^api/.+\.py:\d+ in ')
+        self.assertTrue(entry.plan)
+        self.assertNotIn('EXPLAIN failed', entry.plan)
+        self.assertNotIn('%s  ', entry.sql)
+        # The log's own writes are not logged
+        self.assertFalse(SlowQuery.objects.filter(sql__contains='api_slowquery').exists())
+
+    def test_parameters_are_not_stored(self):
+        """TC-Q02: Logged SQL keeps placeholders and collapses IN lists"""
+        with self.captureOnCommitCallbacks(execute=True):
+            list(Product.objects.filter(slug='headphones', pk__in=[1, 2, 3]))
+        entry = SlowQuery.objects.get(sql__contains='"api_product"."slug" =')
+        self.assertNotIn('headphones', entry.sql)
+        self.assertIn('IN (...)', entry.sql)
+        self.assertEqual(entry.view, '')
+
+    def test_ring_buffer_wraps(self):
+        """TC-Q03: The log keeps at most SLOW_QUERY_LOG_SIZE entries, overwriting the oldest"""
+        with override_settings(SLOW_QUERY_LOG_SIZE=3), self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                list(Product.objects.filter(name=f'missing-{i}'))
+        self.assertEqual(SlowQuery.objects.count(), 3)
+        self.assertEqual(set(SlowQuery.objects.values_list('slot', flat=True)), {0, 1, 2})
+
+        # With per-process state gone the next entry still replaces the oldest
+        oldest = SlowQuery.objects.order_by('recorded_at').first()
+        cache.clear()
+        with override_settings(SLOW_QUERY_LOG_SIZE=3), self.captureOnCommitCallbacks(execute=True):
+            list(Product.objects.filter(name='missing-5'))
+        self.assertEqual(SlowQuery.objects.count(), 3)
+        self.assertEqual(SlowQuery.objects.order_by('-recorded_at').first().slot, oldest.slot)
+
+    def test_failed_write_does_not_reach_caller(self):
+        """TC-Q06: An error writing the log entry is logged, not raised from the logged query"""
+        error = OperationalError('no such table: api_slowquery')
+        with mock.patch.object(SlowQuery.objects, 'bulk_create', side_effect=error):
+            with self.assertLogs('api.slow_queries', 'ERROR'), self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(len(list(Product.objects.filter(slug='headphones'))), 1)
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_disabled_and_sampled_out(self):
+        """TC-Q04: A threshold of 0 or a sample rate of 0 logs nothing"""
+        for overrides in ({'SLOW_QUERY_THRESHOLD_MS': 0}, {'SLOW_QUERY_SAMPLE_RATE': 0.0}):
+            with override_settings(**overrides), self.captureOnCommitCallbacks(execute=True):
+                list(Product.objects.all())
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_wrapper_installed_once(self):
+        """TC-Q05: Every connection carries the wrapper exactly once"""
+        slow_queries.install(None, connection)
+        self.assertEqual(connection.execute_wrappers.count(slow_queries.log_slow_queries), 1)
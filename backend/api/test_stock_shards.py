@@ -0,0 +1,165 @@
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from . import caching, importers, inventory
+from .models import User, Category, Product, Cart, StockShard
+
+SHIPPING = {
+    'shipping_address': '123 Test St',
+    'shipping_city': 'Test City',
+    'shipping_state': 'Test State',
+    'shipping_pincode': '123456',
+    'shipping_phone': '1234567890'
+}
+
+
+class StockShardTestCase(TestCase):
+    """Test sharded stock counters"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='buyer', password='User@123')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.category = Category.objects.create(name='Audio', slug='audio')
+        self.product = Product.objects.create(
+            name='Headphones', slug='headphones', category=self.category, description='Test',
+            price=Decimal('100.00'), weight=Decimal('1.0'), stock=10
+        )
+        inventory.shard_stock(self.product, 4)
+
+    def shards(self):
+        return list(StockShard.objects.filter(product=self.product).order_by('index').values_list('stock', flat=True))
+
+    def checkout(self, quantity):
+        Cart.objects.create(user=self.user, product=self.product, quantity=quantity)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/orders/', SHIPPING)
+
+    def test_shard_and_unshard(self):
+        """TC-S01: stock is split evenly over the shards and folded back when sharding is turned off"""
+        self.assertEqual(self.shards(), [3, 3, 2, 2])
+
+        StockShard.objects.filter(product=self.product, index=0).update(stock=1)
+        inventory.shard_stock(self.product, 0)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.stock_shards), (8, 0))
+        self.assertFalse(StockShard.objects.exists())
+
+    @override_settings(STOCK_HOLD_TTL=0)
+    def test_checkout_takes_one_shard(self):
+        """TC-S02: a sale decrements a single shard and refreshes the cached total, not updated_at"""
+        updated_at = Product.objects.get(pk=self.product.pk).updated_at
+        response = self.checkout(2)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        changed = [before - after for before, after in zip([3, 3, 2, 2], self.shards()) if before != after]
+        self.assertEqual(changed, [2])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 8)
+        self.assertEqual(self.product.updated_at, updated_at)
+
+    @override_settings(STOCK_HOLD_TTL=0)
+    def test_sale_spanning_shards(self):
+        """TC-S03: a sale no shard covers drains several; one beyond the total is rejected"""
+        self.assertEqual(self.checkout(9).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(sum(self.shards()), 1)
+
+        response = self.checkout(2)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(sum(self.shards()), 1)
+
+    def test_sync_invalidates_catalog_on_sell_out(self):
+        """TC-S08: refreshing the cached total only invalidates the catalog when the product sells out"""
+        version = caching.catalog_version()
+        StockShard.objects.filter(product=self.product, index=0).update(stock=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(inventory.sync_sharded_stock(), 1)
+        self.assertEqual(caching.catalog_version(), version)
+
+        StockShard.objects.filter(product=self.product).update(stock=0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(inventory.sync_sharded_stock(), 1)
+        self.assertNotEqual(caching.catalog_version(), version)
+
+    def test_checkout_converts_holds(self):
+        """TC-S04: held units are sold from the shards and released from the reserved counter"""
+        self.client.post('/api/cart/', {'product': self.product.id, 'quantity': 3}, format='json')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/', SHIPPING)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reserved), (7, 0))
+        self.assertEqual(sum(self.shards()), 7)
+
+    def test_holds_checked_against_shards(self):
+        """TC-S09: holds are placed and protected against the shards, not the cached total"""
+        StockShard.objects.filter(product=self.product).exclude(index=3).update(stock=0)
+        self.assertEqual(Product.objects.get(pk=self.product.pk).stock, 10)
+
+        response = self.client.post('/api/cart/', {'product': self.product.id, 'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/cart/', {'product': self.product.id, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # A buyer without a hold cannot take the held units
+        rival = User.objects.create_user(username='rival', password='User@123')
+        Cart.objects.create(user=rival, product=self.product, quantity=1)
+        self.client.force_authenticate(rival)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/orders/', SHIPPING)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.shards(), [0, 0, 0, 2])
+
+    def test_admin_list_edit_sets_shards(self):
+        """TC-S05: editing stock in the admin changelist redistributes it over the shards"""
+        admin = User.objects.create_superuser(username='admin', password='admin123')
+        self.client.force_login(admin)
+        response = self.client.post('/admin/api/product/', {
+            'form-TOTAL_FORMS': '1', 'form-INITIAL_FORMS': '1',
+            'form-MIN_NUM_FORMS': '0', 'form-MAX_NUM_FORMS': '1000',
+            'form-0-id': self.product.pk, 'form-0-price': '120.00',
+            'form-0-stock': '20', 'form-0-is_active': 'on', '_save': 'Save',
+        })
+
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(self.shards(), [5, 5, 5, 5])
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.price), (20, Decimal('120.00')))
+
+    def test_api_edit_sets_shards(self):
+        """TC-S07: editing stock through the REST admin redistributes it over the shards"""
+        admin = User.objects.create_user(username='admin', password='admin123', role='admin')
+        self.client.force_authenticate(admin)
+        response = self.client.patch(f'/api/admin/products/{self.product.pk}/', {'stock': 100}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock'], 100)
+        self.assertEqual(self.shards(), [25, 25, 25, 25])
+        self.assertEqual(inventory.sync_sharded_stock(), 0)
+
+        # Other fields are saved without writing the loaded stock level back
+        StockShard.objects.filter(product=self.product, index=0).update(stock=20)
+        Product.objects.filter(pk=self.product.pk).update(stock=95)
+        response = self.client.patch(f'/api/admin/products/{self.product.pk}/', {'price': '150.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.price), (95, Decimal('150.00')))
+        self.assertEqual(sum(self.shards()), 95)
+
+    def test_import_upsert_redistributes(self):
+        """TC-S06: stock written by an upsert import reaches the shards"""
+        feed = (
+            'name,slug,category,description,price,weight,stock,image,is_active\n'
+            'Headphones,headphones,Audio,Test,100.00,1.0,6,,true\n'
+        )
+        importers.ProductImporter(upsert=True).run(BytesIO(feed.encode()), 'csv')
+
+        self.assertEqual(self.shards(), [2, 2, 1, 1])
+        self.assertEqual(inventory.sync_sharded_stock(), 0)
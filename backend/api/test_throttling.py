@@ -0,0 +1,101 @@
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core import checks
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from . import throttling
+from .models import User
+
+RATES = {'anon': '3/min', 'user': '3/min', 'login': '2/min', 'catalog': '5/min'}
+
+
+@mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', RATES)
+class ThrottlingTestCase(TestCase):
+    """Test fixed-window throttling"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def statuses(self, count, method, url, data=None):
+        return [getattr(self.client, method)(url, data).status_code for _ in range(count)]
+
+    def test_window_limits_and_resets(self):
+        """TC-T01: requests past the rate are refused until the next window"""
+        self.client.force_authenticate(User.objects.create_user(username='shopper', password='User@123'))
+        with mock.patch.object(SimpleRateThrottle, 'timer', return_value=1_000_040.0):
+            codes = self.statuses(3, 'get', '/api/cart/')
+            response = self.client.get('/api/cart/')
+        self.assertEqual(codes, [status.HTTP_200_OK] * 3)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(response['Retry-After'], '40')
+
+        with mock.patch.object(SimpleRateThrottle, 'timer', return_value=1_000_090.0):
+            self.assertEqual(self.client.get('/api/cart/').status_code, status.HTTP_200_OK)
+
+    def test_endpoint_scopes(self):
+        """TC-T02: login is stricter and the catalog looser than the default anonymous rate"""
+        codes = self.statuses(3, 'post', '/api/auth/login/', {'username': 'x', 'password': 'y'})
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+        codes = self.statuses(6, 'get', '/api/categories/')
+        self.assertEqual(codes.count(status.HTTP_200_OK), 5)
+        self.assertEqual(codes[-1], status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_users_counted_separately(self):
+        """TC-T03: authenticated users are throttled per user, not per IP"""
+        for name in ('first', 'second'):
+            self.client.force_authenticate(User.objects.create_user(username=name, password='User@123'))
+            self.assertEqual(self.statuses(3, 'get', '/api/cart/'), [status.HTTP_200_OK] * 3)
+        self.assertEqual(self.client.get('/api/cart/').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+
+class SQLiteWindowStoreTestCase(TestCase):
+    """Test the SQLite throttle store"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'throttle.sqlite3')
+
+    def test_counts_are_shared_and_reset(self):
+        """TC-T04: stores on the same file share counters, which restart with each window"""
+        first, second = throttling.SQLiteWindowStore(self.path), throttling.SQLiteWindowStore(self.path)
+        self.assertEqual(first.hit('client', 60, 10), 1)
+        self.assertEqual(second.hit('client', 60, 20), 2)
+        self.assertEqual(first.hit('other', 60, 20), 1)
+        self.assertEqual(second.hit('client', 120, 70), 1)
+
+    @mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', RATES)
+    def test_throttles_through_sqlite(self):
+        """TC-T05: THROTTLE_STORE='sqlite' routes the throttles to the file"""
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username='shopper', password='User@123'))
+        with override_settings(THROTTLE_STORE='sqlite', THROTTLE_SQLITE_PATH=self.path):
+            codes = [client.get('/api/cart/').status_code for _ in range(4)]
+        self.assertEqual(codes, [status.HTTP_200_OK] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS])
+
+
+class ThrottleStoreCheckTestCase(TestCase):
+    """Test the deployment check on the throttle store"""
+
+    def test_local_memory_cache_store_fails(self):
+        """TC-T06: the cache store on a local-memory cache is a deployment error"""
+        with override_settings(THROTTLE_STORE='cache'):
+            self.assertEqual([error.id for error in throttling.check_store()], ['api.E001'])
+            errors = checks.run_checks(include_deployment_checks=True, tags=[checks.Tags.caches])
+            self.assertIn('api.E001', [error.id for error in errors])
+
+        with override_settings(THROTTLE_STORE='sqlite'):
+            self.assertEqual(throttling.check_store(), [])
+
+        shared = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+        with override_settings(THROTTLE_STORE='cache', CACHES=shared):
+            self.assertEqual(throttling.check_store(), [])
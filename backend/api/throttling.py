@@ -0,0 +1,146 @@
+"""
+Request throttling with fixed-window counters.
+
+DRF's stock throttles keep a list of request timestamps per client and
+rewrite it on every request. These keep a single counter per client and
+window instead, in one of two stores (`settings.THROTTLE_STORE`):
+
+* ``cache``: the `THROTTLE_CACHE_ALIAS` cache. Counters are shared between
+  processes when the alias points at Redis or Memcached.
+* ``sqlite``: a small SQLite file (`THROTTLE_SQLITE_PATH`) that all worker
+  processes on a host share, updated with one atomic UPSERT per request.
+
+A local-memory cache keeps separate counters in every worker process, which
+multiplies the effective rates; `check_store` fails ``manage.py check
+--deploy`` when the cache store is used with one.
+
+A fixed window lets a client send up to twice the rate across a window
+boundary, which is an acceptable trade for O(1) state.
+"""
+import functools
+import random
+import sqlite3
+import threading
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import throttling
+
+# Chance per request that the SQLite store deletes counters of past windows
+PRUNE_PROBABILITY = 0.001
+
+
+class CacheWindowStore:
+    def __init__(self, alias):
+        self.alias = alias
+
+    def hit(self, key, window_end, now):
+        """Count a request in the window ending at `window_end`; returns the count so far"""
+        cache = caches[self.alias]
+        key = f'{key}:{window_end}'
+        timeout = int(window_end - now) + 1
+        cache.add(key, 0, timeout)
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Evicted between add() and incr()
+            cache.set(key, 1, timeout)
+            return 1
+
+
+class SQLiteWindowStore:
+    SCHEMA = 'CREATE TABLE IF NOT EXISTS throttle (key TEXT PRIMARY KEY, window_end INTEGER NOT NULL, hits INTEGER NOT NULL)'
+    HIT = (
+        'INSERT INTO throttle (key, window_end, hits) VALUES (?, ?, 1) '
+        'ON CONFLICT (key) DO UPDATE SET '
+        'hits = CASE WHEN window_end = excluded.window_end THEN hits + 1 ELSE 1 END, '
+        'window_end = excluded.window_end '
+        'RETURNING hits'
+    )
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            # Losing a few counts on power loss is harmless
+            connection.execute('PRAGMA synchronous = OFF')
+            connection.execute(self.SCHEMA)
+            self.local.connection = connection
+        return connection
+
+    def hit(self, key, window_end, now):
+        connection = self.connection()
+        hits = connection.execute(self.HIT, (key, window_end)).fetchone()[0]
+        if random.random() < PRUNE_PROBABILITY:
+            connection.execute('DELETE FROM throttle WHERE window_end < ?', (now,))
+        return hits
+
+
+@functools.lru_cache(maxsize=None)
+def _store(kind, location):
+    if kind == 'sqlite':
+        return SQLiteWindowStore(location)
+    return CacheWindowStore(location)
+
+
+def get_store():
+    if settings.THROTTLE_STORE == 'sqlite':
+        return _store('sqlite', str(settings.THROTTLE_SQLITE_PATH))
+    return _store('cache', settings.THROTTLE_CACHE_ALIAS)
+
+
+def check_store(app_configs=None, **kwargs):
+    if settings.THROTTLE_STORE == 'sqlite' or not isinstance(caches[settings.THROTTLE_CACHE_ALIAS], LocMemCache):
+        return []
+    return [checks.Error(
+        f"THROTTLE_STORE is 'cache' but the '{settings.THROTTLE_CACHE_ALIAS}' cache is local memory, "
+        'so every worker process keeps its own throttle counters.',
+        hint="Set THROTTLE_STORE='sqlite', or point THROTTLE_CACHE_ALIAS at a Redis or Memcached cache.",
+        id='api.E001',
+    )]
+
+
+class FixedWindowMixin:
+    """Replaces the timestamp history of a `SimpleRateThrottle` with a counter"""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+
+        self.now = self.timer()
+        self.window_end = (int(self.now) // self.duration + 1) * self.duration
+        return get_store().hit(key, self.window_end, self.now) <= self.num_requests
+
+    def wait(self):
+        return max(self.window_end - self.now, 0)
+
+
+class AnonRateThrottle(FixedWindowMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(FixedWindowMixin, throttling.UserRateThrottle):
+    pass
+
+
+class LoginRateThrottle(FixedWindowMixin, throttling.SimpleRateThrottle):
+    """Credential endpoints, limited per client IP whether or not the request is authenticated"""
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class CatalogRateThrottle(FixedWindowMixin, throttling.UserRateThrottle):
+    """Public catalog reads, per user or client IP"""
+    scope = 'catalog'
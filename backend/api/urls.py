@@ -18,6 +18,7 @@ urlpatterns = [
     path('admin/login/', views.admin_login, name='admin-login'),
     path('admin/profile/', views.admin_profile, name='admin-profile'),
     path('admin/dashboard/', views.admin_dashboard_stats, name='admin-dashboard'),
+    path('admin/metrics/', views.admin_metrics, name='admin-metrics'),
     
     # Public product endpoints
     path('products/', views.ProductListView.as_view(), name='product-list'),
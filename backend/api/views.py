@@ -1,107 +1,90 @@
 from rest_framework import generics, status, viewsets, filters
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Sum, Count
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.http import HttpResponse
-from .models import Product, Category, Cart, Order, OrderItem
+from .models import Product, Category, Cart, Order, OrderItem, ImportJob
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, ProductSerializer,
-    CategorySerializer, CartSerializer, OrderSerializer, OrderCreateSerializer,
-    OrderItemSerializer
+    ProductListSerializer, CategorySerializer, CartSerializer, CartSummarySerializer,
+    CartBatchSerializer, OrderSerializer, OrderCreateSerializer,
+    OrderItemSerializer, OrderListSerializer, ImportJobSerializer
 )
 from .permissions import IsAdmin
-import csv
+from .throttling import CatalogRateThrottle, LoginRateThrottle
+from . import accounts, authentication, caching, carts, exports, importers, instrumentation, inventory, jobs, metrics, routers
+from .pagination import SelectablePagination
+from .search import ProductSearchFilter
 from datetime import datetime
-from io import StringIO
-import json
-from django.utils.text import slugify
 
 User = get_user_model()
 
 # ============= Authentication Views =============
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def register(request):
     serializer = UserRegistrationSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
         return Response({
             'message': 'User registered successfully',
             'user': UserSerializer(user).data,
-            'tokens': {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
+            'tokens': accounts.issue_tokens(user)
         }, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def login(request):
-    username = request.data.get('username')
-    password = request.data.get('password')
-    
-    try:
-        user = User.objects.get(username=username)
-        if user.check_password(password):
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'message': 'Login successful',
-                'user': UserSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
-            })
-        return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
-    except User.DoesNotExist:
+    user = accounts.verify_credentials(request.data.get('username'), request.data.get('password'))
+    if user is None:
         return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response({
+        'message': 'Login successful',
+        'user': UserSerializer(user).data,
+        'tokens': accounts.issue_tokens(user)
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def profile(request):
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(authentication.loaded_user(request.user))
     return Response(serializer.data)
 
 # ============= Admin Auth Views =============
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([LoginRateThrottle])
 def admin_login(request):
-    username = request.data.get('username')
-    password = request.data.get('password')
-    
-    try:
-        user = User.objects.get(username=username)
-        if user.check_password(password) and user.role == 'admin':
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'message': 'Admin login successful',
-                'user': UserSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
-            })
-        return Response({'error': 'Invalid admin credentials'}, status=status.HTTP_403_FORBIDDEN)
-    except User.DoesNotExist:
+    user = accounts.verify_credentials(request.data.get('username'), request.data.get('password'))
+    if user is None or user.role != 'admin':
         return Response({'error': 'Invalid admin credentials'}, status=status.HTTP_403_FORBIDDEN)
+    return Response({
+        'message': 'Admin login successful',
+        'user': UserSerializer(user).data,
+        'tokens': accounts.issue_tokens(user)
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def admin_profile(request):
-    serializer = UserSerializer(request.user)
+    serializer = UserSerializer(authentication.loaded_user(request.user))
     return Response(serializer.data)
 
 # ============= Public Product Views =============
-class ProductListView(generics.ListAPIView):
-    queryset = Product.objects.filter(is_active=True)
-    serializer_class = ProductSerializer
+class ProductListView(routers.ReplicaReadMixin, caching.CachedResponseMixin, generics.ListAPIView):
+    queryset = Product.objects.active().for_listing()
+    serializer_class = ProductListSerializer
     permission_classes = [AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    throttle_classes = [CatalogRateThrottle]
+    pagination_class = SelectablePagination
+    filter_backends = [ProductSearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'description', 'category__name']
     ordering_fields = ['price', 'created_at']
     
@@ -120,229 +103,259 @@ class ProductListView(generics.ListAPIView):
         
         return queryset
 
-class ProductDetailView(generics.RetrieveAPIView):
-    queryset = Product.objects.filter(is_active=True)
+class ProductDetailView(routers.ReplicaReadMixin, caching.CachedResponseMixin, generics.RetrieveAPIView):
+    queryset = Product.objects.active().with_category()
     serializer_class = ProductSerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
     lookup_field = 'slug'
 
-class CategoryListView(generics.ListAPIView):
+class CategoryListView(routers.ReplicaReadMixin, caching.CachedResponseMixin, generics.ListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [AllowAny]
+    throttle_classes = [CatalogRateThrottle]
 
 # ============= Cart Views =============
 class CartViewSet(viewsets.ModelViewSet):
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticated]
+    # A cart is always shown whole, with its totals
+    pagination_class = None
     
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
+        return Cart.objects.filter(user=self.request.user).select_related('product')
+    
+    def list(self, request):
+        items = list(self.get_queryset())
+        data = CartSummarySerializer(carts.summarize(items)).data
+        data['results'] = CartSerializer(items, many=True).data
+        return Response(data)
     
     def create(self, request):
-        product_id = request.data.get('product')
-        quantity = request.data.get('quantity', 1)
-        
         try:
-            product = Product.objects.get(id=product_id, is_active=True)
-            if product.stock < int(quantity):
-                return Response({'error': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            cart_item, created = Cart.objects.get_or_create(
-                user=request.user,
-                product=product,
-                defaults={'quantity': quantity}
-            )
-            
-            if not created:
-                cart_item.quantity += int(quantity)
-                if cart_item.quantity > product.stock:
-                    return Response({'error': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
-                cart_item.save()
-            
-            serializer = CartSerializer(cart_item)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            quantity = carts.parse_quantity(request.data.get('quantity'))
+            cart_item = carts.add_item(request.user, request.data.get('product'), quantity)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Product.DoesNotExist:
             return Response({'error': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        except inventory.InsufficientStock:
+            return Response({'error': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = CartSerializer(cart_item)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
     
-    def update(self, request, pk=None):
+    def update(self, request, pk=None, **kwargs):
         try:
-            cart_item = Cart.objects.get(pk=pk, user=request.user)
-            quantity = request.data.get('quantity', 1)
-            
-            if cart_item.product.stock < int(quantity):
-                return Response({'error': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
-            
-            cart_item.quantity = quantity
-            cart_item.save()
-            
-            serializer = CartSerializer(cart_item)
-            return Response(serializer.data)
+            quantity = carts.parse_quantity(request.data.get('quantity'))
+            cart_item = self.get_queryset().get(pk=pk)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         except Cart.DoesNotExist:
             return Response({'error': 'Cart item not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        try:
+            carts.set_quantity(request.user, cart_item, quantity)
+        except inventory.InsufficientStock:
+            return Response({'error': 'Insufficient stock'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = CartSerializer(cart_item)
+        return Response(serializer.data)
+    
+    def destroy(self, request, pk=None):
+        product_id = Cart.objects.filter(pk=pk, user=request.user).values_list('product_id', flat=True).first()
+        if product_id is None:
+            return Response({'error': 'Cart item not found'}, status=status.HTTP_404_NOT_FOUND)
+        carts.remove_items(request.user, [product_id])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Apply a list of add/set/remove operations atomically and return the
+        resulting cart, e.g. {"operations": [{"op": "add", "product": 1, "quantity": 2}]}
+        """
+        serializer = CartBatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            carts.apply_batch(request.user, serializer.validated_data['operations'])
+        except carts.CartBatchError as e:
+            return Response({
+                'error': 'Cart operations rejected',
+                'operations': e.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
+        except IntegrityError:
+            return Response({
+                'error': 'Cart changed while applying operations, please retry'
+            }, status=status.HTTP_409_CONFLICT)
+        return self.list(request)
     
     @action(detail=False, methods=['delete'])
     def clear(self, request):
-        Cart.objects.filter(user=request.user).delete()
+        carts.remove_items(request.user)
         return Response({'message': 'Cart cleared'}, status=status.HTTP_204_NO_CONTENT)
 
 # ============= Order Views =============
 class OrderViewSet(viewsets.ModelViewSet):
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = SelectablePagination
     
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).with_items()
     
     def create(self, request):
         serializer = OrderCreateSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        cart_items = Cart.objects.filter(user=request.user)
-        if not cart_items.exists():
-            return Response({'error': 'Cart is empty'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        total_amount = sum(item.total_price for item in cart_items)
-        
-        order = Order.objects.create(
-            user=request.user,
-            total_amount=total_amount,
-            **serializer.validated_data
-        )
-        
-        for cart_item in cart_items:
-            if cart_item.product.stock < cart_item.quantity:
-                order.delete()
-                return Response({
-                    'error': f'Insufficient stock for {cart_item.product.name}'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            OrderItem.objects.create(
-                order=order,
-                product=cart_item.product,
-                quantity=cart_item.quantity,
-                price=cart_item.product.price
-            )
-            
-            cart_item.product.stock -= cart_item.quantity
-            cart_item.product.save()
-        
-        cart_items.delete()
+        try:
+            with transaction.atomic():
+                # One query for every cart line and its product. The lines are locked
+                # so a concurrent quantity change either lands before the order is
+                # priced or waits for it, and they are processed in product order so
+                # concurrent checkouts take row locks consistently
+                cart_items = list(
+                    Cart.objects.select_for_update(of=('self',)).filter(user=request.user)
+                    .select_related('product').order_by('product_id')
+                )
+                if not cart_items:
+                    return Response({'error': 'Cart is empty'}, status=status.HTTP_400_BAD_REQUEST)
+                total_amount = sum(item.total_price for item in cart_items)
+                
+                # Units the buyer holds are converted into the sale
+                held = inventory.claim_holds(request.user, [item.product_id for item in cart_items])
+                for cart_item in cart_items:
+                    inventory.decrement_stock(
+                        cart_item.product, cart_item.quantity, held=held.get(cart_item.product_id, 0)
+                    )
+                
+                order = Order.objects.create(
+                    user=request.user,
+                    total_amount=total_amount,
+                    **serializer.validated_data
+                )
+                OrderItem.objects.bulk_create([
+                    OrderItem(
+                        order=order,
+                        product=cart_item.product,
+                        quantity=cart_item.quantity,
+                        price=cart_item.product.price
+                    )
+                    for cart_item in cart_items
+                ])
+                Cart.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+        except inventory.InsufficientStock as exc:
+            return Response({
+                'error': f'Insufficient stock for {exc.product.name}'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        order_serializer = OrderSerializer(order)
+        order_serializer = OrderSerializer(Order.objects.with_items().get(pk=order.pk))
         return Response(order_serializer.data, status=status.HTTP_201_CREATED)
 
 # ============= Admin Product Views =============
 class AdminProductViewSet(viewsets.ModelViewSet):
-    queryset = Product.objects.all()
+    queryset = Product.objects.with_category()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'slug', 'category__name']
     ordering_fields = ['price', 'stock', 'created_at']
     
+    def perform_update(self, serializer):
+        # Stock moves under concurrent checkouts, so it is never written back
+        # from the request; a changed level goes through the inventory module,
+        # which also redistributes it over the product's shards
+        product = serializer.instance
+        stock = serializer.validated_data.pop('stock', product.stock)
+        for name, value in serializer.validated_data.items():
+            setattr(product, name, value)
+        if serializer.validated_data:
+            product.save(update_fields=list(serializer.validated_data) + ['updated_at'])
+        if stock != product.stock:
+            inventory.set_stock(product, stock)
+    
     @action(detail=False, methods=['post'])
     def import_products(self, request):
         """
-        Bulk import products from CSV or JSON file
-        POST /api/admin/products/import/
+        Queue a bulk import of products from a CSV or JSON file
+        POST /api/admin/products/import_products/
+        Pass upsert=true to update products whose slug already exists.
+        Progress is reported by GET /api/admin/products/import/<job_id>/
         """
         file = request.FILES.get('file')
         if not file:
             return Response({'error': 'No file provided'}, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            file_content = file.read().decode('utf-8')
-            imported_count = 0
-            errors = []
-            
-            # Detect file type
-            if file.name.endswith('.json'):
-                # Handle JSON import
-                products_data = json.loads(file_content)
-                
-                for idx, product_data in enumerate(products_data):
-                    try:
-                        # Get or create category
-                        category_name = product_data.get('category', 'Uncategorized')
-                        category, _ = Category.objects.get_or_create(
-                            name=category_name,
-                            defaults={'slug': slugify(category_name)}
-                        )
-                        
-                        # Create product
-                        Product.objects.create(
-                            name=product_data['name'],
-                            slug=product_data.get('slug', slugify(product_data['name'])),
-                            category=category,
-                            description=product_data.get('description', ''),
-                            price=product_data['price'],
-                            weight=product_data.get('weight', 0),
-                            stock=product_data.get('stock', 0),
-                            image=product_data.get('image', ''),
-                            is_active=product_data.get('is_active', True)
-                        )
-                        imported_count += 1
-                    except Exception as e:
-                        errors.append(f"Row {idx + 1}: {str(e)}")
-            
-            elif file.name.endswith('.csv'):
-                # Handle CSV import
-                csv_file = StringIO(file_content)
-                reader = csv.DictReader(csv_file)
-                
-                for idx, row in enumerate(reader):
-                    try:
-                        category_name = row.get('category', 'Uncategorized')
-                        category, _ = Category.objects.get_or_create(
-                            name=category_name,
-                            defaults={'slug': slugify(category_name)}
-                        )
-                        
-                        Product.objects.create(
-                            name=row['name'],
-                            slug=row.get('slug', slugify(row['name'])),
-                            category=category,
-                            description=row.get('description', ''),
-                            price=float(row['price']),
-                            weight=float(row.get('weight', 0)),
-                            stock=int(row.get('stock', 0)),
-                            image=row.get('image', ''),
-                            is_active=row.get('is_active', 'true').lower() == 'true'
-                        )
-                        imported_count += 1
-                    except Exception as e:
-                        errors.append(f"Row {idx + 2}: {str(e)}")  # +2 because of header
-            else:
-                return Response(
-                    {'error': 'Invalid file format. Please upload CSV or JSON'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            return Response({
-                'message': f'Successfully imported {imported_count} products',
-                'imported_count': imported_count,
-                'errors': errors
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
+        file_format = importers.detect_format(file.name)
+        if file_format is None:
             return Response(
-                {'error': f'Import failed: {str(e)}'},
+                {'error': 'Invalid file format. Please upload CSV or JSON'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        
+        upsert = str(request.data.get('upsert', '')).lower() in ('1', 'true', 'yes')
+        
+        with transaction.atomic():
+            job = ImportJob.objects.create(
+                created_by=request.user,
+                file=file,
+                file_format=file_format,
+                upsert=upsert
+            )
+            jobs.enqueue(job)
+        
+        return Response({
+            'message': 'Import queued',
+            'job': ImportJobSerializer(job).data
+        }, status=status.HTTP_202_ACCEPTED)
+    
+    @action(detail=False, methods=['get'], url_path=r'import/(?P<job_id>[0-9a-f-]+)')
+    def import_status(self, request, job_id=None):
+        """
+        Progress of a product import job
+        GET /api/admin/products/import/<job_id>/
+        """
+        try:
+            job = ImportJob.objects.get(pk=job_id)
+        except (ImportJob.DoesNotExist, ValidationError):
+            return Response({'error': 'Import job not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Whoever is waiting on a job whose worker died finds out here
+        if jobs.abandoned(job):
+            jobs.recover([job.pk])
+            job.refresh_from_db()
+        return Response(ImportJobSerializer(job).data)
 
 # ============= Admin Order Views ============= 
 class AdminOrderViewSet(viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    summary_serializer_class = OrderListSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
+    pagination_class = SelectablePagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['order_id', 'user__email', 'user__username']
     ordering_fields = ['created_at', 'total_amount']
     
+    def is_summary_list(self):
+        """?view=summary lists orders with item totals instead of nested items"""
+        return self.action == 'list' and self.request.query_params.get('view') == 'summary'
+    
+    def get_serializer_class(self):
+        if self.is_summary_list():
+            return self.summary_serializer_class
+        return super().get_serializer_class()
+    
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.is_summary_list():
+            queryset = queryset.with_item_totals()
+        elif self.action != 'export_csv':
+            queryset = queryset.with_items()
         status_filter = self.request.query_params.get('status')
         start_date = self.request.query_params.get('start_date')
         end_date = self.request.query_params.get('end_date')
@@ -388,44 +401,64 @@ class AdminOrderViewSet(viewsets.ModelViewSet):
             orders = Order.objects.filter(id__in=order_ids)
         else:
             orders = self.get_queryset()
+        # The response streams after the view returns, so pin the alias up front
+        orders = orders.using(routers.report_alias())
         
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="orders_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow(['Order ID', 'Customer Email', 'Status', 'Total Amount', 'Items', 'Shipping Address', 'Created At'])
-        
-        for order in orders:
-            items = ', '.join([f"{item.product.name} x {item.quantity}" for item in order.items.all()])
-            address = f"{order.shipping_address}, {order.shipping_city}, {order.shipping_state} - {order.shipping_pincode}"
-            writer.writerow([
-                order.order_id,
-                order.user.email,
-                order.status,
-                order.total_amount,
-                items,
-                address,
-                order.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
+        def rows():
+            for order in exports.iter_orders(orders):
+                items = ', '.join([f"{item.product.name} x {item.quantity}" for item in order.items.all()])
+                address = f"{order.shipping_address}, {order.shipping_city}, {order.shipping_state} - {order.shipping_pincode}"
+                yield [
+                    order.order_id,
+                    order.user.email,
+                    order.status,
+                    order.total_amount,
+                    items,
+                    address,
+                    order.created_at.strftime('%Y-%m-%d %H:%M:%S')
+                ]
         
-        return response
+        return exports.csv_response(
+            f'orders_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            ['Order ID', 'Customer Email', 'Status', 'Total Amount', 'Items', 'Shipping Address', 'Created At'],
+            rows()
+        )
 
 # ============= Admin Dashboard Stats =============
+@routers.reads_from_replica
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdmin])
 def admin_dashboard_stats(request):
-    total_orders = Order.objects.count()
-    pending_orders = Order.objects.filter(status='Pending').count()
-    total_revenue = Order.objects.aggregate(total=Sum('total_amount'))['total'] or 0
-    total_products = Product.objects.count()
+    """
+    Dashboard totals from the precomputed counters in `api.metrics`.
+    ?days=N controls the length of the revenue_by_day series (default 30).
+    """
+    try:
+        days = min(max(int(request.query_params.get('days', 30)), 1), 365)
+    except ValueError:
+        days = 30
     
-    recent_orders = Order.objects.all()[:5]
+    counters = metrics.snapshot()
+    
+    recent_orders = Order.objects.with_items()[:5]
     recent_orders_data = OrderSerializer(recent_orders, many=True).data
     
     return Response({
-        'total_orders': total_orders,
-        'pending_orders': pending_orders,
-        'total_revenue': float(total_revenue),
-        'total_products': total_products,
-        'recent_orders': recent_orders_data
+        'total_orders': counters['total_orders'],
+        'pending_orders': counters['orders_by_status']['Pending'],
+        'total_revenue': float(counters['total_revenue']),
+        'total_products': counters['total_products'],
+        'recent_orders': recent_orders_data,
+        'orders_by_status': counters['orders_by_status'],
+        'revenue_by_day': metrics.revenue_by_day(days)
     })
+
+# ============= Request Metrics =============
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdmin])
+def admin_metrics(request):
+    """
+    Per-route request metrics from `api.instrumentation`, in the Prometheus
+    text format. Counts are per worker process.
+    """
+    return HttpResponse(instrumentation.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
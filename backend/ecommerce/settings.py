@@ -3,6 +3,7 @@ Django settings for ecommerce project.
 """
 from pathlib import Path
 from datetime import timedelta
+import importlib.util
 import os
 
 # Fallback config function if python-decouple is not available
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -75,11 +77,70 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'ecommerce.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database: DB_ENGINE=postgresql for production, SQLite otherwise.
+# Connections are kept open for DB_CONN_MAX_AGE seconds and health-checked
+# before reuse instead of being reopened on every request.
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('DB_NAME', default='ecommerce'),
+            'USER': config('DB_USER', default='postgres'),
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='localhost'),
+            'PORT': config('DB_PORT', default='5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+            },
+        }
     }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('DB_NAME', default=str(BASE_DIR / 'db.sqlite3')),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+
+# Optional read replica for catalog and reporting reads (api.routers):
+# DB_REPLICA_HOST for PostgreSQL, DB_REPLICA_NAME (a file) for SQLite
+DB_REPLICA_HOST = config('DB_REPLICA_HOST', default='')
+DB_REPLICA_NAME = config('DB_REPLICA_NAME', default='')
+if DB_ENGINE == 'postgresql' and DB_REPLICA_HOST:
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': DB_REPLICA_HOST,
+        'PORT': config('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'USER': config('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': config('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+    }
+elif DB_ENGINE != 'postgresql' and DB_REPLICA_NAME:
+    DATABASES['replica'] = {**DATABASES['default'], 'NAME': DB_REPLICA_NAME}
+if 'replica' in DATABASES:
+    # Tests read and write one database
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica' if 'replica' in DATABASES else None
+# Seconds after a catalog write during which catalog cache misses read the primary
+DATABASE_REPLICA_LAG = config('DATABASE_REPLICA_LAG', default=5, cast=int)
+
+# Applied to every new SQLite connection by api.db.configure_connection.
+# WAL lets readers run alongside a writer, busy_timeout (ms) makes writers
+# queue for the lock instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+    'temp_store': 'MEMORY',
+    'cache_size': -20000,  # KiB
 }
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -89,6 +150,32 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Password hashing. New and re-hashed passwords use PASSWORD_HASHER (argon2,
+# bcrypt or pbkdf2); the others stay listed so existing hashes still verify
+# and are upgraded on the next successful login. argon2 and bcrypt need the
+# argon2-cffi / bcrypt packages and fall back to pbkdf2 without them.
+_PASSWORD_HASHERS = {
+    'argon2': ('api.hashers.Argon2PasswordHasher', 'argon2'),
+    'bcrypt': ('api.hashers.BCryptSHA256PasswordHasher', 'bcrypt'),
+    'pbkdf2': ('api.hashers.PBKDF2PasswordHasher', None),
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2')
+if PASSWORD_HASHER not in _PASSWORD_HASHERS or (
+    _PASSWORD_HASHERS[PASSWORD_HASHER][1] and not importlib.util.find_spec(_PASSWORD_HASHERS[PASSWORD_HASHER][1])
+):
+    PASSWORD_HASHER = 'pbkdf2'
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER][0]] + [
+    path for name, (path, _) in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Work factors (api.hashers). The Argon2 defaults are the OWASP minimum for
+# argon2id (19 MiB, t=2, p=1); PBKDF2 defaults to Django's own iteration count
+PBKDF2_ITERATIONS = config('PBKDF2_ITERATIONS', default=600000, cast=int)
+ARGON2_TIME_COST = config('ARGON2_TIME_COST', default=2, cast=int)
+ARGON2_MEMORY_COST = config('ARGON2_MEMORY_COST', default=19456, cast=int)  # KiB
+ARGON2_PARALLELISM = config('ARGON2_PARALLELISM', default=1, cast=int)
+BCRYPT_ROUNDS = config('BCRYPT_ROUNDS', default=12, cast=int)
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'Asia/Kolkata'
 USE_I18N = True
@@ -106,24 +193,84 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework Settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 12,
     
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttling.AnonRateThrottle',
+        'api.throttling.UserRateThrottle'
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'anon': '100/hour',      # Anonymous users: 100 requests/hour
-        'user': '1000/hour',     # Authenticated users: 1000 requests/hour
+        'anon': config('THROTTLE_RATE_ANON', default='100/hour'),      # Anonymous users
+        'user': config('THROTTLE_RATE_USER', default='1000/hour'),     # Authenticated users
+        'login': config('THROTTLE_RATE_LOGIN', default='20/min'),      # Login/register, per IP
+        'catalog': config('THROTTLE_RATE_CATALOG', default='600/min'), # Public catalog reads
     }
 }
 
+# Encode and decode API bodies with orjson when it is installed (api.renderers);
+# off falls back to DRF's stdlib json
+FAST_JSON = config('FAST_JSON', default=True, cast=bool)
+
+# Send per-request timings (api.instrumentation) in a Server-Timing header
+SERVER_TIMING = config('SERVER_TIMING', default=False, cast=bool)
+
+# Slow-query log (api.slow_queries): statements slower than the threshold are
+# sampled at SLOW_QUERY_SAMPLE_RATE into a ring buffer of SLOW_QUERY_LOG_SIZE
+# entries, with their plan; a threshold of 0 disables it
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=200, cast=float)
+SLOW_QUERY_SAMPLE_RATE = config('SLOW_QUERY_SAMPLE_RATE', default=1.0, cast=float)
+SLOW_QUERY_LOG_SIZE = config('SLOW_QUERY_LOG_SIZE', default=500, cast=int)
+
+# Throttle counters (api.throttling): 'cache' keeps them in THROTTLE_CACHE_ALIAS
+# (shared between processes on Redis/Memcached), 'sqlite' in a file that every
+# worker process on the host shares. 'cache' on a local-memory cache fails
+# `manage.py check --deploy`
+THROTTLE_STORE = config('THROTTLE_STORE', default='cache')
+THROTTLE_CACHE_ALIAS = config('THROTTLE_CACHE_ALIAS', default='default')
+THROTTLE_SQLITE_PATH = config('THROTTLE_SQLITE_PATH', default=str(BASE_DIR / 'throttle.sqlite3'))
+
+# Product import jobs: 'thread' (in-process pool), 'worker' (manage.py run_import_jobs) or 'eager'
+IMPORT_JOB_RUNNER = config('IMPORT_JOB_RUNNER', default='thread')
+IMPORT_JOB_WORKERS = config('IMPORT_JOB_WORKERS', default=2, cast=int)
+# Seconds a running import may go without reporting progress before it is
+# marked failed, and a pending one may wait before it is submitted again
+# (its worker is assumed dead)
+IMPORT_JOB_TIMEOUT = config('IMPORT_JOB_TIMEOUT', default=600, cast=int)
+
+# Caching: local memory by default; point CACHE_BACKEND/CACHE_LOCATION at Redis or
+# Memcached to share the cache between processes
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    }
+}
+
+# Public catalog response cache (api.caching); timeout 0 disables it
+CATALOG_CACHE_ALIAS = config('CATALOG_CACHE_ALIAS', default='default')
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=300, cast=int)
+
+# Seconds a cart line holds its stock (api.inventory); 0 disables holds
+STOCK_HOLD_TTL = config('STOCK_HOLD_TTL', default=900, cast=int)
+
+# Seconds between refreshes of Product.stock for products with sharded stock
+STOCK_SHARD_SYNC_INTERVAL = config('STOCK_SHARD_SYNC_INTERVAL', default=5, cast=int)
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=7),
@@ -132,6 +279,11 @@ SIMPLE_JWT = {
     'BLACKLIST_AFTER_ROTATION': True,
 }
 
+# Stateless JWT authentication (api.authentication): seconds a user's
+# active/role status is cached before deactivations are re-read from the database
+AUTH_CACHE_ALIAS = config('AUTH_CACHE_ALIAS', default='default')
+AUTH_STATUS_CACHE_TTL = config('AUTH_STATUS_CACHE_TTL', default=60, cast=int)
+
 # CORS Settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
@@ -309,7 +309,7 @@ function ProductList({ token, onAddToCart }) {
 }
 
 // Cart Page Component
-function CartPage({ cart, token, onLoadCart, setCurrentPage }) {
+function CartPage({ cart, subtotal, token, onLoadCart, setCurrentPage }) {
   const [showCheckout, setShowCheckout] = useState(false);
   const [updating, setUpdating] = useState(false);
 
@@ -335,7 +335,7 @@ function CartPage({ cart, token, onLoadCart, setCurrentPage }) {
     }
   };
 
-  const total = cart.reduce((sum, item) => sum + parseFloat(item.total_price), 0);
+  const total = parseFloat(subtotal);
 
   if (showCheckout) {
     return <CheckoutPage cart={cart} total={total} token={token} onBack={() => setShowCheckout(false)} setCurrentPage={setCurrentPage} onLoadCart={onLoadCart} />;
@@ -1081,7 +1081,7 @@ function AdminOrders({ token }) {
   const loadOrders = async () => {
     setLoading(true);
     try {
-      let url = '/admin/orders/?';
+      let url = '/admin/orders/?view=summary&';
       if (statusFilter) url += `status=${statusFilter}&`;
       if (searchTerm) url += `search=${searchTerm}&`;
       const data = await api.get(url, token);
@@ -1092,6 +1092,15 @@ function AdminOrders({ token }) {
     setLoading(false);
   };
 
+  const openOrder = async (order) => {
+    try {
+      const data = await api.get(`/admin/orders/${order.id}/`, token);
+      setViewOrder(data);
+    } catch (err) {
+      console.error('Failed to load order:', err);
+    }
+  };
+
   const handleExportCSV = async () => {
     try {
       const response = await fetch(`${API_BASE_URL}/admin/orders/export_csv/`, {
@@ -1210,7 +1219,7 @@ function AdminOrders({ token }) {
                     </td>
                     <td className="px-6 py-4 text-sm">{new Date(order.created_at).toLocaleDateString()}</td>
                     <td className="px-6 py-4">
-                      <button onClick={() => setViewOrder(order)}
+                      <button onClick={() => openOrder(order)}
                         className="p-2 text-indigo-600 hover:bg-indigo-50 rounded transition">
                         <Eye className="w-4 h-4" />
                       </button>
@@ -1302,6 +1311,7 @@ export default function App() {
   const [token, setToken] = useState(null);
   const [currentPage, setCurrentPage] = useState('home');
   const [cart, setCart] = useState([]);
+  const [cartSubtotal, setCartSubtotal] = useState('0.00');
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -1333,7 +1343,8 @@ export default function App() {
   const loadCart = async (authToken = token) => {
     try {
       const data = await api.get('/cart/', authToken);
-      setCart(data.results || data);
+      setCart(data.results);
+      setCartSubtotal(data.subtotal);
     } catch (err) {
       console.error('Failed to load cart:', err);
     }
@@ -1380,6 +1391,7 @@ export default function App() {
     setToken(null);
     setUser(null);
     setCart([]);
+    setCartSubtotal('0.00');
     localStorage.removeItem('token');
     localStorage.removeItem('user');
     setCurrentPage('home');
@@ -1415,7 +1427,7 @@ export default function App() {
       <Header user={user} cartCount={cart.length} onLogout={logout} currentPage={currentPage} setCurrentPage={setCurrentPage} />
       <main className="container mx-auto px-4 py-8">
         {currentPage === 'home' && <ProductList token={token} onAddToCart={addToCart} />}
-        {currentPage === 'cart' && <CartPage cart={cart} token={token} onLoadCart={loadCart} setCurrentPage={setCurrentPage} />}
+        {currentPage === 'cart' && <CartPage cart={cart} subtotal={cartSubtotal} token={token} onLoadCart={loadCart} setCurrentPage={setCurrentPage} />}
         {currentPage === 'orders' && <OrdersPage token={token} />}
       </main>
     </div>